@@ -0,0 +1,333 @@
+"""Banc d'essai des fonctions les plus sollicitées de main.py sur des écoles synthétiques.
+
+Chaque échelle génère une école déterministe (étudiants, enseignants, cours, notes et
+absences), l'écrit dans un dossier temporaire avec le stockage choisi, puis chronomètre
+les fonctions sans aucune saisie. Les résultats sont écrits en JSON pour comparer les
+exécutions entre elles :
+
+    python benchmark.py --echelles 1k 100k --sortie avant.json
+    python benchmark.py --echelles 1k 100k --sortie apres.json --comparer avant.json
+
+Le temps de démarrage (lancement de main.py sans données, comparé à l'interpréteur
+seul) est mesuré aussi, sauf avec --sans-demarrage.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import main
+from main import BLEU, JAUNE, NORMAL, ROUGE, VERT
+
+# Échelles disponibles : nombre d'étudiants
+ECHELLES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+GRAINE = 2024
+RESULTATS_FILE = "benchmark.json"
+
+# Écart de médiane au-delà duquel une comparaison est signalée
+TOLERANCE = 0.10
+
+# Répétitions des mesures trop courtes pour être chronométrées seules
+APPELS_DOUBLON = 1000
+APPELS_RECHERCHE = 100
+
+# Modifications journalisées par sauvegarde
+OPERATIONS_SAUVEGARDE = 100
+
+# Bulletins écrits par mesure de rendu (le coût d'un bulletin ne dépend pas de l'échelle)
+ECHANTILLON_BULLETINS = 200
+
+# Les étudiants sont inscrits sur cinq années scolaires
+DEBUT_INSCRIPTIONS = datetime(2020, 9, 1)
+DUREE_INSCRIPTIONS = 5 * 365 * main.UN_JOUR
+JOURS_ABSENCES = 5 * 36 * main.JOURS_DE_CLASSE
+
+PRENOMS = ("Adèle", "Alice", "Antoine", "Arthur", "Camille", "Chloé", "Clément", "Élise", "Emma",
+           "Gabriel", "Hugo", "Inès", "Jade", "Jules", "Léa", "Léon", "Louis", "Louise", "Lucas",
+           "Manon", "Maël", "Noé", "Nathan", "Paul", "Raphaël", "Rose", "Sacha", "Zoé")
+NOMS = ("Bernard", "Bonnet", "Durand", "Dubois", "Fontaine", "François", "Garnier", "Girard",
+        "Lambert", "Laurent", "Lefèvre", "Leroy", "Martin", "Mercier", "Moreau", "Morel", "Petit",
+        "Richard", "Robert", "Roux", "Simon", "Thomas")
+MATIERES = ("Mathématiques", "Français", "Histoire", "Géographie", "Physique", "Chimie",
+            "Biologie", "Anglais", "Espagnol", "Philosophie", "Informatique", "Musique")
+
+# Une mesure : (nom, fonction chronométrée, préparation non chronométrée, appels par exécution)
+Mesure = Tuple[str, Callable[[], Any], Optional[Callable[[], Any]], int]
+
+def generer_ecole(taille: int, graine: int = GRAINE) -> Dict[str, Any]:
+    """Données d'une école de `taille` étudiants, au format JSON des fichiers.
+
+    La même graine donne toujours les mêmes données ; chaque étudiant a de une à
+    quatre notes et jusqu'à trois absences, les absences tombant des jours de classe.
+    """
+    hasard = random.Random(graine)
+    etudiants = []
+    for i in range(taille):
+        date_ajout = DEBUT_INSCRIPTIONS + timedelta(seconds=hasard.randrange(DUREE_INSCRIPTIONS))
+        etudiants.append({"id": i + 1, "nom": f"{hasard.choice(PRENOMS)} {hasard.choice(NOMS)} {i}",
+                          "date_ajout": date_ajout.strftime(main.FORMAT_DATE)})
+    enseignants = [{"id": i + 1, "nom": f"{hasard.choice(PRENOMS)} {hasard.choice(NOMS)} {i}"}
+                   for i in range(taille // 50 + 1)]
+    # Chaque enseignant reçoit les cours à tour de rôle
+    cours = [{"id": i + 1, "nom": f"{MATIERES[i % len(MATIERES)]} {i // len(MATIERES) + 1}",
+              "enseignant_id": i % len(enseignants) + 1} for i in range(taille // 100 + 5)]
+    premier = main.rang_de_classe(DEBUT_INSCRIPTIONS.strftime("%Y-%m-%d"))
+    jours = [main.date_de_classe(premier + rang) for rang in range(JOURS_ABSENCES)]
+    notes = []
+    absences = []
+    for etudiant in etudiants:
+        identifiant = etudiant["id"]
+        for _ in range(hasard.randint(1, 4)):
+            notes.append({"id": len(notes) + 1, "etudiant_id": identifiant,
+                          "note": main.formater_note(hasard.randint(0, 2 * main.NOTE_MAX) / 2),
+                          "cours_id": hasard.choice(cours)["id"]})
+        for date in hasard.sample(jours, hasard.randint(0, 3)):
+            absences.append({"id": len(absences) + 1, "etudiant_id": identifiant, "date": date})
+    return {"version": main.VERSION_DONNEES, "sequence": 0, "etudiants": etudiants,
+            "enseignants": enseignants, "cours": cours, "notes": notes, "absences": absences}
+
+@contextlib.contextmanager
+def silence():
+    """Écarte les messages affichés par main.py pendant les mesures."""
+    with open(os.devnull, "w") as nul, contextlib.redirect_stdout(nul):
+        yield
+
+def mesurer(mesure: Mesure, repetitions: int, memoire: bool) -> Dict[str, Any]:
+    """Chronomètre une mesure `repetitions` fois, puis relève son pic mémoire avec tracemalloc.
+
+    Le pic est relevé lors d'une exécution à part : tracemalloc ralentit trop le
+    code pour que ses temps soient comparables.
+    """
+    nom, fonction, preparer, appels = mesure
+    temps = []
+    with silence():
+        for _ in range(repetitions):
+            if preparer is not None:
+                preparer()
+            gc.collect()
+            debut = time.perf_counter()
+            fonction()
+            temps.append(time.perf_counter() - debut)
+        pic = None
+        if memoire:
+            if preparer is not None:
+                preparer()
+            gc.collect()
+            tracemalloc.start()
+            try:
+                fonction()
+                pic = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return {
+        "mesure": nom,
+        "appels": appels,
+        "temps_s": temps,
+        "min_s": min(temps),
+        "mediane_s": statistics.median(temps),
+        "par_appel_s": min(temps) / appels,
+        "memoire_max_o": pic,
+    }
+
+def mesurer_demarrage(repetitions: int) -> List[Dict[str, Any]]:
+    """Chronomètre des lancements complets de l'interpréteur, dans un dossier sans données."""
+    script = os.path.abspath(main.__file__)
+    lancements = {
+        "interpréteur seul": [sys.executable, "-c", "pass"],
+        "import main": [sys.executable, "-c", "import main"],
+        "main.py --help": [sys.executable, script, "--help"],
+        "main.py --export": [sys.executable, script, "--export"],
+    }
+    # Le sous-processus doit trouver main.py et les mêmes dépendances que ce processus
+    environnement = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.path.dirname(script),
+                                                                              os.environ.get("PYTHONPATH")])))
+    resultats = []
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as dossier:
+        for nom, commande in lancements.items():
+            temps = []
+            for _ in range(repetitions):
+                debut = time.perf_counter()
+                subprocess.run(commande, cwd=dossier, env=environnement, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                temps.append(time.perf_counter() - debut)
+            resultat = {"echelle": "demarrage", "taille": 0, "mesure": nom, "appels": 1, "temps_s": temps,
+                        "min_s": min(temps), "mediane_s": statistics.median(temps), "par_appel_s": min(temps),
+                        "memoire_max_o": None}
+            afficher_resultat(resultat)
+            resultats.append(resultat)
+    return resultats
+
+def lister_mesures(exemple: Dict[str, Any], formats: List[str]) -> List[Mesure]:
+    """Mesures à effectuer sur l'école chargée ; `exemple` est un étudiant de cette école."""
+    ajoutes = iter(range(sys.maxsize))
+    melange = list(main.etudiants)
+    random.Random(GRAINE).shuffle(melange)
+
+    def charger() -> None:
+        main.charger_donnees()
+        main.exiger(*main.COLLECTIONS)
+
+    def doublons() -> None:
+        for _ in range(APPELS_DOUBLON):
+            main.ajouter_etudiant(exemple["nom"])
+
+    def recherches_date() -> None:
+        date = exemple["date_ajout"][:10]
+        for _ in range(APPELS_RECHERCHE):
+            main.rechercher_etudiant_par_date(main.etudiants, date)
+
+    def melanger() -> None:
+        main.etudiants[:] = melange
+
+    def modifier() -> None:
+        for _ in range(OPERATIONS_SAUVEGARDE):
+            main.ajouter_etudiant(f"Nouvel étudiant {next(ajoutes)}")
+
+    def oublier_index() -> None:
+        main.INDEX_APPROCHES["etudiants"].vider()
+
+    def preparer_bulletins() -> None:
+        os.makedirs(main.BULLETINS_DIR, exist_ok=True)
+
+    def recherches_approchees() -> None:
+        # Une faute de frappe dans le prénom et le nom de l'exemple
+        requete = " ".join(mot[:1] + mot[2:] for mot in exemple["nom"].split()[:2])
+        for _ in range(APPELS_RECHERCHE):
+            main.rechercher_approche("etudiants", requete)
+
+    mesures: List[Mesure] = [
+        ("charger_donnees", charger, None, 1),
+        ("ajouter_etudiant (doublon)", doublons, None, APPELS_DOUBLON),
+        ("rechercher_etudiant_par_date", recherches_date, None, APPELS_RECHERCHE),
+        ("trier_etudiants (nom)", lambda: main.trier_etudiants(main.etudiants, "1"), melanger, 1),
+        ("trier_etudiants (date)", lambda: main.trier_etudiants(main.etudiants, "2"), melanger, 1),
+        ("sauvegarder_donnees (journal)", lambda: main.sauvegarder_donnees(afficher=False), modifier, 1),
+        ("sauvegarder_donnees (instantané)", lambda: main.stockage.compacter(main.instantane()), None, 1),
+    ]
+    mesures.extend((f"exporter ({format_export})", main.EXPORTS[format_export], None, 1) for format_export in formats)
+    mesures.append(("rechercher_approche (construction)",
+                    lambda: main.rechercher_approche("etudiants", exemple["nom"]), oublier_index, 1))
+    mesures.append(("rechercher_approche", recherches_approchees, None, APPELS_RECHERCHE))
+    mesures.append(("calculer_bulletins", main.calculer_bulletins, None, 1))
+    echantillon = main.calculer_bulletins()[:ECHANTILLON_BULLETINS]
+    # Rendu dans ce processus : le débit parallèle est celui-ci multiplié par le nombre de processus
+    mesures.extend((f"rendre_bulletins ({format_bulletin})",
+                    lambda f=format_bulletin: main.rendre_bulletins(f, main.BULLETINS_DIR, echantillon,
+                                                                    len(main.etudiants)),
+                    preparer_bulletins, len(echantillon))
+                   for format_bulletin in main.BULLETINS if format_bulletin in formats)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print(JAUNE + "NumPy n'est pas installé : analyses ignorées." + NORMAL)
+    else:
+        mesures.append(("analyser_notes", lambda: main.analyser_notes(main.notes), None, 1))
+        mesures.append(("analyser_absences", main.analyser_absences, None, 1))
+    return mesures
+
+def executer_echelle(etiquette: str, options: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Génère l'école d'une échelle dans un dossier temporaire et y effectue toutes les mesures."""
+    taille = ECHELLES[etiquette]
+    origine = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as dossier:
+        os.chdir(dossier)
+        try:
+            debut = time.perf_counter()
+            data = generer_ecole(taille, options.graine)
+            exemple = data["etudiants"][taille // 2]
+            main.choisir_stockage(options.stockage)
+            main.stockage.compacter(data)
+            nombres = {nom: len(data[nom]) for nom in main.COLLECTIONS}
+            del data
+            print(BLEU + f"École {etiquette} générée en {time.perf_counter() - debut:.1f} s : "
+                  + ", ".join(f"{nombre} {nom}" for nom, nombre in nombres.items()) + NORMAL)
+            with silence():
+                main.charger_donnees()
+                main.exiger(*main.COLLECTIONS)
+            resultats = []
+            for mesure in lister_mesures(exemple, options.formats):
+                resultat = {"echelle": etiquette, "taille": taille, **mesurer(mesure, options.repetitions, options.memoire)}
+                afficher_resultat(resultat)
+                resultats.append(resultat)
+            return resultats
+        finally:
+            if hasattr(main.stockage, "connexion"):
+                main.stockage.connexion.close()
+            os.chdir(origine)
+
+def afficher_resultat(resultat: Dict[str, Any]) -> None:
+    memoire = resultat["memoire_max_o"]
+    memoire = "" if memoire is None else f"{memoire / 2 ** 20:10.1f} Mo"
+    print(f"  {resultat['mesure']:<36} min {resultat['min_s'] * 1000:10.2f} ms"
+          f"   médiane {resultat['mediane_s'] * 1000:10.2f} ms{memoire}")
+
+def comparer(resultats: List[Dict[str, Any]], chemin: str) -> None:
+    """Affiche le rapport des médianes avec celles d'une exécution précédente."""
+    with open(chemin) as f:
+        anciens = {(r["echelle"], r["mesure"]): r for r in json.load(f)["resultats"]}
+    print(BLEU + f"\nComparaison avec {chemin} (médianes) :" + NORMAL)
+    for resultat in resultats:
+        ancien = anciens.get((resultat["echelle"], resultat["mesure"]))
+        if ancien is None:
+            continue
+        rapport = resultat["mediane_s"] / ancien["mediane_s"]
+        couleur = ROUGE if rapport > 1 + TOLERANCE else VERT if rapport < 1 - TOLERANCE else NORMAL
+        print(couleur + f"  {resultat['echelle']:>5} {resultat['mesure']:<36} x{rapport:6.2f}" + NORMAL)
+
+def construire_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Banc d'essai de main.py sur des écoles synthétiques.")
+    parser.add_argument("--echelles", nargs="+", choices=list(ECHELLES), default=["1k", "100k"],
+                        help="Échelles à mesurer (par défaut : 1k 100k)")
+    parser.add_argument("--stockage", choices=("json", "jsonl", "sqlite"), default="json",
+                        help="Stockage des données (par défaut : json)")
+    parser.add_argument("--repetitions", type=int, default=5, help="Exécutions chronométrées par mesure")
+    parser.add_argument("--formats", nargs="*", choices=list(main.EXPORTS), default=list(main.EXPORTS),
+                        help="Formats d'export mesurés (par défaut : tous ; docx est ignoré sans python-docx)")
+    parser.add_argument("--graine", type=int, default=GRAINE, help="Graine du générateur de données")
+    parser.add_argument("--sans-memoire", dest="memoire", action="store_false",
+                        help="Ne pas relever le pic mémoire (tracemalloc)")
+    parser.add_argument("--sans-demarrage", dest="demarrage", action="store_false",
+                        help="Ne pas mesurer le temps de démarrage de main.py")
+    parser.add_argument("--sortie", default=RESULTATS_FILE, help=f"Fichier JSON des résultats (par défaut : {RESULTATS_FILE})")
+    parser.add_argument("--comparer", metavar="FICHIER", help="Résultats JSON d'une exécution précédente")
+    return parser
+
+if __name__ == "__main__":
+    options = construire_parser().parse_args()
+    # Comme pour main.py, python-docx est facultatif : sans lui, le format docx n'est pas mesuré
+    if "docx" in options.formats:
+        try:
+            import docx  # noqa: F401
+        except ImportError:
+            options.formats = [format_export for format_export in options.formats if format_export != "docx"]
+            print(JAUNE + "python-docx n'est pas installé : les exports et bulletins docx ne sont pas mesurés."
+                  + NORMAL)
+    resultats = []
+    if options.demarrage:
+        print(BLEU + "Démarrage :" + NORMAL)
+        resultats.extend(mesurer_demarrage(max(options.repetitions, 10)))
+    for etiquette in options.echelles:
+        resultats.extend(executer_echelle(etiquette, options))
+    with open(options.sortie, "w") as f:
+        json.dump({
+            "date": datetime.now().strftime(main.FORMAT_DATE),
+            "machine": {"python": platform.python_version(), "systeme": platform.platform(),
+                        "processeur": platform.processor(), "coeurs": os.cpu_count()},
+            "options": {"stockage": options.stockage, "repetitions": options.repetitions, "graine": options.graine},
+            "resultats": resultats,
+        }, f, indent=4, ensure_ascii=False)
+    print(VERT + f"Résultats écrits dans '{options.sortie}'." + NORMAL)
+    if options.comparer:
+        comparer(resultats, options.comparer)
@@ -1,20 +1,123 @@
 import argparse
+import bisect
+import contextlib
 import csv
 import json
 import getpass
+import heapq
+import itertools
+import math
 import os
-from datetime import datetime
-from docx import Document
-from colorama import Fore, Style, init
-from typing import List, Dict, Any
+import pathlib
+import random
+import re
+import shlex
+import shutil
+import sys
+import time
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from operator import attrgetter
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable, Sequence, Set
 
-# Initialiser colorama
-init(autoreset=True)
+# Les modules lents à importer (python-docx, asyncio, sqlite3...) le sont dans les
+# fonctions qui s'en servent : --help, --export ou une sous-commande démarrent sans eux.
+
+# Initialiser colorama, seulement si la sortie est un terminal : sinon les couleurs
+# seraient retirées de toute façon, inutile d'importer le module
+if sys.stdout is not None and sys.stdout.isatty():
+    from colorama import Fore, Style, init
+    init(autoreset=True)
+else:
+    class SansCouleur:
+        """Remplace colorama.Fore et colorama.Style : chaque couleur est une chaîne vide."""
+
+        def __getattr__(self, nom: str) -> str:
+            return ""
+
+    Fore = Style = SansCouleur()
 
 # Fichiers pour sauvegarder les données
 DATA_FILE = "etudiants.json"
+USERS_FILE = "utilisateurs.json"
 DATA_JSON = "data.json"
 EXPORT_FILE = "export.txt"
+EXPORT_DOCX = "export.docx"
+JOURNAL_FILE = "data.journal"
+DATA_JSONL = "data.jsonl"
+DATA_DB = "data.db"
+
+# Écoles : une par dossier de ECOLES_DIR, chacune avec ses propres fichiers de données et
+# d'export ; --ecole TOUTES_ECOLES répartit recherches, statistiques et exports sur toutes
+ECOLES_DIR = "ecoles"
+TOUTES_ECOLES = "tous"
+# Dossier de ECOLES_DIR où sont réunis les exports de toutes les écoles (ce n'est pas une école)
+FUSION_DIR = "_fusion"
+# Collections que partitionner copie dans chaque école : comptées une fois par nom dans les totaux
+COLLECTIONS_PARTAGEES = ("enseignants", "cours")
+
+# Mots de passe : coût de scrypt (CPU et mémoire), taille du sel en octets
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+TAILLE_SEL = 16
+
+# Sessions : durée de vie d'un jeton (secondes), nombre maximal de jetons gardés en mémoire
+DUREE_SESSION = 15 * 60
+SESSIONS_MAX = 1000
+
+# Nombre d'enregistrements touchés par le journal au-delà duquel il est compacté dans l'instantané
+SEUIL_COMPACTION = 10000
+
+# Analyse des notes : barème (notes acceptées de NOTE_MIN à NOTE_MAX), centiles affichés,
+# classes de l'histogramme, taille du classement
+NOTE_MIN = 0
+NOTE_MAX = 20
+CENTILES = (10, 25, 75, 90)
+NB_CLASSES = 10
+TAILLE_CLASSEMENT = 10
+
+# Import en masse : lignes traitées par lot, nombre de rejets détaillés dans le rapport
+TAILLE_LOT = 10000
+RAPPORT_REJETS = 10
+
+# Recherche par nom : noms proposés au plus, part minimale des trigrammes de la requête
+# qu'un nom doit partager pour être proposé malgré une faute de frappe
+LIMITE_RESULTATS = 20
+SEUIL_SIMILARITE = 0.5
+# Pertinence d'un nom trouvé, de la meilleure à la moins bonne (rang dans CORRESPONDANCES)
+CORRESPONDANCES = ("exact", "préfixe", "début de mot", "sous-chaîne", "proche")
+
+# API HTTP : adresse d'écoute par défaut, attente pour regrouper les écritures
+# d'une même sauvegarde (secondes), enregistrements par page des listes
+HOTE_API = "127.0.0.1"
+PORT_API = 8000
+DELAI_SAUVEGARDE = 0.005
+TAILLE_PAGE = 100
+
+# Taille du tampon d'écriture des exports
+TAMPON_EXPORT = 1 << 20
+
+# Bulletins de notes : dossier de sortie, bulletins au plus par lot envoyé à un processus
+BULLETINS_DIR = "bulletins"
+TAILLE_LOT_BULLETINS = 200
+
+# En-têtes CSV reconnus à l'import en plus des noms de champs (ceux de exporter_vers_csv)
+ENTETES_CSV = {"Nom": "nom", "Date d'ajout": "date_ajout"}
+
+# Mesures de performance : activées par --profile ou par la variable d'environnement
+# PROFIL_ENV (qui donne le fichier JSON écrit en fin de session)
+PROFIL_ENV = "ECOLE_PROFIL"
+PROFIL_FILE = "profil.json"
+# Bornes (en secondes) des classes des histogrammes de latence ; la dernière classe est ouverte
+BORNES_LATENCE = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10)
+
+# Absences : nombre de jours de classe par semaine à partir du lundi (5 : du lundi au vendredi)
+JOURS_DE_CLASSE = 5
 
 # Couleurs
 ROUGE = Fore.RED
@@ -23,46 +126,1873 @@ BLEU = Fore.BLUE
 JAUNE = Fore.YELLOW
 NORMAL = Style.RESET_ALL
 
-# Données en mémoire
-etudiants: List[Dict[str, Any]] = []
-enseignants: List[Dict[str, Any]] = []
-cours: List[Dict[str, Any]] = []
-notes: List[Dict[str, Any]] = []
-absences: List[Dict[str, Any]] = []
+# Dates d'ajout : stockées en secondes depuis EPOQUE, écrites au format FORMAT_DATE
+EPOQUE = datetime(1970, 1, 1)
+FORMAT_DATE = "%Y-%m-%d %H:%M:%S"
+UN_JOUR = 24 * 3600
+DATE_NON_DISPONIBLE = "Date non disponible"
+
+@lru_cache(maxsize=4096)
+def lire_date(texte: str) -> int:
+    """Convertit une date 'YYYY-MM-DD HH:MM:SS' en secondes depuis EPOQUE."""
+    return (datetime.fromisoformat(texte) - EPOQUE) // timedelta(seconds=1)
+
+def lire_jour(texte: str) -> int:
+    """Convertit une date saisie 'YYYY-MM-DD' en secondes depuis EPOQUE (début du jour)."""
+    return (datetime.strptime(texte, "%Y-%m-%d") - EPOQUE) // timedelta(seconds=1)
+
+@lru_cache(maxsize=4096)
+def rang_de_classe(texte: str, fin: bool = False) -> int:
+    """Rang d'une date 'YYYY-MM-DD' parmi les jours de classe depuis EPOQUE.
+
+    Un jour sans classe compte comme le jour de classe suivant, ou comme le
+    précédent pour une fin de période (`fin=True`).
+    """
+    # Le 1er janvier 1970 était un jeudi : jour + 3 compte les jours depuis un lundi
+    semaine, jour_semaine = divmod(lire_jour(texte) // UN_JOUR + 3, 7)
+    if jour_semaine >= JOURS_DE_CLASSE:
+        return semaine * JOURS_DE_CLASSE + JOURS_DE_CLASSE - fin
+    return semaine * JOURS_DE_CLASSE + jour_semaine
+
+@lru_cache(maxsize=4096)
+def jour_de_classe(texte: str) -> int:
+    """Rang d'une date d'absence ; ValueError si elle est mal écrite ou tombe un jour sans classe."""
+    rang = rang_de_classe(texte)
+    if rang != rang_de_classe(texte, fin=True):
+        raise ValueError(f"le {texte} n'est pas un jour de classe")
+    return rang
+
+def date_de_classe(rang: int) -> str:
+    """Date 'YYYY-MM-DD' d'un rang de jour de classe (inverse de jour_de_classe)."""
+    semaine, jour_semaine = divmod(rang, JOURS_DE_CLASSE)
+    return (EPOQUE + timedelta(days=semaine * 7 + jour_semaine - 3)).strftime("%Y-%m-%d")
+
+def formater_date(secondes: Optional[int]) -> str:
+    """Convertit des secondes depuis EPOQUE en date 'YYYY-MM-DD HH:MM:SS'."""
+    if secondes is None:
+        return DATE_NON_DISPONIBLE
+    return (EPOQUE + timedelta(seconds=secondes)).strftime(FORMAT_DATE)
+
+def formater_note(valeur: float) -> str:
+    """Écrit une note sans décimale inutile (15.0 -> '15')."""
+    return str(int(valeur)) if valeur.is_integer() else repr(valeur)
+
+def lire_note(texte: str) -> float:
+    """Convertit une note saisie ('15', '12.5' ou '12,5') en nombre, du barème NOTE_MIN à NOTE_MAX.
+
+    Lève ValueError pour un texte qui n'est pas un nombre, une valeur infinie ou indéfinie
+    ('inf', 'nan') et une note hors du barème.
+    """
+    try:
+        valeur = float(texte.replace(",", "."))
+    except ValueError:
+        raise ValueError(f"'{texte}' n'est pas un nombre")
+    if not math.isfinite(valeur) or not NOTE_MIN <= valeur <= NOTE_MAX:
+        raise ValueError(f"'{texte}' n'est pas une note entre {NOTE_MIN} et {NOTE_MAX}")
+    return valeur
+
+class Histogramme:
+    """Latences d'une action réparties par classes (BORNES_LATENCE), avec le total des
+    enregistrements parcourus et des octets lus et écrits."""
+
+    def __init__(self) -> None:
+        self.classes = [0] * (len(BORNES_LATENCE) + 1)
+        self.nombre = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.enregistrements = 0
+        self.octets_lus = 0
+        self.octets_ecrits = 0
+
+    def ajouter(self, duree: float, enregistrements: int, octets_lus: int, octets_ecrits: int) -> None:
+        self.classes[bisect.bisect_left(BORNES_LATENCE, duree)] += 1
+        self.nombre += 1
+        self.total += duree
+        self.maximum = max(self.maximum, duree)
+        self.enregistrements += enregistrements
+        self.octets_lus += octets_lus
+        self.octets_ecrits += octets_ecrits
+
+    def centile(self, rang: float) -> float:
+        """Borne supérieure de la classe qui contient le centile `rang` (au plus le maximum)."""
+        seuil = rang / 100 * self.nombre
+        cumul = 0
+        for borne, effectif in zip(BORNES_LATENCE, self.classes):
+            cumul += effectif
+            if cumul >= seuil:
+                return min(borne, self.maximum)
+        return self.maximum
+
+    def vers_dict(self) -> Dict[str, Any]:
+        return {
+            "appels": self.nombre,
+            "total_s": self.total,
+            "moyenne_s": self.total / self.nombre,
+            "p50_s": self.centile(50),
+            "p95_s": self.centile(95),
+            "max_s": self.maximum,
+            "enregistrements": self.enregistrements,
+            "octets_lus": self.octets_lus,
+            "octets_ecrits": self.octets_ecrits,
+            "classes": {f"<= {borne} s": effectif for borne, effectif in zip(BORNES_LATENCE, self.classes)}
+                       | {f"> {BORNES_LATENCE[-1]} s": self.classes[-1]},
+        }
+
+# Mesures de la session : action -> histogramme
+profil_actif = False
+histogrammes: Dict[str, Histogramme] = {}
+# Enregistrements lus depuis le stockage ou parcourus, tant que les mesures sont actives
+enregistrements_parcourus = 0
+# Octets lus par octets_io elle-même, à ne pas attribuer aux actions mesurées
+octets_io_lus = 0
+
+def octets_io() -> Tuple[int, int]:
+    """Octets lus et écrits par le processus (Linux) ; (0, 0) si le système ne les fournit pas."""
+    global octets_io_lus
+    try:
+        with open("/proc/self/io", "rb") as f:
+            contenu = f.read()
+    except OSError:
+        return 0, 0
+    compteurs = dict(ligne.split(b":", 1) for ligne in contenu.splitlines())
+    # rchar ne compte pas encore la lecture en cours, seulement les précédentes
+    lus = int(compteurs[b"rchar"]) - octets_io_lus
+    octets_io_lus += len(contenu)
+    return lus, int(compteurs[b"wchar"])
+
+@contextlib.contextmanager
+def mesurer(*action: str) -> Iterator[None]:
+    """Enregistre la durée, les enregistrements parcourus et les octets lus et écrits d'une action.
+
+    Les mesures imbriquées sont comptées dans chacune des actions qui les contiennent.
+    """
+    if not profil_actif:
+        yield
+        return
+    parcourus = enregistrements_parcourus
+    lus, ecrits = octets_io()
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        duree = time.perf_counter() - debut
+        fin_lus, fin_ecrits = octets_io()
+        nom = " ".join(action)
+        if nom not in histogrammes:
+            histogrammes[nom] = Histogramme()
+        histogrammes[nom].ajouter(duree, enregistrements_parcourus - parcourus, fin_lus - lus, fin_ecrits - ecrits)
+
+def mesure(action: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Décorateur : mesure chaque appel de la fonction sous le nom `action`.
+
+    À réserver aux fonctions qui ne demandent rien à l'utilisateur, pour ne pas mesurer sa saisie.
+    """
+    def decorer(fonction: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(fonction)
+        def mesuree(*args: Any, **kwargs: Any) -> Any:
+            if not profil_actif:
+                return fonction(*args, **kwargs)
+            with mesurer(action):
+                return fonction(*args, **kwargs)
+        return mesuree
+    return decorer
+
+def compter_parcourus(nombre: int) -> None:
+    global enregistrements_parcourus
+    enregistrements_parcourus += nombre
+
+def flux_compte(flux: Iterable[Any]) -> Iterator[Any]:
+    """Compte les enregistrements d'un flux au fur et à mesure qu'ils sont lus."""
+    global enregistrements_parcourus
+    for enregistrement in flux:
+        enregistrements_parcourus += 1
+        yield enregistrement
+
+def formater_octets(nombre: int) -> str:
+    for unite in ("o", "Ko", "Mo"):
+        if nombre < 1024:
+            return f"{nombre:.0f} {unite}"
+        nombre /= 1024
+    return f"{nombre:.1f} Go"
+
+def afficher_performances() -> None:
+    """Affiche les mesures de la session, les actions les plus coûteuses d'abord."""
+    if not histogrammes:
+        print(JAUNE + "Aucune mesure." + (
+            "" if profil_actif else f" Lancez le programme avec --profile ou {PROFIL_ENV}=fichier.json.") + NORMAL)
+        return
+    print(BLEU + f"{'Action':<28}{'Appels':>8}{'Total':>10}{'Moyenne':>10}{'p50':>10}{'p95':>10}{'Max':>10}"
+          f"{'Enreg.':>10}{'Lus':>10}{'Écrits':>10}" + NORMAL)
+    for nom, histogramme in sorted(histogrammes.items(), key=lambda item: -item[1].total):
+        mesures = histogramme.vers_dict()
+        print(f"{nom:<28}{mesures['appels']:>8}"
+              + "".join(f"{mesures[cle] * 1000:>8.1f}ms" for cle in ("total_s", "moyenne_s", "p50_s", "p95_s", "max_s"))
+              + f"{mesures['enregistrements']:>10}{formater_octets(mesures['octets_lus']):>10}"
+              f"{formater_octets(mesures['octets_ecrits']):>10}")
+        # Histogramme : une colonne par classe non vide
+        print("    " + "  ".join(f"{etiquette}: {effectif}" for etiquette, effectif in mesures["classes"].items() if effectif))
+    print()
+
+def ecrire_profil(fichier: str) -> None:
+    """Écrit les mesures de la session dans un fichier JSON."""
+    sauvegarder_donnees_fichier(fichier, {
+        "date": datetime.now().strftime(FORMAT_DATE),
+        "bornes_s": list(BORNES_LATENCE),
+        "actions": {nom: histogramme.vers_dict() for nom, histogramme in histogrammes.items()},
+    })
+    print(VERT + f"Mesures de performance écrites dans '{fichier}'." + NORMAL)
+
+class Enregistrement:
+    """Base des enregistrements : conversion depuis et vers le format JSON des fichiers.
+
+    Les enregistrements sont comparés et hachés par identité (eq=False) : deux notes
+    identiques restent deux notes, et chacune peut servir de clé dans un Registre.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def depuis_dict(cls, data: Dict[str, Any]) -> "Enregistrement":
+        return cls(*(data[champ] for champ in cls.__slots__))
+
+    def vers_dict(self) -> Dict[str, Any]:
+        return {champ: getattr(self, champ) for champ in self.__slots__}
+
+    def affecter(self, champ: str, valeur: Any) -> None:
+        """Modifie un champ à partir de sa valeur au format JSON."""
+        setattr(self, champ, valeur)
+
+    def __repr__(self) -> str:
+        return repr(self.vers_dict())
+
+@dataclass(slots=True, repr=False, eq=False)
+class Etudiant(Enregistrement):
+    id: int
+    nom: str
+    date_ajout: Optional[int] = None
+
+    @classmethod
+    def depuis_dict(cls, data: Dict[str, Any]) -> "Etudiant":
+        date_ajout = data.get("date_ajout")
+        return cls(data["id"], data["nom"], None if date_ajout is None else lire_date(date_ajout))
+
+    def vers_dict(self) -> Dict[str, Any]:
+        if self.date_ajout is None:
+            return {"id": self.id, "nom": self.nom}
+        return {"id": self.id, "nom": self.nom, "date_ajout": formater_date(self.date_ajout)}
+
+@dataclass(slots=True, repr=False, eq=False)
+class Enseignant(Enregistrement):
+    id: int
+    nom: str
+
+@dataclass(slots=True, repr=False, eq=False)
+class Cours(Enregistrement):
+    id: int
+    nom: str
+    enseignant_id: Optional[int] = None
+
+    @classmethod
+    def depuis_dict(cls, data: Dict[str, Any]) -> "Cours":
+        return cls(data["id"], data["nom"], data.get("enseignant_id"))
+
+    def vers_dict(self) -> Dict[str, Any]:
+        if self.enseignant_id is None:
+            return {"id": self.id, "nom": self.nom}
+        return {"id": self.id, "nom": self.nom, "enseignant_id": self.enseignant_id}
+
+@dataclass(slots=True, repr=False, eq=False)
+class Note(Enregistrement):
+    id: int
+    etudiant_id: int
+    note: float
+    cours_id: Optional[int] = None
+    # Texte d'origine, conservé seulement s'il ne se réécrit pas à l'identique depuis `note`
+    brut: Optional[str] = None
+
+    @classmethod
+    def depuis_dict(cls, data: Dict[str, Any]) -> "Note":
+        note = cls(data["id"], data["etudiant_id"], 0.0, data.get("cours_id"))
+        note.affecter("note", data["note"])
+        return note
+
+    def vers_dict(self) -> Dict[str, Any]:
+        if self.cours_id is None:
+            return {"id": self.id, "etudiant_id": self.etudiant_id, "note": self.texte()}
+        return {"id": self.id, "etudiant_id": self.etudiant_id, "note": self.texte(), "cours_id": self.cours_id}
+
+    def affecter(self, champ: str, valeur: Any) -> None:
+        if champ != "note":
+            setattr(self, champ, valeur)
+            return
+        try:
+            self.note = lire_note(valeur)
+        except ValueError:
+            self.note = float("nan")
+        self.brut = None if formater_note(self.note) == valeur else valeur
+
+    def texte(self) -> str:
+        return self.brut if self.brut is not None else formater_note(self.note)
+
+@dataclass(slots=True, repr=False, eq=False)
+class Absence(Enregistrement):
+    id: int
+    etudiant_id: int
+    date: str
+
+    @classmethod
+    def depuis_dict(cls, data: Dict[str, Any]) -> "Absence":
+        return cls(data["id"], data["etudiant_id"], sys.intern(data["date"]))
+
+class Registre:
+    """Enregistrements d'une collection, dans l'ordre d'ajout.
+
+    S'utilise comme une liste (parcours, len, tranches, append, extend, sort), mais
+    retrouve et retire un enregistrement en temps constant par sa clé : son identifiant
+    pour les collections (cle="id"), l'enregistrement lui-même pour les entrées d'index.
+    """
+
+    __slots__ = ("cle", "elements")
+
+    def __init__(self, cle: Optional[str] = None) -> None:
+        self.cle = None if cle is None else attrgetter(cle)
+        self.elements: Dict[Any, Any] = {}
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.elements.values())
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __getitem__(self, tranche: slice) -> List[Any]:
+        return list(itertools.islice(self.elements.values(), tranche.start, tranche.stop))
+
+    def __setitem__(self, tranche: slice, enregistrements: Iterable[Any]) -> None:
+        # Seul registre[:] = ... a un sens : le contenu est remplacé en entier
+        enregistrements = list(enregistrements)
+        cles = enregistrements if self.cle is None else map(self.cle, enregistrements)
+        self.elements = dict(zip(cles, enregistrements))
+
+    def append(self, enregistrement: Any) -> None:
+        self.elements[enregistrement if self.cle is None else self.cle(enregistrement)] = enregistrement
+
+    def extend(self, enregistrements: Iterable[Any]) -> None:
+        enregistrements = list(enregistrements)
+        cles = enregistrements if self.cle is None else map(self.cle, enregistrements)
+        self.elements.update(zip(cles, enregistrements))
+
+    def remove(self, enregistrement: Any) -> None:
+        del self.elements[enregistrement if self.cle is None else self.cle(enregistrement)]
+
+    def discard(self, enregistrement: Any) -> None:
+        """Retire l'enregistrement s'il est présent."""
+        self.elements.pop(enregistrement if self.cle is None else self.cle(enregistrement), None)
+
+    def obtenir(self, cle: Any) -> Any:
+        """L'enregistrement de cette clé (identifiant), ou None."""
+        return self.elements.get(cle)
+
+    def clear(self) -> None:
+        self.elements.clear()
+
+    def sort(self, key: Callable[[Any], Any]) -> None:
+        self[:] = sorted(self.elements.values(), key=key)
+
+MOTS = re.compile(r"\w+")
+
+def normaliser(texte: str) -> str:
+    """Forme de comparaison sans casse, sans accents ni ponctuation (« Élodie-Anne » -> « elodie anne »)."""
+    if not texte.isascii():
+        texte = "".join(c for c in unicodedata.normalize("NFKD", texte) if not unicodedata.combining(c))
+    return " ".join(MOTS.findall(texte.casefold()))
+
+def trigrammes(texte: str) -> set:
+    """Trigrammes d'un texte normalisé dont chaque mot est bordé d'espaces ("  a", " al", "ali"...)."""
+    borne = f"  {texte.replace(' ', '  ')} "
+    return set(map("".join, zip(borne, borne[1:], borne[2:])))
+
+class IndexApproche:
+    """Index de recherche approchée sur les clés d'un index de noms.
+
+    Sans tenir compte de la casse ni des accents, retrouve les noms par préfixe
+    (liste triée, comme l'index des dates), par sous-chaîne et avec des fautes
+    de frappe (trigrammes). Construit au premier usage puis tenu à jour ; un
+    nom retiré garde son identifiant, ignoré, jusqu'à la prochaine construction.
+    """
+
+    def __init__(self) -> None:
+        self.vider()
+
+    def vider(self) -> None:
+        self.construit = False
+        self.cles: List[Optional[str]] = []
+        # Nom normalisé précédé d'une espace, pour tester les débuts de mots
+        self.noms: List[str] = []
+        self.identifiants: Dict[str, int] = {}
+        self.listes: Dict[str, array] = {}
+        # Identifiants triés par nom normalisé
+        self.ordre: List[int] = []
+
+    def construire(self, cles: Iterable[str]) -> None:
+        self.vider()
+        for cle in cles:
+            self.ajouter(cle, trier=False)
+        self.ordre.sort(key=self.noms.__getitem__)
+        self.construit = True
+
+    def ajouter(self, cle: str, trier: bool = True) -> None:
+        if cle in self.identifiants:
+            return
+        identifiant = len(self.cles)
+        self.identifiants[cle] = identifiant
+        self.cles.append(cle)
+        nom = normaliser(cle)
+        self.noms.append(" " + nom)
+        if trier:
+            bisect.insort(self.ordre, identifiant, key=self.noms.__getitem__)
+        else:
+            self.ordre.append(identifiant)
+        listes = self.listes
+        for trigramme in trigrammes(nom):
+            liste = listes.get(trigramme)
+            if liste is None:
+                liste = listes[trigramme] = array("i")
+            liste.append(identifiant)
+
+    def retirer(self, cle: str) -> None:
+        identifiant = self.identifiants.pop(cle, None)
+        if identifiant is not None:
+            self.cles[identifiant] = None
+
+    def rechercher(self, requete: str, limite: int) -> List[str]:
+        """Clés correspondant à la requête, les plus pertinentes d'abord.
+
+        Viennent d'abord les noms qui commencent par la requête, puis ceux dont un
+        mot commence par elle, puis ceux qui la contiennent ; les noms proches ne
+        sont proposés que si aucun ne correspond.
+        """
+        return [cle for _, cle in self.rechercher_classe(requete, limite)]
+
+    def rechercher_classe(self, requete: str, limite: int) -> List[Tuple[Tuple[int, float], str]]:
+        """Comme rechercher, chaque clé précédée de sa pertinence (rang dans CORRESPONDANCES,
+        puis part des trigrammes de la requête manquant au nom) : plus petite, meilleure.
+        Comparable d'un index à l'autre, elle permet de fusionner leurs résultats."""
+        requete = normaliser(requete)
+        if not requete:
+            return []
+        resultats = self.par_prefixe(" " + requete, limite)
+        if len(resultats) < limite:
+            resultats += self.par_sous_chaine(requete, limite - len(resultats), set(resultats))
+        noms, cles = self.noms, self.cles
+        if not resultats:
+            trigrammes_requete = trigrammes(requete)
+            return [((CORRESPONDANCES.index("proche"),
+                      1 - len(trigrammes(noms[identifiant][1:]) & trigrammes_requete) / len(trigrammes_requete)),
+                     cles[identifiant])
+                    for identifiant in self.proches(requete, limite)]
+        debut = " " + requete
+        return [((self.correspondance(noms[identifiant], debut), 0.0), cles[identifiant])
+                for identifiant in resultats]
+
+    @staticmethod
+    def correspondance(nom: str, debut: str) -> int:
+        """Rang dans CORRESPONDANCES d'un nom normalisé trouvé sans faute de frappe."""
+        if nom == debut:
+            return 0
+        if nom.startswith(debut):
+            return 1
+        return 2 if debut in nom else 3
+
+    def par_prefixe(self, debut: str, limite: int) -> List[int]:
+        noms, cles = self.noms, self.cles
+        resultats = []
+        position = bisect.bisect_left(self.ordre, debut, key=noms.__getitem__)
+        for identifiant in itertools.islice(self.ordre, position, None):
+            if not noms[identifiant].startswith(debut):
+                break
+            if cles[identifiant] is not None:
+                resultats.append(identifiant)
+                if len(resultats) == limite:
+                    break
+        return resultats
+
+    def par_sous_chaine(self, requete: str, limite: int, exclus: set) -> List[int]:
+        """Noms contenant tous les mots de la requête (en début de mot pour ceux de moins de trois lettres).
+
+        Parcourt la plus courte des listes de trigrammes de la requête et s'arrête
+        dès que `limite` noms ont un mot qui commence par la requête.
+        """
+        mots = requete.split()
+        morceaux = [" " + mot if len(mot) < 3 else mot for mot in mots]
+        listes = [self.listes.get(("  " + mot)[-3:] if len(mot) < 3 else mot[i:i + 3], ())
+                  for mot in mots for i in range(max(len(mot) - 2, 1))]
+        noms, cles = self.noms, self.cles
+        debut = " " + requete
+        debuts: List[int] = []
+        milieux: List[int] = []
+        for identifiant in min(listes, key=len):
+            nom = noms[identifiant]
+            if all(morceau in nom for morceau in morceaux) and cles[identifiant] is not None \
+                    and identifiant not in exclus:
+                if debut in nom:
+                    debuts.append(identifiant)
+                    if len(debuts) == limite:
+                        break
+                elif len(milieux) < limite:
+                    milieux.append(identifiant)
+        cle_tri = lambda identifiant: (len(noms[identifiant]), noms[identifiant])
+        return (sorted(debuts, key=cle_tri) + sorted(milieux, key=cle_tri))[:limite]
+
+    def proches(self, requete: str, limite: int) -> List[int]:
+        """Noms partageant le plus de trigrammes avec la requête (au moins SEUIL_SIMILARITE d'entre eux)."""
+        trigrammes_requete = trigrammes(requete)
+        communs: Counter = Counter()
+        for trigramme in trigrammes_requete:
+            communs.update(self.listes.get(trigramme, ()))
+        minimum = SEUIL_SIMILARITE * len(trigrammes_requete)
+        noms, cles = self.noms, self.cles
+        scores = [(-commun, len(noms[identifiant]), noms[identifiant], identifiant)
+                  for identifiant, commun in communs.items()
+                  if commun >= minimum and cles[identifiant] is not None]
+        return [identifiant for *_, identifiant in heapq.nsmallest(limite, scores)]
+
+# Données en mémoire, dans l'ordre d'ajout, par identifiant
+etudiants: Registre = Registre("id")
+enseignants: Registre = Registre("id")
+cours: Registre = Registre("id")
+notes: Registre = Registre("id")
+absences: Registre = Registre("id")
+
+# Index des noms (nom en minuscules -> enregistrements), tenus à jour à chaque ajout,
+# modification et suppression pour éviter de parcourir les listes ; chaque entrée est un
+# Registre, d'où un enregistrement est retiré sans parcourir ses homonymes.
+index_etudiants: Dict[str, Registre] = {}
+index_enseignants: Dict[str, Registre] = {}
+index_cours: Dict[str, Registre] = {}
+
+# Listes d'adjacence inverses des clés étrangères (identifiant -> enregistrements qui le
+# référencent) : notes et absences de chaque étudiant, notes de chaque cours, cours de
+# chaque enseignant. Renommer ne touche qu'un enregistrement ; une suppression en cascade
+# ne parcourt que les enregistrements liés.
+index_notes: Dict[int, Registre] = {}
+index_absences: Dict[int, Registre] = {}
+notes_par_cours: Dict[int, Registre] = {}
+cours_par_enseignant: Dict[int, Registre] = {}
+
+# Collection -> (liste, index, champ indexé)
+COLLECTIONS = {
+    "etudiants": (etudiants, index_etudiants, "nom"),
+    "enseignants": (enseignants, index_enseignants, "nom"),
+    "cours": (cours, index_cours, "nom"),
+    "notes": (notes, index_notes, "etudiant_id"),
+    "absences": (absences, index_absences, "etudiant_id"),
+}
+
+# Collections nommées, auxquelles les autres se réfèrent par identifiant (notes et absences
+# ont aussi le leur, mais ne sont désignées que par l'historique et le journal)
+ENTITES = ("etudiants", "enseignants", "cours")
+
+# Clés étrangères autres que le champ indexé : collection -> (champ, liste d'adjacence)
+LIENS = {
+    "cours": ("enseignant_id", cours_par_enseignant),
+    "notes": ("cours_id", notes_par_cours),
+}
+
+# Collections référencées par chaque collection : lues avant elle
+REFERENCES = {
+    "cours": ("enseignants",),
+    "notes": ("etudiants", "cours"),
+    "absences": ("etudiants",),
+}
+
+# Effet d'une suppression sur les collections qui référencent l'enregistrement supprimé :
+# (collection, champ, liste d'adjacence, effet) ; "cascade" supprime les enregistrements
+# liés, "detacher" efface seulement leur référence (la note reste, sans cours).
+DEPENDANTS = {
+    "etudiants": (("notes", "etudiant_id", index_notes, "cascade"),
+                  ("absences", "etudiant_id", index_absences, "cascade")),
+    "cours": (("notes", "cours_id", notes_par_cours, "detacher"),),
+    "enseignants": (("cours", "enseignant_id", cours_par_enseignant, "detacher"),),
+}
+
+# Champ de référence -> collection référencée (présentée par son nom : "cours_id" -> "cours")
+CHAMPS_REFERENCES = {"etudiant_id": "etudiants", "cours_id": "cours", "enseignant_id": "enseignants"}
+
+# Prochain identifiant libre de chaque collection
+prochains_identifiants = {nom: 1 for nom in COLLECTIONS}
+
+# Index trié des dates d'ajout : dates_ajout[i] est la date de etudiants_par_date[i]
+dates_ajout: List[int] = []
+etudiants_par_date: List[Etudiant] = []
+
+# Absences de chaque étudiant (identifiant) en bits : le bit i est levé s'il était absent
+# le jour de classe de rang origine_absences + i
+bits_absences: Dict[int, int] = {}
+origine_absences: Optional[int] = None
+
+# Index de trigrammes des collections nommées, pour la recherche approchée par nom
+INDEX_APPROCHES = {nom: IndexApproche() for nom in ENTITES}
+
+# Titre de chaque collection dans les exports
+TITRES = {
+    "etudiants": "Étudiants",
+    "enseignants": "Enseignants",
+    "cours": "Cours",
+    "notes": "Notes",
+    "absences": "Absences",
+}
+
+# Type d'enregistrement de chaque collection
+TYPES = {
+    "etudiants": Etudiant,
+    "enseignants": Enseignant,
+    "cours": Cours,
+    "notes": Note,
+    "absences": Absence,
+}
+
+# Colonnes persistées pour chaque collection
+COLONNES = {
+    "etudiants": ("id", "nom", "date_ajout"),
+    "enseignants": ("id", "nom"),
+    "cours": ("id", "nom", "enseignant_id"),
+    "notes": ("id", "etudiant_id", "note", "cours_id"),
+    "absences": ("id", "etudiant_id", "date"),
+}
+
+# Champs présentés (exports, import, API) : les références y sont désignées par leur nom
+CHAMPS_LISIBLES = {
+    "etudiants": ("nom", "date_ajout"),
+    "enseignants": ("nom",),
+    "cours": ("nom", "enseignant"),
+    "notes": ("etudiant", "note", "cours"),
+    "absences": ("etudiant", "date"),
+}
+
+# Format des données sauvegardées : 2 depuis les identifiants, 3 depuis ceux des notes et
+# des absences. Les données plus anciennes, où notes, absences et cours désignaient
+# l'étudiant ou le cours par son nom, sont converties au chargement (migrer_donnees,
+# convertir_operation).
+VERSION_DONNEES = 3
+
+# Numéro de la dernière opération appliquée et opérations non encore sauvegardées
+sequence = 0
+operations_en_attente: List[Dict[str, Any]] = []
+
+# Collections pas encore lues depuis le stockage -> opérations du journal à leur appliquer
+collections_differees: Dict[str, List[Dict[str, Any]]] = {}
+# Vrai tant que charger_donnees est reporté au premier accès aux données (differer_chargement)
+chargement_differe = False
+
+# Historique de la session (menu, --batch) : chaque opération avec celles qui l'annulent,
+# calculées avant de l'appliquer à partir des seuls enregistrements qu'elle touche. Un
+# instantané nommé n'est qu'une position dans cet historique : le prendre ne copie rien,
+# le restaurer annule ou rétablit les opérations qui l'en séparent.
+historique_actif = False
+historique: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+# Opérations annulées, la dernière annulée en dernier ; une nouvelle modification les oublie
+retablissements: List[Dict[str, Any]] = []
+instantanes_nommes: Dict[str, int] = {}
+
+def cle_nom(nom: Any) -> Any:
+    """Clé d'index : insensible à la casse pour un nom, l'identifiant lui-même pour une référence."""
+    return nom.lower() if isinstance(nom, str) else nom
+
+def indexer(index: Dict[Any, Registre], nom: Any, enregistrement: Enregistrement) -> None:
+    """Ajoute un enregistrement à l'index sous le nom donné."""
+    cle = cle_nom(nom)
+    entrees = index.get(cle)
+    if entrees is None:
+        entrees = index[cle] = Registre()
+    entrees.append(enregistrement)
+
+def desindexer(index: Dict[Any, Registre], nom: Any, enregistrement: Enregistrement) -> None:
+    """Retire un enregistrement de l'index sous le nom donné, en temps constant."""
+    cle = cle_nom(nom)
+    entrees = index.get(cle)
+    if entrees is None:
+        return
+    entrees.discard(enregistrement)
+    if not entrees:
+        del index[cle]
+
+def trouver(index: Dict[Any, Registre], nom: Any, champ: str = "nom",
+            filtre: Optional[Dict[str, Any]] = None) -> Any:
+    """Retourne le premier enregistrement dont le champ vaut exactement `nom`
+    (et dont les champs de `filtre` ont les valeurs données, au format persisté)."""
+    for enregistrement in index.get(cle_nom(nom), ()):
+        if getattr(enregistrement, champ) == nom and \
+                (not filtre or all(enregistrement.vers_dict().get(c) == v for c, v in filtre.items())):
+            return enregistrement
+    return None
+
+def reference(nom: str, valeur: str) -> Optional[int]:
+    """Identifiant du premier enregistrement de la collection portant exactement ce nom, ou None."""
+    enregistrement = trouver(COLLECTIONS[nom][1], valeur)
+    return None if enregistrement is None else enregistrement.id
+
+def nom_de(nom: str, identifiant: Optional[int]) -> Optional[str]:
+    """Nom de l'enregistrement de la collection qui porte cet identifiant, ou None."""
+    if identifiant is None:
+        return None
+    enregistrement = COLLECTIONS[nom][0].obtenir(identifiant)
+    if enregistrement is not None:
+        return enregistrement.nom
+    if interrogeable(nom):
+        data = next(stockage.selectionner(nom, {"id": identifiant}), None)
+        return None if data is None else data["nom"]
+    return None
+
+def lisible(enregistrement: Enregistrement) -> Dict[str, Any]:
+    """Enregistrement tel qu'il est présenté (listes, exports, API) : ses références par nom."""
+    return {champ.removesuffix("_id"): nom_de(CHAMPS_REFERENCES[champ], valeur)
+            if champ in CHAMPS_REFERENCES else valeur
+            for champ, valeur in enregistrement.vers_dict().items()}
+
+def lier(nom: str, enregistrement: Enregistrement) -> None:
+    """Inscrit un enregistrement dans la liste d'adjacence de sa clé étrangère (LIENS)."""
+    champ, adjacence = LIENS[nom]
+    valeur = getattr(enregistrement, champ)
+    if valeur is None:
+        return
+    lies = adjacence.get(valeur)
+    if lies is None:
+        lies = adjacence[valeur] = Registre()
+    lies.append(enregistrement)
+
+def delier(nom: str, enregistrement: Enregistrement) -> None:
+    """Retire un enregistrement de la liste d'adjacence de sa clé étrangère (LIENS)."""
+    champ, adjacence = LIENS[nom]
+    valeur = getattr(enregistrement, champ)
+    lies = adjacence.get(valeur)
+    if lies is None:
+        return
+    lies.remove(enregistrement)
+    if not lies:
+        del adjacence[valeur]
+
+def indexer_date(etudiant: Etudiant) -> None:
+    """Insère un étudiant dans l'index trié des dates d'ajout."""
+    if etudiant.date_ajout is None:
+        return
+    position = bisect.bisect_right(dates_ajout, etudiant.date_ajout)
+    dates_ajout.insert(position, etudiant.date_ajout)
+    etudiants_par_date.insert(position, etudiant)
+
+def indexer_dates(nouveaux: List[Etudiant]) -> None:
+    """Ajoute un lot d'étudiants à l'index des dates d'ajout en un seul tri, plutôt qu'une
+    insertion au milieu des listes par étudiant (quadratique sur un import désordonné).
+    Le tri est stable : à date égale, les nouveaux suivent les anciens, comme avec indexer_date."""
+    dates = [etudiant for etudiant in nouveaux if etudiant.date_ajout is not None]
+    if not dates:
+        return
+    etudiants_par_date.extend(dates)
+    # L'index déjà trié suivi du lot : le tri fusionne les deux suites
+    etudiants_par_date.sort(key=attrgetter("date_ajout"))
+    dates_ajout[:] = [etudiant.date_ajout for etudiant in etudiants_par_date]
+
+def desindexer_date(etudiant: Etudiant) -> None:
+    """Retire un étudiant de l'index trié des dates d'ajout."""
+    if etudiant.date_ajout is None:
+        return
+    debut = bisect.bisect_left(dates_ajout, etudiant.date_ajout)
+    fin = bisect.bisect_right(dates_ajout, etudiant.date_ajout, debut)
+    for position in range(debut, fin):
+        if etudiants_par_date[position] is etudiant:
+            del dates_ajout[position]
+            del etudiants_par_date[position]
+            return
+
+@mesure("rechercher par date")
+def etudiants_entre(debut: int, fin: int) -> List[Etudiant]:
+    """Étudiants ajoutés entre `debut` (inclus) et `fin` (exclu), triés par date."""
+    if interrogeable("etudiants"):
+        resultats = list(map(Etudiant.depuis_dict, stockage.etudiants_entre(formater_date(debut), formater_date(fin))))
+        compter_parcourus(len(resultats))
+        return resultats
+    exiger("etudiants")
+    resultats = etudiants_par_date[bisect.bisect_left(dates_ajout, debut):bisect.bisect_left(dates_ajout, fin)]
+    compter_parcourus(len(resultats))
+    return resultats
+
+def marquer_absence(etudiant_id: int, date: str) -> None:
+    """Lève le bit du jour d'absence ; les dates illisibles des anciennes données sont ignorées."""
+    global origine_absences
+    try:
+        rang = jour_de_classe(date)
+    except ValueError:
+        return
+    if origine_absences is None:
+        origine_absences = rang
+    elif rang < origine_absences:
+        # Absence antérieure à toutes les autres : tous les bits sont décalés (rare)
+        decalage = origine_absences - rang
+        for autre in bits_absences:
+            bits_absences[autre] <<= decalage
+        origine_absences = rang
+    bits_absences[etudiant_id] = bits_absences.get(etudiant_id, 0) | 1 << (rang - origine_absences)
+
+def recalculer_absences(etudiant_id: int) -> None:
+    """Recalcule les bits d'un étudiant depuis ses absences (après modification ou suppression)."""
+    bits_absences.pop(etudiant_id, None)
+    for absence in index_absences.get(etudiant_id, ()):
+        marquer_absence(etudiant_id, absence.date)
+
+def reconstruire_absences() -> None:
+    global origine_absences
+    bits_absences.clear()
+    origine_absences = None
+    for absence in absences:
+        marquer_absence(absence.etudiant_id, absence.date)
+
+def absent_le(etudiant_id: int, date: str) -> bool:
+    """L'étudiant était-il absent ce jour-là ? Un test de bit, sans parcourir les absences."""
+    rang = jour_de_classe(date) - (origine_absences or 0)
+    return rang >= 0 and bool(bits_absences.get(etudiant_id, 0) >> rang & 1)
+
+def compter_absences(etudiant_id: int, debut: str, fin: str) -> int:
+    """Nombre d'absences d'un étudiant entre deux dates incluses."""
+    origine = origine_absences or 0
+    premier = max(rang_de_classe(debut) - origine, 0)
+    dernier = rang_de_classe(fin, fin=True) - origine
+    if dernier < premier:
+        return 0
+    return (bits_absences.get(etudiant_id, 0) >> premier & (1 << (dernier - premier + 1)) - 1).bit_count()
+
+def synchroniser_approche(nom: str, valeur: str) -> None:
+    """Reporte dans l'index approché l'apparition ou la disparition d'un nom de l'index exact."""
+    approche = INDEX_APPROCHES.get(nom)
+    if approche is not None and approche.construit:
+        cle = cle_nom(valeur)
+        if cle in COLLECTIONS[nom][1]:
+            approche.ajouter(cle)
+        else:
+            approche.retirer(cle)
+
+def reconstruire_index(nom: str) -> None:
+    """Reconstruit l'index d'une collection à partir de sa liste en mémoire."""
+    collection, index, champ = COLLECTIONS[nom]
+    index.clear()
+    if nom in INDEX_APPROCHES:
+        INDEX_APPROCHES[nom].vider()
+    for enregistrement in collection:
+        indexer(index, getattr(enregistrement, champ), enregistrement)
+    if nom in LIENS:
+        LIENS[nom][1].clear()
+        for enregistrement in collection:
+            lier(nom, enregistrement)
+    if nom in prochains_identifiants:
+        prochains_identifiants[nom] = max((enregistrement.id for enregistrement in collection), default=0) + 1
+    if nom == "absences":
+        reconstruire_absences()
+    if nom == "etudiants":
+        etudiants_par_date[:] = sorted((e for e in collection if e.date_ajout is not None),
+                                       key=lambda e: e.date_ajout)
+        dates_ajout[:] = [e.date_ajout for e in etudiants_par_date]
+
+def cible(operation: Dict[str, Any]) -> Any:
+    """Enregistrement visé par une modification ou une suppression : celui de l'identifiant
+    "id", ou dans les anciens journaux le premier dont le champ indexé vaut "cle" (et qui
+    correspond au "filtre")."""
+    collection, index, champ = COLLECTIONS[operation["collection"]]
+    if "id" in operation:
+        return collection.obtenir(operation["id"])
+    return trouver(index, operation["cle"], champ, operation.get("filtre"))
+
+def appliquer_operation(operation: Dict[str, Any]) -> None:
+    """Applique une opération (ajouter, importer, modifier, supprimer) aux listes et aux index.
+
+    Les collections qui référencent un enregistrement supprimé sont mises à jour à part
+    (repercuter_suppression), pour pouvoir l'être plus tard si elles ne sont pas encore lues.
+    """
+    nom = operation["collection"]
+    collection, index, champ = COLLECTIONS[nom]
+    if operation["op"] == "importer":
+        # Ajout en masse : mêmes effets qu'une suite d'ajouts, sans le coût par opération
+        nouveaux = list(map(TYPES[nom].depuis_dict, operation["enregistrements"]))
+        collection.extend(nouveaux)
+        for enregistrement in nouveaux:
+            indexer(index, getattr(enregistrement, champ), enregistrement)
+        if nom in LIENS:
+            for enregistrement in nouveaux:
+                lier(nom, enregistrement)
+        # L'index approché sera reconstruit d'un bloc à la prochaine recherche
+        if nom in INDEX_APPROCHES:
+            INDEX_APPROCHES[nom].vider()
+        if nom == "etudiants":
+            indexer_dates(nouveaux)
+        elif nom == "absences":
+            for enregistrement in nouveaux:
+                marquer_absence(enregistrement.etudiant_id, enregistrement.date)
+        return
+    if operation["op"] == "ajouter":
+        enregistrement = TYPES[nom].depuis_dict(operation["enregistrement"])
+        collection.append(enregistrement)
+        indexer(index, getattr(enregistrement, champ), enregistrement)
+        if nom in LIENS:
+            lier(nom, enregistrement)
+        synchroniser_approche(nom, getattr(enregistrement, champ))
+        if nom == "etudiants":
+            indexer_date(enregistrement)
+        elif nom == "absences":
+            marquer_absence(enregistrement.etudiant_id, enregistrement.date)
+        return
+    enregistrement = cible(operation)
+    if enregistrement is None:
+        return
+    if nom == "absences":
+        ancien_etudiant = enregistrement.etudiant_id
+    if operation["op"] == "modifier":
+        if operation["champ"] == champ:
+            ancien = getattr(enregistrement, champ)
+            desindexer(index, ancien, enregistrement)
+            enregistrement.affecter(champ, operation["valeur"])
+            indexer(index, getattr(enregistrement, champ), enregistrement)
+            synchroniser_approche(nom, ancien)
+            synchroniser_approche(nom, getattr(enregistrement, champ))
+        elif nom in LIENS and operation["champ"] == LIENS[nom][0]:
+            delier(nom, enregistrement)
+            enregistrement.affecter(operation["champ"], operation["valeur"])
+            lier(nom, enregistrement)
+        else:
+            enregistrement.affecter(operation["champ"], operation["valeur"])
+    elif operation["op"] == "supprimer":
+        desindexer(index, getattr(enregistrement, champ), enregistrement)
+        synchroniser_approche(nom, getattr(enregistrement, champ))
+        collection.remove(enregistrement)
+        if nom in LIENS:
+            delier(nom, enregistrement)
+        if nom == "etudiants":
+            desindexer_date(enregistrement)
+    if nom == "absences":
+        recalculer_absences(ancien_etudiant)
+        if enregistrement.etudiant_id != ancien_etudiant:
+            recalculer_absences(enregistrement.etudiant_id)
+
+def repercuter(nom: str, champ: str, adjacence: Dict[int, Any], effet: str, identifiant: int) -> None:
+    """Applique à la collection `nom` la suppression de l'enregistrement `identifiant`
+    qu'elle référence par `champ` : seuls les enregistrements liés sont touchés."""
+    lies = adjacence.pop(identifiant, ())
+    if effet == "detacher":
+        for enregistrement in lies:
+            setattr(enregistrement, champ, None)
+        return
+    collection = COLLECTIONS[nom][0]
+    for enregistrement in lies:
+        collection.remove(enregistrement)
+        if nom in LIENS:
+            delier(nom, enregistrement)
+    if nom == "absences":
+        bits_absences.pop(identifiant, None)
+
+def repercuter_suppression(operation: Dict[str, Any]) -> None:
+    """Reporte une suppression sur les collections qui référencent l'enregistrement supprimé :
+    tout de suite si elles sont en mémoire, sinon quand elles seront lues."""
+    for nom, champ, adjacence, effet in DEPENDANTS.get(operation["collection"], ()):
+        if nom in collections_differees:
+            collections_differees[nom].append(operation)
+        else:
+            repercuter(nom, champ, adjacence, effet, operation["id"])
+
+def attribuer_identifiants(operation: Dict[str, Any]) -> None:
+    """Complète une opération : un identifiant pour chaque enregistrement ajouté qui n'en a
+    pas, celui de l'enregistrement visé pour une modification ou une suppression qui le
+    désigne par son nom ou son étudiant (anciens journaux). Écrits dans l'opération, ils
+    sont journalisés avec elle et retrouvés à l'identique au prochain chargement."""
+    nom = operation["collection"]
+    if operation["op"] in ("ajouter", "importer"):
+        prochain = prochains_identifiants[nom]
+        nouveaux = operation["enregistrements"] if operation["op"] == "importer" else (operation["enregistrement"],)
+        for enregistrement in nouveaux:
+            if "id" not in enregistrement:
+                enregistrement["id"] = prochain
+            prochain = max(prochain, enregistrement["id"] + 1)
+        prochains_identifiants[nom] = prochain
+    elif "id" not in operation:
+        enregistrement = cible(operation)
+        if enregistrement is not None:
+            operation["id"] = enregistrement.id
+
+def convertir_enregistrement(data: Dict[str, Any],
+                             identifiant: Callable[[str, str], Optional[int]]) -> Optional[Dict[str, Any]]:
+    """Note ou absence d'avant les identifiants ({"etudiant": nom, "cours": nom...}) au format
+    actuel, `identifiant(collection, nom)` résolvant les noms ; None si l'étudiant n'existe pas."""
+    etudiant_id = identifiant("etudiants", data["etudiant"])
+    if etudiant_id is None:
+        return None
+    resultat = {"etudiant_id": etudiant_id}
+    for champ, valeur in data.items():
+        if champ == "cours":
+            cours_id = identifiant("cours", valeur) if valeur else None
+            if cours_id is not None:
+                resultat["cours_id"] = cours_id
+        elif champ != "etudiant":
+            resultat[champ] = valeur
+    return resultat
+
+def operation_ancienne(operation: Dict[str, Any]) -> bool:
+    """Vrai pour une opération d'un journal d'avant les identifiants (références par nom)."""
+    if operation["op"] in ("ajouter", "importer"):
+        nouveaux = operation["enregistrements"] if operation["op"] == "importer" else (operation["enregistrement"],)
+        if operation["collection"] in ENTITES:
+            return any("id" not in enregistrement for enregistrement in nouveaux)
+        return any("etudiant" in enregistrement for enregistrement in nouveaux)
+    if operation["collection"] in ENTITES:
+        return "id" not in operation
+    return isinstance(operation.get("cle"), str)
+
+def convertir_operation(operation: Dict[str, Any]) -> bool:
+    """Traduit en identifiants les noms d'une opération ancienne sur les notes ou les absences.
+
+    Faux si elle visait un étudiant qui n'existe plus : elle est alors ignorée, comme ses
+    enregistrements orphelins l'étaient déjà par les menus.
+    """
+    if operation["op"] == "ajouter":
+        enregistrement = convertir_enregistrement(operation["enregistrement"], reference)
+        if enregistrement is None:
+            return False
+        operation["enregistrement"] = enregistrement
+        return True
+    if operation["op"] == "importer":
+        operation["enregistrements"] = [enregistrement for enregistrement in
+                                        (convertir_enregistrement(data, reference)
+                                         for data in operation["enregistrements"])
+                                        if enregistrement is not None]
+        return True
+    operation["cle"] = reference("etudiants", operation["cle"])
+    if operation.get("champ") in ("etudiant", "cours"):
+        collection = "etudiants" if operation["champ"] == "etudiant" else "cours"
+        operation["champ"] += "_id"
+        operation["valeur"] = reference(collection, operation["valeur"]) if operation["valeur"] else None
+        if operation["champ"] == "etudiant_id" and operation["valeur"] is None:
+            return False
+    return operation["cle"] is not None
+
+def migrer_donnees(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convertit un instantané d'un format ancien au format actuel.
+
+    Chaque enregistrement reçoit un identifiant (le sien s'il en a déjà un, sinon son rang).
+    Avant la version 2, les notes et absences d'étudiants qui n'existent plus, orphelines
+    depuis leur suppression ou leur renommage, sont écartées.
+    """
+    if data.get("version", 1) < 2:
+        data = convertir_references(data)
+    resultat: Dict[str, Any] = {"sequence": data.get("sequence", 0), "version": VERSION_DONNEES}
+    for nom in COLONNES:
+        resultat[nom] = [{"id": rang, **enregistrement} for rang, enregistrement in enumerate(data.get(nom, []), 1)]
+    return resultat
+
+def convertir_references(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Instantané d'avant les identifiants au format 2 : les noms des notes, absences et cours
+    deviennent les identifiants des étudiants, cours et enseignants qui les portent."""
+    resultat: Dict[str, Any] = {"sequence": data.get("sequence", 0), "version": 2}
+    par_nom: Dict[str, Dict[str, int]] = {}
+    for nom in ENTITES:
+        resultat[nom] = [{"id": rang, **enregistrement} for rang, enregistrement in enumerate(data.get(nom, []), 1)]
+        par_nom[nom] = {}
+        for enregistrement in resultat[nom]:
+            par_nom[nom].setdefault(enregistrement["nom"], enregistrement["id"])
+
+    def identifiant(collection: str, valeur: str) -> Optional[int]:
+        return par_nom[collection].get(valeur)
+
+    ecartes = 0
+    for nom in ("notes", "absences"):
+        resultat[nom] = []
+        for enregistrement in data.get(nom, []):
+            converti = convertir_enregistrement(enregistrement, identifiant)
+            if converti is None:
+                ecartes += 1
+            else:
+                resultat[nom].append(converti)
+    if ecartes:
+        print(JAUNE + f"{ecartes} notes ou absences d'étudiants qui n'existent plus ont été écartées." + NORMAL)
+    return resultat
+
+def taille_operation(operation: Dict[str, Any]) -> int:
+    """Nombre d'enregistrements touchés par une opération (un import en ajoute plusieurs)."""
+    return len(operation["enregistrements"]) if operation["op"] == "importer" else 1
+
+def executer(operation: Dict[str, Any], historiser: bool = True) -> None:
+    """Applique une opération et la met en attente d'écriture dans le journal.
+
+    Si l'historique est actif, l'opération y est ajoutée avec ses opérations inverses
+    (sauf avec `historiser=False`, pour les opérations qui annulent ou rétablissent).
+    """
+    global sequence
+    nom = operation["collection"]
+    historiser = historique_actif and historiser
+    with mesurer(operation["op"], nom):
+        # Sans historique à tenir, une opération qui désigne son enregistrement par identifiant
+        # n'a pas besoin de la collection : elle lui sera appliquée si elle est lue un jour
+        differee = not historiser and "cle" not in operation and differable(nom)
+        if not differee:
+            exiger(nom)
+        attribuer_identifiants(operation)
+        inverses = inverser(operation) if historiser else None
+        if differee:
+            collections_differees[nom].append(operation)
+        else:
+            appliquer_operation(operation)
+        if operation["op"] == "supprimer" and "id" in operation:
+            repercuter_suppression(operation)
+        sequence += 1
+        operation["seq"] = sequence
+        operations_en_attente.append(operation)
+    if inverses is not None:
+        # Une nouvelle modification rend impossibles les rétablissements en attente
+        retablissements.clear()
+        for nom, position in list(instantanes_nommes.items()):
+            if position > len(historique):
+                del instantanes_nommes[nom]
+        historique.append((operation, inverses))
+
+def inverser(operation: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Opérations qui annulent `operation`, calculées juste avant de l'appliquer.
+
+    Seuls les enregistrements touchés sont copiés : pour une suppression, celui qui est
+    supprimé et ceux qu'elle supprime ou détache par répercussion. Les inverses les
+    désignent par leur identifiant : parmi des notes ou absences identiques, c'est bien
+    celle qui a été touchée qui est rétablie.
+    """
+    nom = operation["collection"]
+    if operation["op"] in ("ajouter", "importer"):
+        nouveaux = operation["enregistrements"] if operation["op"] == "importer" else (operation["enregistrement"],)
+        return [{"op": "supprimer", "collection": nom, "id": data["id"]} for data in reversed(nouveaux)]
+    enregistrement = cible(operation)
+    if enregistrement is None:
+        return []
+    ancien = enregistrement.vers_dict()
+    if operation["op"] == "modifier":
+        champ = operation["champ"]
+        return [{"op": "modifier", "collection": nom, "id": enregistrement.id,
+                 "champ": champ, "valeur": ancien.get(champ)}]
+    inverses = [{"op": "ajouter", "collection": nom, "enregistrement": ancien}]
+    if "id" in operation:
+        for dependant, champ, adjacence, effet in DEPENDANTS.get(nom, ()):
+            # Les enregistrements liés doivent être en mémoire pour être copiés
+            exiger(dependant)
+            lies = [lie.vers_dict() for lie in adjacence.get(enregistrement.id, ())]
+            if effet == "cascade" and lies:
+                inverses.append({"op": "importer", "collection": dependant, "enregistrements": lies})
+            elif effet == "detacher":
+                inverses.extend({"op": "modifier", "collection": dependant, "id": lie["id"],
+                                 "champ": champ, "valeur": enregistrement.id} for lie in lies)
+    return inverses
+
+def annuler_derniere() -> Optional[Dict[str, Any]]:
+    """Annule la dernière opération de l'historique ; la renvoie, ou None s'il est vide."""
+    if not historique:
+        return None
+    operation, inverses = historique.pop()
+    for inverse in inverses:
+        executer(inverse, historiser=False)
+    retablissements.append(operation)
+    return operation
+
+def retablir_derniere() -> Optional[Dict[str, Any]]:
+    """Rétablit la dernière opération annulée ; la renvoie, ou None s'il n'y en a pas."""
+    if not retablissements:
+        return None
+    operation = {cle: valeur for cle, valeur in retablissements.pop().items() if cle != "seq"}
+    exiger(operation["collection"])
+    inverses = inverser(operation)
+    executer(operation, historiser=False)
+    historique.append((operation, inverses))
+    return operation
+
+def exiger(*noms: str) -> None:
+    """Lit depuis le stockage les collections qui ne sont pas encore en mémoire
+    (et avant chacune, les collections qu'elle référence)."""
+    if chargement_differe and noms:
+        charger_donnees()
+    for nom in noms:
+        operations = collections_differees.pop(nom, None)
+        if operations is None:
+            continue
+        exiger(*REFERENCES.get(nom, ()))
+        with mesurer("lire", nom):
+            collection = COLLECTIONS[nom][0]
+            collection[:] = map(TYPES[nom].depuis_dict, stockage.iterer(nom))
+            reconstruire_index(nom)
+            for operation in operations:
+                if operation["collection"] != nom:
+                    # Suppression d'un enregistrement référencé, reportée jusqu'ici
+                    for dependant, champ, adjacence, effet in DEPENDANTS[operation["collection"]]:
+                        if dependant == nom and "id" in operation:
+                            repercuter(nom, champ, adjacence, effet, operation["id"])
+                    continue
+                if nom not in ENTITES and operation_ancienne(operation) and not convertir_operation(operation):
+                    continue
+                attribuer_identifiants(operation)
+                appliquer_operation(operation)
+            compter_parcourus(len(collection) + len(operations))
+
+def parcourir(nom: str) -> Iterable[Any]:
+    """Parcourt une collection, en flux depuis le stockage si elle n'est pas en mémoire."""
+    if chargement_differe:
+        charger_donnees()
+    # Les références sont présentées par leur nom : les collections référencées sont lues
+    exiger(*REFERENCES.get(nom, ()))
+    if collections_differees.get(nom) == []:
+        flux = map(TYPES[nom].depuis_dict, stockage.iterer(nom))
+        return flux_compte(flux) if profil_actif else flux
+    exiger(nom)
+    compter_parcourus(len(COLLECTIONS[nom][0]))
+    return COLLECTIONS[nom][0]
+
+def compter(nom: str) -> int:
+    """Nombre d'enregistrements d'une collection, sans la charger si possible."""
+    if chargement_differe:
+        charger_donnees()
+    if collections_differees.get(nom) == []:
+        return stockage.compter(nom)
+    exiger(nom)
+    return len(COLLECTIONS[nom][0])
+
+def differable(nom: str) -> bool:
+    """Vrai si la collection n'est pas en mémoire et que le stockage sait l'interroger (SQLite) :
+    les opérations qui désignent leurs enregistrements par identifiant lui sont appliquées
+    à sa lecture, sans la lire pour autant."""
+    if chargement_differe:
+        charger_donnees()
+    return getattr(stockage, "requetes", False) and nom in collections_differees
+
+def interrogeable(nom: str) -> bool:
+    """Vrai si la collection peut être interrogée dans le stockage par requêtes indexées,
+    plutôt que chargée : elle n'est pas en mémoire et aucune modification ne l'attend."""
+    return differable(nom) and not collections_differees[nom]
+
+def chercher(nom: str, valeur: Any, filtre: Optional[Dict[str, Any]] = None) -> Any:
+    """Premier enregistrement dont le champ indexé vaut exactement `valeur` (et qui correspond
+    au `filtre`), comme trouver() : par une requête indexée si la collection est interrogeable,
+    sinon dans son index en mémoire. None s'il n'y en a pas."""
+    _, index, champ = COLLECTIONS[nom]
+    if interrogeable(nom):
+        data = next(stockage.selectionner(nom, {champ: valeur, **(filtre or {})}, limite=1), None)
+        return None if data is None else TYPES[nom].depuis_dict(data)
+    exiger(nom)
+    return trouver(index, valeur, champ, filtre)
+
+def existe(nom: str, valeur: str) -> bool:
+    """Vrai si un enregistrement de la collection porte ce nom, sans tenir compte de la casse."""
+    cle = cle_nom(valeur)
+    if interrogeable(nom):
+        return any(cle_nom(data["nom"]) == cle for data in stockage.homonymes(nom, valeur))
+    exiger(nom)
+    return cle in COLLECTIONS[nom][1]
+
+def lies(nom: str, champ: str, identifiant: int) -> List[Any]:
+    """Enregistrements de la collection qui référencent `identifiant` par `champ` : sa liste
+    d'adjacence, ou une requête indexée si la collection est interrogeable."""
+    if interrogeable(nom):
+        return [TYPES[nom].depuis_dict(data) for data in stockage.selectionner(nom, {champ: identifiant})]
+    exiger(nom)
+    _, index, champ_index = COLLECTIONS[nom]
+    adjacence = index if champ == champ_index else LIENS[nom][1]
+    return list(adjacence.get(identifiant, ()))
+
+def instantane() -> Dict[str, Any]:
+    """Retourne l'état complet des collections en mémoire, au format JSON des fichiers."""
+    exiger(*COLLECTIONS)
+    data: Dict[str, Any] = {"sequence": sequence, "version": VERSION_DONNEES}
+    for nom, (collection, index, champ) in COLLECTIONS.items():
+        data[nom] = [enregistrement.vers_dict() for enregistrement in collection]
+        compter_parcourus(len(collection))
+    return data
+
+# Dossier des fichiers de données et d'export de l'école choisie ("" : le dossier courant)
+ecole_choisie: Optional[str] = None
+dossier_donnees = ""
+
+def chemin(fichier: str) -> str:
+    """Chemin d'un fichier de données ou d'export dans le dossier de l'école choisie."""
+    return os.path.join(dossier_donnees, fichier)
+
+def choisir_ecole(nom: Optional[str]) -> None:
+    """Sélectionne l'école dont les données sont lues et écrites (ECOLES_DIR/nom), ou sans
+    nom l'installation d'une seule école du dossier courant. À appeler avant choisir_stockage."""
+    global ecole_choisie, dossier_donnees
+    if nom is None:
+        ecole_choisie, dossier_donnees = None, ""
+        return
+    if nom in ("", ".", "..", TOUTES_ECOLES, FUSION_DIR) or os.sep in nom or (os.altsep and os.altsep in nom):
+        raise ValueError(f"Nom d'école invalide : '{nom}'.")
+    ecole_choisie, dossier_donnees = nom, os.path.join(ECOLES_DIR, nom)
+    if not os.path.isdir(dossier_donnees):
+        os.makedirs(dossier_donnees)
+        print(JAUNE + f"École '{nom}' créée dans '{dossier_donnees}'." + NORMAL)
+
+def lister_ecoles() -> List[str]:
+    """Écoles existantes, par ordre alphabétique."""
+    try:
+        return sorted(entree.name for entree in os.scandir(ECOLES_DIR)
+                      if entree.is_dir() and entree.name != FUSION_DIR)
+    except FileNotFoundError:
+        return []
+
+class StockageJSON:
+    """Instantané DATA_JSON complété par le journal JOURNAL_FILE."""
+
+    # Les collections sont lues en entier à l'ouverture
+    paresseux = False
+
+    def __init__(self, lecture_seule: bool = False) -> None:
+        # Nombre d'enregistrements touchés par les opérations déjà présentes dans le journal
+        self.operations_journalisees = 0
+        self.donnees: Dict[str, Any] = {}
+        # Vrai si l'instantané ouvert était d'un format ancien, converti en mémoire
+        self.migre = False
+        # Lecture seule (processus de travail) : rien n'est créé, converti ni réparé sur disque
+        self.lecture_seule = lecture_seule
+
+    def ouvrir(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """Retourne la séquence de l'instantané et les opérations du journal postérieures."""
+        self.donnees = charger_donnees_fichier(chemin(DATA_JSON))
+        self.migre = bool(self.donnees) and self.donnees.get("version", 1) < VERSION_DONNEES
+        if self.migre:
+            self.donnees = migrer_donnees(self.donnees)
+        depuis = self.donnees.get("sequence", 0)
+        return depuis, self.lire_journal(depuis)
+
+    def lire_journal(self, depuis: int) -> List[Dict[str, Any]]:
+        """Retourne les opérations du journal postérieures à la séquence `depuis`."""
+        operations = []
+        self.operations_journalisees = 0
+        # Taille des lignes complètes : ce qui suit est retiré avant toute nouvelle écriture
+        taille_valide = 0
+        tronquee = False
+        try:
+            with open(chemin(JOURNAL_FILE), "r", newline="") as f:
+                for ligne in f:
+                    # Dernière ligne tronquée par un arrêt brutal pendant l'écriture
+                    tronquee = not ligne.endswith("\n")
+                    if not tronquee:
+                        try:
+                            operation = json.loads(ligne)
+                        except ValueError:
+                            tronquee = True
+                    if tronquee:
+                        break
+                    taille_valide += len(ligne.encode())
+                    self.operations_journalisees += taille_operation(operation)
+                    if operation["seq"] > depuis:
+                        operations.append(operation)
+        except FileNotFoundError:
+            pass
+        if tronquee and not self.lecture_seule:
+            # Sinon la prochaine opération serait écrite à sa suite, et perdue avec elle
+            os.truncate(chemin(JOURNAL_FILE), taille_valide)
+        return operations
+
+    def iterer(self, nom: str) -> Iterator[Dict[str, Any]]:
+        # Chaque collection n'est lue qu'une fois : la mémoire est rendue après l'ouverture
+        return iter(self.donnees.pop(nom, []))
+
+    def compter(self, nom: str) -> int:
+        return len(self.donnees.get(nom, []))
+
+    def ecrire(self, operations: List[Dict[str, Any]]) -> None:
+        """Ajoute les opérations à la fin du journal et force leur écriture sur disque."""
+        if not operations:
+            return
+        with open(chemin(JOURNAL_FILE), "a") as f:
+            f.writelines(json.dumps(operation) + "\n" for operation in operations)
+            f.flush()
+            os.fsync(f.fileno())
+        self.operations_journalisees += sum(map(taille_operation, operations))
+
+    def a_compacter(self, en_attente: int) -> bool:
+        """Vrai si le journal atteindrait SEUIL_COMPACTION avec les opérations en attente."""
+        return self.operations_journalisees + en_attente >= SEUIL_COMPACTION
+
+    def compacter(self, data: Dict[str, Any]) -> None:
+        """Écrit un instantané complet dans DATA_JSON puis vide le journal."""
+        sauvegarder_donnees_fichier(chemin(DATA_JSON), data)
+        self.migre = False
+        self.vider_journal()
+
+    def fermer(self) -> None:
+        """Rien à fermer : les fichiers ne restent pas ouverts entre deux lectures."""
+
+    def vider_journal(self) -> None:
+        # L'instantané porte son numéro de séquence : si l'arrêt survient avant de vider
+        # le journal, les opérations déjà incluses seront ignorées au prochain chargement.
+        # Le journal vidé est écrit sur disque comme l'instantané : après un arrêt, on ne
+        # retrouve pas l'ancien journal à côté du nouvel instantané
+        with open(chemin(JOURNAL_FILE), "w") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        synchroniser_dossier(chemin(JOURNAL_FILE))
+        self.operations_journalisees = 0
+
+class StockageJSONL(StockageJSON):
+    """Instantané DATA_JSONL (un enregistrement par ligne) lu en flux, collection par collection.
+
+    La dernière ligne du fichier donne la séquence de l'instantané et, pour chaque
+    collection, la position de sa section et son nombre d'enregistrements.
+    """
+
+    paresseux = True
+
+    def __init__(self, lecture_seule: bool = False) -> None:
+        super().__init__(lecture_seule)
+        self.sections: Dict[str, List[int]] = {}
+        if not lecture_seule and not os.path.exists(chemin(DATA_JSONL)) and os.path.exists(chemin(DATA_JSON)):
+            migrer_depuis_json(self)
+
+    def ouvrir(self) -> Tuple[int, List[Dict[str, Any]]]:
+        try:
+            with open(chemin(DATA_JSONL), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 4096))
+                pied = json.loads(f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1])
+        except FileNotFoundError:
+            pied = {"sequence": 0, "sections": {}}
+        self.sections = pied["sections"]
+        self.migre = bool(self.sections) and pied.get("version", 1) < VERSION_DONNEES
+        if self.migre:
+            # Instantané d'un format ancien : converti en entier, puis lu en mémoire comme en JSON
+            self.donnees = migrer_donnees({"sequence": pied["sequence"], "version": pied.get("version", 1),
+                                           **{nom: list(self.lire_section(nom)) for nom in self.sections}})
+        return pied["sequence"], self.lire_journal(pied["sequence"])
+
+    def iterer(self, nom: str) -> Iterator[Dict[str, Any]]:
+        return super().iterer(nom) if self.migre else self.lire_section(nom)
+
+    def lire_section(self, nom: str) -> Iterator[Dict[str, Any]]:
+        if nom not in self.sections:
+            return
+        debut, fin, nombre = self.sections[nom]
+        with open(chemin(DATA_JSONL), "rb") as f:
+            f.seek(debut)
+            position = debut
+            for ligne in f:
+                position += len(ligne)
+                if position > fin:
+                    break
+                yield json.loads(ligne)
+
+    def compter(self, nom: str) -> int:
+        if self.migre:
+            return super().compter(nom)
+        return self.sections[nom][2] if nom in self.sections else 0
+
+    def compacter(self, data: Dict[str, Any]) -> None:
+        """Écrit un instantané complet dans DATA_JSONL puis vide le journal."""
+        sections = {}
+        tmp_path = chemin(DATA_JSONL) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for nom in COLONNES:
+                enregistrements = data.get(nom, [])
+                debut = f.tell()
+                f.writelines(json.dumps(enregistrement).encode() + b"\n" for enregistrement in enregistrements)
+                sections[nom] = [debut, f.tell(), len(enregistrements)]
+            f.write(json.dumps({"sequence": data["sequence"], "version": VERSION_DONNEES,
+                                "sections": sections}).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, chemin(DATA_JSONL))
+        synchroniser_dossier(chemin(DATA_JSONL))
+        self.sections = sections
+        self.migre = False
+        self.vider_journal()
+
+class StockageSQLite:
+    """Base SQLite : chaque opération sauvegardée devient une requête indexée.
+
+    Les références sont de vraies clés étrangères : supprimer un étudiant supprime ses notes
+    et absences (ON DELETE CASCADE), supprimer un cours ou un enseignant efface la référence.
+    Tant qu'une collection n'est pas en mémoire, on l'interroge par requêtes indexées
+    (interrogeable) : recherches exactes et sans casse par nom, préfixes et sous-chaînes
+    du nom normalisé (la fonction normaliser, déclarée à chaque connexion), dates d'ajout.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS etudiants (id INTEGER PRIMARY KEY, nom TEXT NOT NULL, date_ajout TEXT);
+        CREATE INDEX IF NOT EXISTS idx_etudiants_nom ON etudiants (nom);
+        CREATE INDEX IF NOT EXISTS idx_etudiants_normalise ON etudiants (normaliser(nom));
+        CREATE INDEX IF NOT EXISTS idx_etudiants_date_ajout ON etudiants (date_ajout);
+        CREATE TABLE IF NOT EXISTS enseignants (id INTEGER PRIMARY KEY, nom TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS idx_enseignants_nom ON enseignants (nom);
+        CREATE INDEX IF NOT EXISTS idx_enseignants_normalise ON enseignants (normaliser(nom));
+        CREATE TABLE IF NOT EXISTS cours (id INTEGER PRIMARY KEY, nom TEXT NOT NULL,
+            enseignant_id INTEGER REFERENCES enseignants (id) ON DELETE SET NULL);
+        CREATE INDEX IF NOT EXISTS idx_cours_nom ON cours (nom);
+        CREATE INDEX IF NOT EXISTS idx_cours_normalise ON cours (normaliser(nom));
+        CREATE INDEX IF NOT EXISTS idx_cours_enseignant ON cours (enseignant_id);
+        CREATE TABLE IF NOT EXISTS notes (id INTEGER PRIMARY KEY,
+            etudiant_id INTEGER NOT NULL REFERENCES etudiants (id) ON DELETE CASCADE, note TEXT,
+            cours_id INTEGER REFERENCES cours (id) ON DELETE SET NULL);
+        CREATE INDEX IF NOT EXISTS idx_notes_etudiant ON notes (etudiant_id);
+        CREATE INDEX IF NOT EXISTS idx_notes_cours ON notes (cours_id);
+        CREATE TABLE IF NOT EXISTS absences (id INTEGER PRIMARY KEY,
+            etudiant_id INTEGER NOT NULL REFERENCES etudiants (id) ON DELETE CASCADE, date TEXT);
+        CREATE INDEX IF NOT EXISTS idx_absences_etudiant ON absences (etudiant_id);
+        CREATE INDEX IF NOT EXISTS idx_absences_date ON absences (date);
+    """
+
+    paresseux = True
+    # Les collections pas encore lues sont interrogées par requêtes plutôt que chargées
+    requetes = True
+    # La conversion d'une base ancienne est faite (et écrite) dès l'ouverture
+    migre = False
+
+    def __init__(self, file_path: Optional[str] = None, lecture_seule: bool = False) -> None:
+        import sqlite3
+        file_path = file_path or chemin(DATA_DB)
+        nouvelle_base = not os.path.exists(file_path)
+        self.lecture_seule = lecture_seule
+        if lecture_seule:
+            # Base existante seulement (choisir_stockage) : mode=ro ne crée pas le fichier
+            self.connexion = sqlite3.connect(pathlib.Path(os.path.abspath(file_path)).as_uri() + "?mode=ro",
+                                             uri=True)
+        else:
+            self.connexion = sqlite3.connect(file_path)
+        self.connexion.execute("PRAGMA foreign_keys = ON")
+        # Utilisée par les index sur les noms normalisés : à déclarer avant toute écriture
+        self.connexion.create_function("normaliser", 1, normaliser, deterministic=True)
+        colonnes_notes = [ligne[1] for ligne in self.connexion.execute("PRAGMA table_info(notes)")]
+        if colonnes_notes and "etudiant_id" not in colonnes_notes:
+            if lecture_seule:
+                # Base d'un format ancien : convertie dans une copie en mémoire, pas sur disque
+                copie = sqlite3.connect(":memory:")
+                self.connexion.backup(copie)
+                self.connexion.close()
+                self.connexion = copie
+                self.connexion.execute("PRAGMA foreign_keys = ON")
+                self.connexion.create_function("normaliser", 1, normaliser, deterministic=True)
+            self.migrer_schema()
+        elif not lecture_seule:
+            self.connexion.executescript(self.SCHEMA)
+        if nouvelle_base and not lecture_seule and os.path.exists(chemin(DATA_JSON)):
+            migrer_depuis_json(self)
+
+    def migrer_schema(self) -> None:
+        """Convertit une base d'avant les identifiants, où notes et absences désignaient
+        l'étudiant (et le cours) par son nom, puis recrée les tables avec leurs clés étrangères."""
+        data: Dict[str, Any] = {}
+        for nom in COLONNES:
+            curseur = self.connexion.execute(f"SELECT * FROM {nom} ORDER BY id")
+            colonnes = [description[0] for description in curseur.description]
+            # Les étudiants, enseignants et cours gardent leur identifiant de ligne
+            data[nom] = [{colonne: valeur for colonne, valeur in zip(colonnes, ligne)
+                          if valeur is not None and (colonne != "id" or nom in ENTITES)}
+                         for ligne in curseur]
+        data = migrer_donnees(data)
+        self.connexion.executescript("".join(f"DROP TABLE {nom};" for nom in COLONNES) + self.SCHEMA)
+        self.compacter(data)
+        print(VERT + "Base SQLite convertie au nouveau format (identifiants et clés étrangères)." + NORMAL)
+
+    def ouvrir(self) -> Tuple[int, List[Dict[str, Any]]]:
+        return 0, []
+
+    def iterer(self, nom: str) -> Iterator[Dict[str, Any]]:
+        colonnes = COLONNES[nom]
+        curseur = self.connexion.execute(f"SELECT {', '.join(colonnes)} FROM {nom} ORDER BY id")
+        return (dict(zip(colonnes, ligne)) for ligne in curseur)
+
+    def compter(self, nom: str) -> int:
+        return self.connexion.execute(f"SELECT COUNT(*) FROM {nom}").fetchone()[0]
+
+    def prochain_identifiant(self, nom: str) -> int:
+        return self.connexion.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {nom}").fetchone()[0]
+
+    def selectionner(self, nom: str, valeurs: Dict[str, Any], limite: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Enregistrements dont les colonnes ont les valeurs données, par ordre d'identifiant."""
+        colonnes = COLONNES[nom]
+        conditions = " AND ".join(f"{colonne} IS NULL" if valeur is None else f"{colonne} = ?"
+                                  for colonne, valeur in valeurs.items())
+        requete = f"SELECT {', '.join(colonnes)} FROM {nom} WHERE {conditions} ORDER BY id"
+        if limite is not None:
+            requete += f" LIMIT {int(limite)}"
+        curseur = self.connexion.execute(requete, [valeur for valeur in valeurs.values() if valeur is not None])
+        return (dict(zip(colonnes, ligne)) for ligne in curseur)
+
+    def homonymes(self, nom: str, valeur: str) -> Iterator[Dict[str, Any]]:
+        """Enregistrements dont le nom a la même forme normalisée que `valeur`."""
+        colonnes = COLONNES[nom]
+        curseur = self.connexion.execute(f"SELECT {', '.join(colonnes)} FROM {nom} "
+                                         f"WHERE normaliser(nom) = ? ORDER BY id", (normaliser(valeur),))
+        return (dict(zip(colonnes, ligne)) for ligne in curseur)
+
+    def noms_commencant(self, nom: str, debut: str) -> Iterator[Tuple[str, str]]:
+        """(nom normalisé, nom) de chaque enregistrement dont le nom normalisé commence par
+        `debut`, dans l'ordre des noms normalisés : un parcours de l'index."""
+        return self.connexion.execute(
+            f"SELECT normaliser(nom), nom FROM {nom} WHERE normaliser(nom) >= ? AND normaliser(nom) < ? "
+            f"ORDER BY normaliser(nom), id", (debut, debut + chr(0x10FFFF)))
+
+    def noms_contenant(self, nom: str, morceaux: Sequence[str]) -> Iterator[Tuple[str, str]]:
+        """(nom normalisé, nom) de chaque enregistrement dont le nom normalisé précédé d'une espace
+        contient tous les `morceaux` (tous les noms sans morceau), par ordre d'identifiant."""
+        conditions = "".join(" AND instr(' ' || normaliser(nom), ?) > 0" for _ in morceaux)
+        return self.connexion.execute(f"SELECT normaliser(nom), nom FROM {nom} WHERE 1{conditions} ORDER BY id",
+                                      tuple(morceaux))
+
+    def etudiants_entre(self, debut: str, fin: str) -> Iterator[Dict[str, Any]]:
+        """Étudiants ajoutés entre deux dates 'YYYY-MM-DD HH:MM:SS' (début inclus, fin exclue),
+        triés par date : un parcours de l'index des dates d'ajout."""
+        colonnes = COLONNES["etudiants"]
+        curseur = self.connexion.execute(f"SELECT {', '.join(colonnes)} FROM etudiants "
+                                         f"WHERE date_ajout >= ? AND date_ajout < ? ORDER BY date_ajout, id",
+                                         (debut, fin))
+        return (dict(zip(colonnes, ligne)) for ligne in curseur)
+
+    def ecrire(self, operations: List[Dict[str, Any]]) -> None:
+        """Exécute les opérations dans une seule transaction."""
+        with self.connexion:
+            for operation in operations:
+                nom = operation["collection"]
+                colonnes = COLONNES[nom]
+                if operation["op"] == "importer":
+                    self.connexion.executemany(
+                        f"INSERT INTO {nom} ({', '.join(colonnes)}) VALUES ({', '.join('?' * len(colonnes))})",
+                        ([enregistrement.get(colonne) for colonne in colonnes]
+                         for enregistrement in operation["enregistrements"]))
+                    continue
+                if operation["op"] == "ajouter":
+                    enregistrement = operation["enregistrement"]
+                    self.connexion.execute(
+                        f"INSERT INTO {nom} ({', '.join(colonnes)}) VALUES ({', '.join('?' * len(colonnes))})",
+                        [enregistrement.get(colonne) for colonne in colonnes])
+                    continue
+                if "id" in operation:
+                    cible, parametres = "id = ?", (operation["id"],)
+                else:
+                    # Même règle que trouver() : le premier enregistrement portant exactement cette clé
+                    filtre = operation.get("filtre") or {}
+                    # IS plutôt que = : un filtre peut viser une référence vide (NULL)
+                    conditions = "".join(f" AND {colonne} IS ?" for colonne in filtre)
+                    cible = f"id = (SELECT id FROM {nom} WHERE {colonnes[0]} = ?{conditions} ORDER BY id LIMIT 1)"
+                    parametres = (operation["cle"], *filtre.values())
+                if operation["op"] == "modifier":
+                    self.connexion.execute(f"UPDATE {nom} SET {operation['champ']} = ? WHERE {cible}",
+                                           (operation["valeur"], *parametres))
+                elif operation["op"] == "supprimer":
+                    self.connexion.execute(f"DELETE FROM {nom} WHERE {cible}", parametres)
+
+    def a_compacter(self, en_attente: int) -> bool:
+        return False
+
+    def fermer(self) -> None:
+        self.connexion.close()
+
+    def compacter(self, data: Dict[str, Any]) -> None:
+        """Remplace le contenu des tables par l'état complet fourni."""
+        with self.connexion:
+            # Les tables qui référencent d'abord : rien à supprimer ni effacer en cascade
+            for nom in reversed(COLONNES):
+                self.connexion.execute(f"DELETE FROM {nom}")
+            for nom, colonnes in COLONNES.items():
+                self.connexion.executemany(
+                    f"INSERT INTO {nom} ({', '.join(colonnes)}) VALUES ({', '.join('?' * len(colonnes))})",
+                    ([enregistrement.get(colonne) for colonne in colonnes] for enregistrement in data.get(nom, [])))
+
+def migrer_depuis_json(destination: Any) -> None:
+    """Reprend les données d'une installation JSON (instantané et journal) dans un autre stockage."""
+    global stockage
+    source = StockageJSON()
+    depuis, operations = source.ouvrir()
+    if source.migre or any(map(operation_ancienne, operations)):
+        # Références par nom : les données sont d'abord converties en mémoire
+        stockage, precedent = source, stockage
+        try:
+            charger_donnees()
+            data = instantane()
+        finally:
+            stockage = precedent
+        destination.compacter(data)
+        return
+    data: Dict[str, Any] = {"sequence": depuis}
+    for nom in COLONNES:
+        data[nom] = list(source.iterer(nom))
+    destination.compacter(data)
+    destination.ecrire(operations)
+
+# Stockage utilisé par charger_donnees et sauvegarder_donnees
+stockage: Any = StockageJSON()
+
+def choisir_stockage(nom: str, lecture_seule: bool = False) -> None:
+    """Sélectionne le stockage : 'json' (petites installations), 'jsonl' ou 'sqlite'.
+
+    En lecture seule, un stockage jsonl ou sqlite pas encore créé n'est pas créé ni migré :
+    on lit les données JSON qu'il aurait reprises (instantané et journal, s'ils existent)."""
+    global stockage
+    if lecture_seule and not os.path.exists(chemin({"sqlite": DATA_DB, "jsonl": DATA_JSONL}.get(nom, DATA_JSON))):
+        stockage = StockageJSON(lecture_seule)
+    elif nom == "sqlite":
+        stockage = StockageSQLite(lecture_seule=lecture_seule)
+    elif nom == "jsonl":
+        stockage = StockageJSONL(lecture_seule)
+    else:
+        stockage = StockageJSON(lecture_seule)
+
+def charger_donnees_fichier(file_path: str) -> Dict[str, Any]:
+    """Charge les données depuis un fichier JSON."""
+    try:
+        with open(file_path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def sauvegarder_donnees_fichier(file_path: str, data: Dict[str, Any]) -> None:
+    """Sauvegarde les données dans un fichier JSON par remplacement atomique."""
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        # json.dumps passe par l'encodeur C, bien plus rapide que json.dump sur de gros volumes
+        f.write(json.dumps(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+    synchroniser_dossier(file_path)
+
+def synchroniser_dossier(file_path: str) -> None:
+    """Écrit sur disque le dossier d'un fichier (son remplacement, sa création), là où le
+    système le permet : sans cela, un os.replace peut être perdu par un arrêt brutal."""
+    try:
+        descripteur = os.open(os.path.dirname(file_path) or ".", os.O_RDONLY)
+    except OSError:
+        # Windows n'ouvre pas les dossiers ; ses remplacements sont écrits directement
+        return
+    try:
+        os.fsync(descripteur)
+    except OSError:
+        pass
+    finally:
+        os.close(descripteur)
+
+# Comptes utilisateurs (nom -> fiche de hachage), lus une seule fois depuis USERS_FILE
+utilisateurs: Optional[Dict[str, Dict[str, Any]]] = None
+
+# Sessions ouvertes, les moins récemment utilisées en tête : jeton -> (utilisateur, expiration)
+sessions: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+def hacher_mot_de_passe(mot_de_passe: str, sel: Optional[bytes] = None, n: Optional[int] = None,
+                        r: Optional[int] = None, p: Optional[int] = None) -> Dict[str, Any]:
+    """Fiche de hachage scrypt salée d'un mot de passe, avec ses paramètres de coût (SCRYPT_* par défaut)."""
+    import hashlib
+    import secrets
+    sel = sel if sel is not None else secrets.token_bytes(TAILLE_SEL)
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    empreinte = hashlib.scrypt(mot_de_passe.encode(), salt=sel, n=n, r=r, p=p, maxmem=256 * n * r)
+    return {"sel": sel.hex(), "empreinte": empreinte.hex(), "n": n, "r": r, "p": p}
+
+def verifier_mot_de_passe(mot_de_passe: str, fiche: Dict[str, Any]) -> bool:
+    import hmac
+    attendue = hacher_mot_de_passe(mot_de_passe, bytes.fromhex(fiche["sel"]), fiche["n"], fiche["r"], fiche["p"])
+    return hmac.compare_digest(attendue["empreinte"], fiche["empreinte"])
+
+def charger_utilisateurs() -> Dict[str, Dict[str, Any]]:
+    """Index des comptes en mémoire, lu une fois (et migré depuis DATA_FILE si besoin)."""
+    global utilisateurs
+    if utilisateurs is None:
+        if os.path.exists(USERS_FILE):
+            utilisateurs = charger_donnees_fichier(USERS_FILE)
+        else:
+            utilisateurs = {}
+            migrer_utilisateurs()
+    return utilisateurs
+
+def migrer_utilisateurs() -> None:
+    """Hache les mots de passe en clair de l'ancien DATA_FILE et supprime ce fichier."""
+    anciens = charger_donnees_fichier(DATA_FILE)
+    if not isinstance(anciens, dict) or not anciens:
+        return
+    for nom, mot_de_passe in anciens.items():
+        utilisateurs[nom] = hacher_mot_de_passe(mot_de_passe)
+    sauvegarder_donnees_fichier(USERS_FILE, utilisateurs)
+    os.remove(DATA_FILE)
+    print(JAUNE + f"{len(anciens)} utilisateurs migrés vers '{USERS_FILE}' ; "
+          f"les mots de passe en clair de '{DATA_FILE}' ont été supprimés." + NORMAL)
+
+def creer_utilisateur(nom: str, mot_de_passe: str) -> bool:
+    comptes = charger_utilisateurs()
+    if nom in comptes:
+        return False
+    comptes[nom] = hacher_mot_de_passe(mot_de_passe)
+    sauvegarder_donnees_fichier(USERS_FILE, comptes)
+    return True
 
-def charger_donnees_fichier(file_path: str) -> Dict[str, Any]:
-    """Charge les données depuis un fichier JSON."""
-    try:
-        with open(file_path, "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+def authentifier(nom: str, mot_de_passe: str) -> Optional[str]:
+    """Vérifie un mot de passe ; renvoie un jeton de session, ou None si l'authentification échoue."""
+    comptes = charger_utilisateurs()
+    fiche = comptes.get(nom)
+    if fiche is None:
+        # Même coût qu'une vraie vérification : la durée ne révèle pas si le compte existe
+        hacher_mot_de_passe(mot_de_passe, bytes(TAILLE_SEL))
+        return None
+    if not verifier_mot_de_passe(mot_de_passe, fiche):
+        return None
+    if (fiche["n"], fiche["r"], fiche["p"]) != (SCRYPT_N, SCRYPT_R, SCRYPT_P):
+        # Coût modifié depuis la création du compte : l'empreinte est recalculée
+        comptes[nom] = hacher_mot_de_passe(mot_de_passe)
+        sauvegarder_donnees_fichier(USERS_FILE, comptes)
+    return ouvrir_session(nom)
 
-def sauvegarder_donnees_fichier(file_path: str, data: Dict[str, Any]) -> None:
-    """Sauvegarde les données dans un fichier JSON."""
-    with open(file_path, "w") as f:
-        json.dump(data, f)
+def ouvrir_session(nom: str) -> str:
+    import secrets
+    jeton = secrets.token_urlsafe(32)
+    sessions[jeton] = (nom, time.monotonic() + DUREE_SESSION)
+    if len(sessions) > SESSIONS_MAX:
+        sessions.popitem(last=False)
+    return jeton
+
+def verifier_session(jeton: str) -> Optional[str]:
+    """Utilisateur d'un jeton de session encore valide, sans relire ni rehacher quoi que ce soit."""
+    session = sessions.get(jeton)
+    if session is None:
+        return None
+    if session[1] < time.monotonic():
+        del sessions[jeton]
+        return None
+    sessions.move_to_end(jeton)
+    return session[0]
 
 def enregistrer_utilisateur() -> None:
-    utilisateurs = charger_donnees_fichier(DATA_FILE)
     username = input("Entrez votre nom d'utilisateur : ")
-    if username in utilisateurs:
+    if username in charger_utilisateurs():
         print("Cet utilisateur existe déjà.")
         return
     password = getpass.getpass("Entrez votre mot de passe : ")
-    utilisateurs[username] = password
-    sauvegarder_donnees_fichier(DATA_FILE, utilisateurs)
+    creer_utilisateur(username, password)
     print("Utilisateur enregistré avec succès!")
 
+def ajouter_utilisateur(nom: str) -> bool:
+    mot_de_passe = getpass.getpass("Entrez votre mot de passe : ")
+    if not creer_utilisateur(nom, mot_de_passe):
+        print(ROUGE + "Cet utilisateur existe déjà." + NORMAL)
+        return False
+    print(VERT + "Utilisateur enregistré avec succès!" + NORMAL)
+    return True
+
 def authentifier_utilisateur() -> None:
-    utilisateurs = charger_donnees_fichier(DATA_FILE)
     username = input("Entrez votre nom d'utilisateur : ")
     password = getpass.getpass("Entrez votre mot de passe : ")
-    if utilisateurs.get(username) == password:
+    if authentifier(username, password) is not None:
         print("Authentification réussie!")
     else:
         print("Nom d'utilisateur ou mot de passe incorrect.")
 
+def mesurer_connexions(nombre: int = 20) -> None:
+    """Banc d'essai : débit des connexions par mot de passe et des vérifications de jeton."""
+    fiche = hacher_mot_de_passe("mot de passe")
+    debut = time.perf_counter()
+    for _ in range(nombre):
+        verifier_mot_de_passe("mot de passe", fiche)
+    duree_hachage = time.perf_counter() - debut
+    jeton = ouvrir_session("banc d'essai")
+    verifications = nombre * 10000
+    debut = time.perf_counter()
+    for _ in range(verifications):
+        verifier_session(jeton)
+    duree_session = time.perf_counter() - debut
+    del sessions[jeton]
+    print(BLEU + f"Mot de passe (scrypt n={SCRYPT_N}, r={SCRYPT_R}, p={SCRYPT_P}) : "
+          f"{nombre / duree_hachage:.1f} connexions/s ({duree_hachage / nombre * 1000:.1f} ms chacune)" + NORMAL)
+    print(BLEU + f"Jeton de session en cache : {verifications / duree_session:.0f} vérifications/s "
+          f"({duree_session / verifications * 1e6:.2f} µs chacune)" + NORMAL)
+
 def gestion_connexion() -> None:
     while True:
         choix = input("Voulez-vous (1) vous authentifier ou (2) enregistrer un utilisateur? ")
@@ -75,158 +2005,892 @@ def gestion_connexion() -> None:
         else:
             print("Choix invalide. Veuillez choisir une option valide.")
 
-def sauvegarder_etudiants(etudiants: List[Dict[str, Any]]) -> None:
+def sauvegarder_etudiants(etudiants: List[Etudiant]) -> None:
     """Sauvegarde les étudiants dans un fichier JSON."""
-    sauvegarder_donnees_fichier(DATA_FILE, etudiants)
+    sauvegarder_donnees_fichier(DATA_FILE, [etudiant.vers_dict() for etudiant in etudiants])
 
-def afficher_etudiants(etudiants: List[Dict[str, Any]]) -> None:
+def afficher_etudiants(etudiants: List[Etudiant]) -> None:
     if not etudiants:
         print(Fore.YELLOW + "Aucun étudiant n'est enregistré.")
     else:
         print(Fore.CYAN + "\nListe des étudiants :")
         for idx, etudiant in enumerate(etudiants, 1):
-            print(f"{idx}. {etudiant['nom']} - {etudiant['date_ajout']}")
+            print(f"{idx}. {etudiant.nom} - {formater_date(etudiant.date_ajout)}")
         print()
 
-def rechercher_etudiant_par_date(etudiants: List[Dict[str, Any]]) -> None:
-    date_str = input("Entrez la date (format YYYY-MM-DD) à rechercher : ")
+def rechercher_etudiant_par_date(etudiants: List[Etudiant], date_str: Optional[str] = None) -> None:
+    if date_str is None:
+        date_str = input("Entrez la date (format YYYY-MM-DD) à rechercher : ")
     try:
-        date_recherche = datetime.strptime(date_str, "%Y-%m-%d")
-        resultats = [etudiant for etudiant in etudiants if
-                     datetime.strptime(etudiant["date_ajout"], "%Y-%m-%d %H:%M:%S").date() == date_recherche.date()]
+        debut = lire_jour(date_str)
+        resultats = etudiants_entre(debut, debut + UN_JOUR)
 
         if resultats:
             print(Fore.CYAN + "\nÉtudiants trouvés :")
             for idx, etudiant in enumerate(resultats, 1):
-                print(f"{idx}. {etudiant['nom']} - {etudiant['date_ajout']}")
+                print(f"{idx}. {etudiant.nom} - {formater_date(etudiant.date_ajout)}")
             print()
         else:
             print(Fore.YELLOW + "Aucun étudiant trouvé pour cette date.")
     except ValueError:
         print(Fore.RED + "Format de date invalide. Assurez-vous d'utiliser le format YYYY-MM-DD.")
 
-def exporter_vers_doc(etudiants: List[Dict[str, Any]]) -> None:
+def rechercher_etudiant_par_periode(etudiants: List[Etudiant], debut_str: Optional[str] = None,
+                                    fin_str: Optional[str] = None) -> None:
+    if debut_str is None:
+        debut_str = input("Entrez la date de début (format YYYY-MM-DD) : ")
+    if fin_str is None:
+        fin_str = input("Entrez la date de fin (format YYYY-MM-DD) : ")
+    try:
+        resultats = etudiants_entre(lire_jour(debut_str), lire_jour(fin_str) + UN_JOUR)
+    except ValueError:
+        print(Fore.RED + "Format de date invalide. Assurez-vous d'utiliser le format YYYY-MM-DD.")
+        return
+    if resultats:
+        print(Fore.CYAN + "\nÉtudiants trouvés :")
+        for idx, etudiant in enumerate(resultats, 1):
+            print(f"{idx}. {etudiant.nom} - {formater_date(etudiant.date_ajout)}")
+        print()
+    else:
+        print(Fore.YELLOW + "Aucun étudiant trouvé pour cette période.")
+
+def par_lots(enregistrements: Iterable[Any], taille: int = TAILLE_LOT) -> Iterator[List[Any]]:
+    """Découpe un flux d'enregistrements en listes d'au plus `taille` éléments."""
+    enregistrements = iter(enregistrements)
+    return iter(lambda: list(itertools.islice(enregistrements, taille)), [])
+
+def entetes_export(nom: str) -> List[str]:
+    """En-têtes CSV et DOCX d'une collection (ceux de l'import, pour pouvoir réimporter)."""
+    if nom == "etudiants":
+        return ["Nom", "Date d'ajout"]
+    return list(CHAMPS_LISIBLES[nom])
+
+def lignes_export(nom: str, lot: List[Any]) -> List[List[str]]:
+    """Lignes CSV et DOCX d'un lot d'enregistrements (références par nom)."""
+    if nom == "etudiants":
+        return [[etudiant.nom, formater_date(etudiant.date_ajout)] for etudiant in lot]
+    colonnes = CHAMPS_LISIBLES[nom]
+    return [[data.get(colonne) or "" for colonne in colonnes] for data in map(lisible, lot)]
+
+@mesure("exporter docx")
+def exporter_vers_doc() -> None:
+    # python-docx (et lxml) coûte plus à importer que tout le reste du programme
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    from xml.sax.saxutils import escape
     document = Document()
-    document.add_heading("Liste des Étudiants", 0)
+    document.add_heading("Export des données", 0)
+    for nom, titre in TITRES.items():
+        document.add_heading(titre, 1)
+        entetes = entetes_export(nom)
+        table = document.add_table(rows=1, cols=len(entetes))
+        for cellule, entete in zip(table.rows[0].cells, entetes):
+            cellule.text = entete
+        # Les lignes sont ajoutées par lots de XML : cellule.text coûte trop cher par cellule
+        for lot in par_lots(parcourir(nom)):
+            lignes = "".join(
+                "<w:tr>" + "".join(f'<w:tc><w:p><w:r><w:t xml:space="preserve">{escape(valeur)}</w:t></w:r></w:p></w:tc>'
+                                   for valeur in ligne) + "</w:tr>"
+                for ligne in lignes_export(nom, lot))
+            table._tbl.extend(list(parse_xml(f"<w:tbl {nsdecls('w')}>{lignes}</w:tbl>")))
+    document.save(chemin(EXPORT_DOCX))
+    print(Fore.GREEN + f"Les données ont été exportées dans le fichier '{chemin(EXPORT_DOCX)}'.")
 
-    if not etudiants:
-        document.add_paragraph("Aucun étudiant n'est enregistré.")
-    else:
-        for etudiant in etudiants:
-            document.add_paragraph(f"{etudiant['nom']} - {etudiant['date_ajout']}")
-
-    document.save("etudiants.docx")
-    print(Fore.GREEN + "Les étudiants ont été exportés dans le fichier 'etudiants.docx'.")
-
-def exporter_vers_csv(etudiants: List[Dict[str, Any]]) -> None:
-    with open("etudiants.csv", "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Nom", "Date d'ajout"])
-        for etudiant in etudiants:
-            writer.writerow([etudiant["nom"], etudiant["date_ajout"]])
-    print(Fore.GREEN + "Les étudiants ont été exportés dans le fichier 'etudiants.csv'.")
-
-def trier_etudiants(etudiants: List[Dict[str, Any]]) -> None:
-    critere = input("Trier par (1) nom (2) date d'ajout : ")
+@mesure("exporter csv")
+def exporter_vers_csv() -> None:
+    for nom in COLLECTIONS:
+        with open(chemin(f"{nom}.csv"), "w", newline="", buffering=TAMPON_EXPORT) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(entetes_export(nom))
+            for lot in par_lots(parcourir(nom)):
+                writer.writerows(lignes_export(nom, lot))
+    print(Fore.GREEN + f"Les données ont été exportées dans les fichiers "
+                       f"{', '.join(chemin(f'{nom}.csv') for nom in COLLECTIONS)}.")
+
+def lire_fichier_import(fichier: str) -> Iterator[Tuple[int, Any]]:
+    """Lit un fichier CSV (avec en-tête) ou JSONL en flux : (numéro de ligne, ligne)."""
+    with open(fichier, "r", newline="") as f:
+        if fichier.endswith(".jsonl"):
+            for numero, ligne in enumerate(f, 1):
+                if not ligne.strip():
+                    continue
+                try:
+                    yield numero, json.loads(ligne)
+                except ValueError:
+                    yield numero, None
+            return
+        # csv.reader + zip plutôt que csv.DictReader, dont chaque ligne coûte du code Python
+        lecteur = csv.reader(f)
+        entetes = [ENTETES_CSV.get(entete, entete) for entete in next(lecteur, [])]
+        for ligne in lecteur:
+            if ligne:
+                yield lecteur.line_num, dict(zip(entetes, ligne))
+
+def champ_importe(ligne: Dict[str, Any], champ: str) -> str:
+    """Valeur d'un champ importé, en texte sans espaces autour ; "" s'il est absent ou vide.
+    Une valeur JSONL numérique est gardée, zéro compris (0 -> "0")."""
+    valeur = ligne.get(champ)
+    return "" if valeur is None else str(valeur).strip()
+
+def preparer_import(nom: str, ligne: Any, vus: set, maintenant: str) -> Dict[str, Any]:
+    """Valide une ligne importée et retourne l'enregistrement à ajouter.
+
+    Lève ValueError avec la raison du rejet. `vus` contient les clés déjà importées
+    par le même fichier, pour écarter les doublons internes au fichier, et `maintenant`
+    est la date d'ajout des étudiants importés sans date.
+    """
+    if not isinstance(ligne, dict):
+        raise ValueError("ligne illisible")
+    if nom in ENTITES:
+        valeur = champ_importe(ligne, "nom")
+        if not valeur:
+            raise ValueError("nom manquant")
+        cle = cle_nom(valeur)
+        if cle in COLLECTIONS[nom][1] or cle in vus:
+            raise ValueError(f"'{valeur}' existe déjà")
+        vus.add(cle)
+        if nom == "enseignants":
+            return {"nom": valeur}
+        if nom == "cours":
+            enseignant_nom = champ_importe(ligne, "enseignant")
+            if not enseignant_nom:
+                return {"nom": valeur}
+            enseignant_id = reference("enseignants", enseignant_nom)
+            if enseignant_id is None:
+                raise ValueError(f"enseignant inconnu '{enseignant_nom}'")
+            return {"nom": valeur, "enseignant_id": enseignant_id}
+        date_ajout = champ_importe(ligne, "date_ajout") or maintenant
+        if date_ajout == DATE_NON_DISPONIBLE:
+            return {"nom": valeur}
+        try:
+            secondes = lire_date(date_ajout)
+        except ValueError:
+            raise ValueError(f"date d'ajout invalide '{date_ajout}'")
+        # Au format de FORMAT_DATE, l'ordre des textes est celui des dates (index SQLite)
+        return {"nom": valeur, "date_ajout": formater_date(secondes)}
+
+    etudiant_nom = champ_importe(ligne, "etudiant")
+    etudiant_id = reference("etudiants", etudiant_nom)
+    if etudiant_id is None:
+        raise ValueError(f"étudiant inconnu '{etudiant_nom}'")
+    if nom == "notes":
+        note = champ_importe(ligne, "note")
+        try:
+            lire_note(note)
+        except ValueError as erreur:
+            raise ValueError(f"note invalide : {erreur}")
+        enregistrement = {"etudiant_id": etudiant_id, "note": note}
+        cours_nom = champ_importe(ligne, "cours")
+        if cours_nom:
+            cours_id = reference("cours", cours_nom)
+            if cours_id is None:
+                raise ValueError(f"cours inconnu '{cours_nom}'")
+            enregistrement["cours_id"] = cours_id
+        return enregistrement
+
+    date_absence = champ_importe(ligne, "date")
+    try:
+        jour_de_classe(date_absence)
+    except ValueError:
+        raise ValueError(f"date d'absence invalide '{date_absence}' (YYYY-MM-DD, un jour de classe)")
+    cle = (etudiant_id, date_absence)
+    if cle in vus or trouver(index_absences, etudiant_id, "etudiant_id", {"date": date_absence}) is not None:
+        raise ValueError(f"absence déjà enregistrée pour '{etudiant_nom}' le {date_absence}")
+    vus.add(cle)
+    return {"etudiant_id": etudiant_id, "date": date_absence}
+
+@mesure("importer")
+def importer_fichier(fichier: str, nom: Optional[str] = None, sauvegarder: bool = True) -> bool:
+    """Importe en masse un fichier CSV ou JSONL dans une collection, puis sauvegarde une seule fois.
+
+    Sans `nom`, la collection est déduite du nom du fichier (notes.csv -> notes).
+    Avec `sauvegarder=False` (--batch), la sauvegarde est laissée à l'appelant.
+    """
+    nom = nom or os.path.splitext(os.path.basename(fichier))[0]
+    if nom not in COLLECTIONS:
+        print(ROUGE + f"Collection inconnue '{nom}'. Choisissez parmi : {', '.join(COLLECTIONS)}." + NORMAL)
+        return False
+    exiger(nom, "etudiants", "cours")
+    debut = time.perf_counter()
+    lignes = lire_fichier_import(fichier)
+    maintenant = datetime.now().strftime(FORMAT_DATE)
+    vus: set = set()
+    importees = 0
+    rejets: List[Tuple[int, str]] = []
+    try:
+        for lot in par_lots(lignes):
+            enregistrements = []
+            for numero, ligne in lot:
+                try:
+                    enregistrements.append(preparer_import(nom, ligne, vus, maintenant))
+                except ValueError as erreur:
+                    rejets.append((numero, str(erreur)))
+            if enregistrements:
+                executer({"op": "importer", "collection": nom, "enregistrements": enregistrements})
+                importees += len(enregistrements)
+    except FileNotFoundError:
+        print(ROUGE + f"Fichier '{fichier}' introuvable." + NORMAL)
+        return False
+    if sauvegarder:
+        sauvegarder_donnees()
+    duree = time.perf_counter() - debut
+    total = importees + len(rejets)
+    print(VERT + f"{importees} {nom} importés depuis '{fichier}', {len(rejets)} lignes rejetées "
+          f"({total} lignes en {duree:.2f} s, {total / max(duree, 1e-9):.0f} lignes/s)." + NORMAL)
+    for numero, raison in rejets[:RAPPORT_REJETS]:
+        print(JAUNE + f"Ligne {numero} : {raison}" + NORMAL)
+    if len(rejets) > RAPPORT_REJETS:
+        print(JAUNE + f"... et {len(rejets) - RAPPORT_REJETS} autres lignes rejetées." + NORMAL)
+    return True
+
+def trier_etudiants(etudiants: List[Etudiant], critere: Optional[str] = None) -> None:
+    if critere is None:
+        critere = input("Trier par (1) nom (2) date d'ajout : ")
     if critere == "1":
-        etudiants.sort(key=lambda e: e["nom"].lower())
+        etudiants.sort(key=lambda e: e.nom.lower())
         print(Fore.GREEN + "Les étudiants ont été triés par nom.")
     elif critere == "2":
-        etudiants.sort(key=lambda e: datetime.strptime(e["date_ajout"], "%Y-%m-%d %H:%M:%S"))
+        # L'index des dates est déjà trié : les étudiants sans date restent en tête
+        etudiants[:] = [e for e in etudiants if e.date_ajout is None] + etudiants_par_date
         print(Fore.GREEN + "Les étudiants ont été triés par date d'ajout.")
     else:
         print(Fore.YELLOW + "Critère invalide.")
 
-def sauvegarder_donnees() -> None:
-    data = {
-        "etudiants": etudiants,
-        "enseignants": enseignants,
-        "cours": cours,
-        "notes": notes,
-        "absences": absences
-    }
-    sauvegarder_donnees_fichier(DATA_JSON, data)
-    print(VERT + "Données sauvegardées avec succès!" + NORMAL)
+@mesure("sauvegarder")
+def sauvegarder_donnees(afficher: bool = True) -> None:
+    # Un instantané inclut les opérations en attente : inutile de les journaliser avant
+    if stockage.a_compacter(sum(map(taille_operation, operations_en_attente))):
+        stockage.compacter(instantane())
+    else:
+        stockage.ecrire(operations_en_attente)
+        if getattr(stockage, "requetes", False):
+            # Les opérations différées sont maintenant dans la base : la lire suffira
+            for operations in collections_differees.values():
+                operations.clear()
+    operations_en_attente.clear()
+    if afficher:
+        print(VERT + "Données sauvegardées avec succès!" + NORMAL)
 
+@mesure("charger")
 def charger_donnees() -> None:
-    global etudiants, enseignants, cours, notes, absences
-    data = charger_donnees_fichier(DATA_JSON)
-    etudiants = data.get("etudiants", [])
-    enseignants = data.get("enseignants", [])
-    cours = data.get("cours", [])
-    notes = data.get("notes", [])
-    absences = data.get("absences", [])
+    global sequence, chargement_differe
+    chargement_differe = False
+    sequence, operations = stockage.ouvrir()
+    operations_en_attente.clear()
+    collections_differees.clear()
+    # Les données relues remplacent celles de la session : plus rien à annuler
+    historique.clear()
+    retablissements.clear()
+    instantanes_nommes.clear()
+    for nom, (collection, index, champ) in COLLECTIONS.items():
+        collection.clear()
+        index.clear()
+        if nom in INDEX_APPROCHES:
+            INDEX_APPROCHES[nom].vider()
+        collections_differees[nom] = []
+        if getattr(stockage, "requetes", False):
+            # Les ajouts différés reçoivent leur identifiant sans lire la collection
+            prochains_identifiants[nom] = stockage.prochain_identifiant(nom)
+    for _, adjacence in LIENS.values():
+        adjacence.clear()
+    for operation in operations:
+        collections_differees[operation["collection"]].append(operation)
+        if operation["op"] == "supprimer":
+            # À leur lecture, les collections qui référencent l'enregistrement supprimé
+            # appliquent la suppression à leur tour, à sa place dans le journal
+            for dependant, *_ in DEPENDANTS.get(operation["collection"], ()):
+                collections_differees[dependant].append(operation)
+        sequence = operation["seq"]
+    ancien_format = stockage.migre or any(map(operation_ancienne, operations))
+    if ancien_format and not stockage.lecture_seule:
+        # Données d'avant les identifiants : converties une fois pour toutes
+        stockage.compacter(instantane())
+        print(VERT + "Données converties au nouveau format (identifiants)." + NORMAL)
+    elif ancien_format or not stockage.paresseux:
+        # En lecture seule, un format ancien est converti en mémoire seulement
+        exiger(*COLLECTIONS)
     print(VERT + "Données chargées avec succès!" + NORMAL)
 
+def differer_chargement() -> None:
+    """Reporte charger_donnees au premier accès aux données (exiger, parcourir ou compter) :
+    le programme démarre sans lire le stockage, et ne le lit pas s'il n'en a pas besoin."""
+    global chargement_differe
+    chargement_differe = True
+
+@mesure("statistiques")
 def afficher_statistiques() -> None:
     print(BLEU + "Statistiques:" + NORMAL)
-    print(f"{VERT}Nombre d'étudiants : {len(etudiants)}")
-    print(f"Nombre d'enseignants : {len(enseignants)}")
-    print(f"Nombre de cours : {len(cours)}")
-    print(f"Nombre de notes : {len(notes)}")
-    print(f"Nombre d'absences : {len(absences)}" + NORMAL)
+    print(f"{VERT}Nombre d'étudiants : {compter('etudiants')}")
+    print(f"Nombre d'enseignants : {compter('enseignants')}")
+    print(f"Nombre de cours : {compter('cours')}")
+    print(f"Nombre de notes : {compter('notes')}")
+    print(f"Nombre d'absences : {compter('absences')}" + NORMAL)
+
+def statistiques_groupes(np: Any, codes: Any, valeurs: Any, nb_groupes: int, ordre_valeurs: Any) -> Dict[str, Any]:
+    """Effectif, moyenne, médiane, écart-type et centiles de chaque groupe, en un seul tri.
+
+    `codes[i]` est le numéro de groupe (0 à nb_groupes - 1, tous représentés) de `valeurs[i]`
+    et `ordre_valeurs` l'ordre croissant des valeurs, partagé entre les regroupements.
+    """
+    effectifs = np.bincount(codes, minlength=nb_groupes)
+    moyennes = np.bincount(codes, weights=valeurs, minlength=nb_groupes) / effectifs
+    ecarts = valeurs - moyennes[codes]
+    ecarts_types = np.sqrt(np.bincount(codes, weights=ecarts * ecarts, minlength=nb_groupes) / effectifs)
+    # Valeurs triées par groupe puis par valeur : chaque groupe occupe une plage contiguë
+    triees = valeurs[ordre_valeurs[np.argsort(codes[ordre_valeurs], kind="stable")]]
+    debuts = np.cumsum(effectifs) - effectifs
+    derniers = debuts + effectifs - 1
+
+    def centile(p: float) -> Any:
+        # Interpolation linéaire, comme numpy.percentile
+        position = debuts + (effectifs - 1) * (p / 100)
+        bas = np.floor(position).astype(np.int64)
+        haut = np.minimum(bas + 1, derniers)
+        return triees[bas] + (triees[haut] - triees[bas]) * (position - bas)
+
+    resultat = {
+        "effectif": effectifs,
+        "moyenne": moyennes,
+        "mediane": centile(50),
+        "ecart_type": ecarts_types,
+        "min": triees[debuts],
+        "max": triees[derniers],
+    }
+    for p in CENTILES:
+        resultat[f"p{p}"] = centile(p)
+    return resultat
+
+def coder_groupes(np: Any, enregistrements: List[Any], champ: str, garder: Any) -> Tuple[List[Any], Any]:
+    """Numérote les valeurs d'un champ (0, 1, 2...) dans l'ordre de leur première apparition.
+
+    Retourne les valeurs distinctes et le numéro de chaque enregistrement retenu par `garder`.
+    """
+    premieres: Dict[Any, int] = {}
+    positions = np.fromiter(map(premieres.setdefault, map(attrgetter(champ), enregistrements), itertools.count()),
+                            np.int64, count=len(enregistrements))[garder]
+    uniques, codes = np.unique(positions, return_inverse=True)
+    return [getattr(enregistrements[position], champ) for position in uniques], codes.reshape(-1)
+
+def rangs_ex_aequo(moyennes: List[float]) -> List[int]:
+    """Rangs de moyennes triées par ordre décroissant : les ex aequo partagent le même rang (1, 2, 2, 4...)."""
+    rangs = []
+    for position, moyenne in enumerate(moyennes):
+        rangs.append(rangs[-1] if position and moyenne == moyennes[position - 1] else position + 1)
+    return rangs
+
+def analyser_notes(liste_notes: Iterable[Note]) -> Dict[str, Any]:
+    """Analyse des notes : globale, par étudiant, par cours, histogrammes et classement."""
+    import numpy as np
+
+    exiger("etudiants", "cours")
+    liste_notes = list(liste_notes)
+    valeurs = np.fromiter(map(attrgetter("note"), liste_notes), np.float64, count=len(liste_notes))
+    # Les notes d'origine illisibles (NaN) sont conservées telles quelles mais ignorées ici
+    garder = ~np.isnan(valeurs)
+    valeurs_np = valeurs[garder]
+    if not valeurs_np.size:
+        return {"effectif": 0}
+    # Regroupés par identifiant (deux homonymes restent deux étudiants), présentés par nom
+    identifiants, etudiants_np = coder_groupes(np, liste_notes, "etudiant_id", garder)
+    identifiants_cours, cours_np = coder_groupes(np, liste_notes, "cours_id", garder)
+    noms = [nom_de("etudiants", identifiant) for identifiant in identifiants]
+    noms_cours = [nom_de("cours", identifiant) for identifiant in identifiants_cours]
+
+    # Classes de l'histogramme : NB_CLASSES intervalles égaux de 0 à NOTE_MAX
+    # (ou jusqu'à la meilleure note si le barème est plus large)
+    bornes = np.linspace(0, max(NOTE_MAX, float(valeurs_np.max())), NB_CLASSES + 1)
+    classes = np.clip(np.searchsorted(bornes, valeurs_np, side="right") - 1, 0, NB_CLASSES - 1)
+
+    ordre_valeurs = np.argsort(valeurs_np, kind="stable")
+    par_etudiant = statistiques_groupes(np, etudiants_np, valeurs_np, len(noms), ordre_valeurs)
+    par_cours = statistiques_groupes(np, cours_np, valeurs_np, len(noms_cours), ordre_valeurs)
+    par_cours["histogramme"] = np.bincount(cours_np * NB_CLASSES + classes,
+                                           minlength=len(noms_cours) * NB_CLASSES).reshape(-1, NB_CLASSES)
+
+    # Classement par moyenne décroissante ; les ex aequo partagent le même rang (1, 2, 2, 4...)
+    ordre = np.argsort(-par_etudiant["moyenne"], kind="stable")
+    rangs = rangs_ex_aequo(par_etudiant["moyenne"][ordre].tolist())
+
+    globale = statistiques_groupes(np, np.zeros(valeurs_np.size, dtype=np.int64), valeurs_np, 1, ordre_valeurs)
+    return {
+        "effectif": int(valeurs_np.size),
+        "globale": {cle: valeur[0] for cle, valeur in globale.items()},
+        "bornes": bornes,
+        "histogramme": np.bincount(classes, minlength=NB_CLASSES),
+        "etudiants": noms,
+        "par_etudiant": par_etudiant,
+        "cours": noms_cours,
+        "par_cours": par_cours,
+        "classement": [(int(rang), noms[idx], float(par_etudiant["moyenne"][idx]), int(par_etudiant["effectif"][idx]))
+                       for rang, idx in zip(rangs, ordre)],
+    }
+
+@mesure("analyse des notes")
+def afficher_analyse_notes() -> None:
+    try:
+        analyse = analyser_notes(parcourir("notes"))
+    except ImportError:
+        print(ROUGE + "L'analyse des notes nécessite NumPy (pip install numpy)." + NORMAL)
+        return
+    print(BLEU + "Analyse des notes:" + NORMAL)
+    if not analyse["effectif"]:
+        print(JAUNE + "Aucune note n'est enregistrée." + NORMAL)
+        return
+    globale = analyse["globale"]
+    centiles = " ".join(f"p{p}={globale[f'p{p}']:.2f}" for p in CENTILES)
+    print(f"{VERT}{analyse['effectif']} notes - moyenne {globale['moyenne']:.2f}, "
+          f"médiane {globale['mediane']:.2f}, écart-type {globale['ecart_type']:.2f}" + NORMAL)
+    print(f"Centiles : {centiles}")
+
+    print(BLEU + "\nRépartition des notes :" + NORMAL)
+    bornes, histogramme = analyse["bornes"], analyse["histogramme"]
+    plus_grand = max(int(histogramme.max()), 1)
+    for idx, effectif in enumerate(histogramme):
+        barre = "#" * round(40 * int(effectif) / plus_grand)
+        print(f"[{bornes[idx]:5.1f} - {bornes[idx + 1]:5.1f}[ {int(effectif):7d} {barre}")
 
+    print(BLEU + "\nPar cours :" + NORMAL)
+    par_cours = analyse["par_cours"]
+    for idx, nom in enumerate(analyse["cours"]):
+        print(f"{nom or 'Sans cours'} : {int(par_cours['effectif'][idx])} notes, "
+              f"moyenne {par_cours['moyenne'][idx]:.2f}, médiane {par_cours['mediane'][idx]:.2f}, "
+              f"écart-type {par_cours['ecart_type'][idx]:.2f}, "
+              f"min {par_cours['min'][idx]:.2f}, max {par_cours['max'][idx]:.2f}")
+
+    print(BLEU + f"\nClassement ({min(TAILLE_CLASSEMENT, len(analyse['classement']))} premiers) :" + NORMAL)
+    for rang, nom, moyenne, effectif in analyse["classement"][:TAILLE_CLASSEMENT]:
+        print(f"{rang}. {nom} - moyenne {moyenne:.2f} sur {effectif} notes")
+    print()
+
+def analyser_absences(debut: Optional[int] = None, fin: Optional[int] = None) -> Dict[str, Any]:
+    """Rapport des absences entre deux rangs de jours de classe inclus (toute la période par défaut).
+
+    Les bits de chaque étudiant sont dépliés en une matrice étudiants x jours ;
+    totaux, taux par jour et séries d'absences consécutives en sont tirés d'un bloc.
+    """
+    import numpy as np
+
+    if origine_absences is None or not bits_absences:
+        return {"jours": 0}
+    cles = list(bits_absences)
+    debut = origine_absences if debut is None else debut
+    if fin is None:
+        fin = origine_absences + max(bits.bit_length() for bits in bits_absences.values()) - 1
+    nb_jours = fin - debut + 1
+    if nb_jours <= 0:
+        return {"jours": 0}
+    nb_octets = (nb_jours + 7) // 8
+    masque = (1 << nb_jours) - 1
+    decalage = debut - origine_absences
+    tampon = b"".join(((bits >> decalage if decalage >= 0 else bits << -decalage) & masque).to_bytes(nb_octets, "little")
+                      for bits in bits_absences.values())
+    matrice = np.unpackbits(np.frombuffer(tampon, np.uint8).reshape(len(cles), nb_octets),
+                            axis=1, count=nb_jours, bitorder="little")
+
+    totaux = matrice.sum(axis=1, dtype=np.int64)
+    par_jour = matrice.sum(axis=0, dtype=np.int64)
+    # Séries : un début là où la matrice bordée de zéros passe de 0 à 1, une fin de 1 à 0,
+    # appariés ligne par ligne puisque np.nonzero parcourt la matrice dans l'ordre
+    bord = np.zeros((len(cles), 1), np.int8)
+    sauts = np.diff(np.hstack((bord, matrice.view(np.int8), bord)), axis=1)
+    lignes, debuts_series = np.nonzero(sauts == 1)
+    fins_series = np.nonzero(sauts == -1)[1]
+    longueurs = fins_series - debuts_series
+    ordre_series = np.argsort(-longueurs, kind="stable")[:TAILLE_CLASSEMENT]
+    ordre_etudiants = np.argsort(-totaux, kind="stable")[:TAILLE_CLASSEMENT]
+    # Taux rapporté à l'ensemble des étudiants, même ceux qui n'ont jamais été absents
+    taux = par_jour / max(compter("etudiants"), len(cles))
+    ordre_jours = np.argsort(-taux, kind="stable")[:TAILLE_CLASSEMENT]
+    noms = {cle: nom_de("etudiants", cle) for cle in cles}
+    return {
+        "jours": nb_jours,
+        "debut": date_de_classe(debut),
+        "fin": date_de_classe(fin),
+        "total": int(totaux.sum()),
+        "taux_moyen": float(taux.mean()),
+        "absenteistes": [(noms.get(cles[idx], cles[idx]), int(totaux[idx])) for idx in ordre_etudiants if totaux[idx]],
+        "jours_critiques": [(date_de_classe(debut + int(idx)), int(par_jour[idx]), float(taux[idx]))
+                            for idx in ordre_jours if par_jour[idx]],
+        "series": [(noms.get(cles[lignes[idx]], cles[lignes[idx]]), int(longueurs[idx]),
+                    date_de_classe(debut + int(debuts_series[idx])), date_de_classe(debut + int(fins_series[idx]) - 1))
+                   for idx in ordre_series],
+    }
+
+@mesure("rapport des absences")
+def afficher_rapport_absences(debut: Optional[str] = None, fin: Optional[str] = None) -> bool:
+    exiger("absences")
+    try:
+        rapport = analyser_absences(rang_de_classe(debut) if debut else None,
+                                    rang_de_classe(fin, fin=True) if fin else None)
+    except ImportError:
+        print(ROUGE + "Le rapport des absences nécessite NumPy (pip install numpy)." + NORMAL)
+        return False
+    except ValueError:
+        print(ROUGE + "Format de date invalide. Assurez-vous d'utiliser le format YYYY-MM-DD." + NORMAL)
+        return False
+    print(BLEU + "Rapport des absences:" + NORMAL)
+    if not rapport["jours"]:
+        print(JAUNE + "Aucune absence n'est enregistrée sur cette période." + NORMAL)
+        return True
+    print(f"{VERT}{rapport['total']} absences sur {rapport['jours']} jours de classe "
+          f"(du {rapport['debut']} au {rapport['fin']}), taux moyen {rapport['taux_moyen']:.2%}" + NORMAL)
+    print(BLEU + "\nÉtudiants les plus absents :" + NORMAL)
+    for rang, (nom, total) in enumerate(rapport["absenteistes"], 1):
+        print(f"{rang}. {nom} - {total} absences")
+    print(BLEU + "\nJours les plus touchés :" + NORMAL)
+    for date, nombre, taux in rapport["jours_critiques"]:
+        print(f"{date} : {nombre} absents ({taux:.2%})")
+    print(BLEU + "\nPlus longues séries d'absences consécutives (jours de classe) :" + NORMAL)
+    for nom, longueur, premier, dernier in rapport["series"]:
+        print(f"{nom} - {longueur} jours, du {premier} au {dernier}")
+    print()
+    return True
+
+@mesure("exporter txt")
 def exporter_donnees() -> None:
-    with open(EXPORT_FILE, "w") as f:
-        f.write("Étudiants:\n")
-        for etudiant in etudiants:
-            f.write(f"{etudiant}\n")
-        f.write("\nEnseignants:\n")
-        for enseignant in enseignants:
-            f.write(f"{enseignant}\n")
-        f.write("\nCours:\n")
-        for c in cours:
-            f.write(f"{c}\n")
-        f.write("\nNotes:\n")
-        for note in notes:
-            f.write(f"{note}\n")
-        f.write("\nAbsences:\n")
-        for absence in absences:
-            f.write(f"{absence}\n")
-    print(VERT + "Données exportées dans 'export.txt' avec succès!" + NORMAL)
-
-
-def rechercher_etudiant_par_nom(etudiants: List[Dict[str, Any]]) -> None:
-    nom = input("Entrez le nom de l'étudiant à rechercher : ")
-    resultats = [etudiant for etudiant in etudiants if etudiant["nom"].lower() == nom.lower()]
+    with open(chemin(EXPORT_FILE), "w", buffering=TAMPON_EXPORT) as f:
+        for position, (nom, titre) in enumerate(TITRES.items()):
+            if position:
+                f.write("\n")
+            f.write(f"{titre}:\n")
+            for lot in par_lots(parcourir(nom)):
+                f.write("".join(f"{lisible(enregistrement)}\n" for enregistrement in lot))
+    print(VERT + f"Données exportées dans '{chemin(EXPORT_FILE)}' avec succès!" + NORMAL)
+
+def exporter_dans_processus(ecole: Optional[str], nom_stockage: str, format_export: str) -> None:
+    """Export d'un format dans un processus séparé, qui lit lui-même le stockage de l'école."""
+    choisir_ecole(ecole)
+    choisir_stockage(nom_stockage, lecture_seule=True)
+    try:
+        charger_donnees()
+        EXPORTS[format_export]()
+    finally:
+        stockage.fermer()
+
+@mesure("exporter en parallèle")
+def exporter_en_parallele(nom_stockage: str, formats: List[str], processus: int) -> None:
+    """Exporte les données sauvegardées dans plusieurs formats à la fois, un processus par format."""
+    from concurrent.futures import ProcessPoolExecutor
+    debut = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(processus, len(formats))) as executeur:
+        for tache in [executeur.submit(exporter_dans_processus, ecole_choisie, nom_stockage, format_export) for format_export in formats]:
+            tache.result()
+    print(VERT + f"Export {', '.join(formats)} terminé en {time.perf_counter() - debut:.2f} s." + NORMAL)
+
+def calculer_bulletins(debut: Optional[str] = None, fin: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Bulletin de chaque étudiant : ses notes et moyennes par cours, sa moyenne générale,
+    son rang et ses absences (entre `debut` et `fin` inclus si donnés).
+
+    Les agrégats sont calculés en un seul passage sur les notes ; les absences sont
+    comptées sur les bits de chaque étudiant. Les bulletins ne contiennent que des
+    valeurs simples, pour être envoyés tels quels aux processus qui les écrivent.
+    """
+    exiger("etudiants", "cours", "notes", "absences")
+    # Bits des jours de classe de la période (tous sans période), comme dans compter_absences
+    origine = origine_absences or 0
+    premier = max(rang_de_classe(debut) - origine, 0) if debut else 0
+    masque = -1 << premier
+    if fin:
+        dernier = rang_de_classe(fin, fin=True) - origine
+        masque &= (1 << max(dernier + 1, 0)) - 1
+    noms_cours = {c.id: c.nom for c in cours}
+    # Étudiant -> cours -> [somme, nombre de notes chiffrées, textes des notes]
+    agregats: Dict[int, Dict[Optional[int], List[Any]]] = {}
+    # Somme des notes chiffrées de chaque étudiant, dans l'ordre des notes comme dans
+    # analyser_notes : les moyennes, donc les ex aequo, sont exactement les mêmes
+    sommes: Dict[int, float] = {}
+    for note in notes:
+        par_cours = agregats.get(note.etudiant_id)
+        if par_cours is None:
+            par_cours = agregats[note.etudiant_id] = {}
+        agregat = par_cours.get(note.cours_id)
+        if agregat is None:
+            agregat = par_cours[note.cours_id] = [0.0, 0, []]
+        if not math.isnan(note.note):
+            agregat[0] += note.note
+            agregat[1] += 1
+            sommes[note.etudiant_id] = sommes.get(note.etudiant_id, 0.0) + note.note
+        agregat[2].append(note.texte())
+    bulletins = []
+    for etudiant in etudiants:
+        lignes = []
+        nombre = 0
+        for cours_id, (somme_cours, nombre_cours, textes) in agregats.get(etudiant.id, {}).items():
+            lignes.append((noms_cours.get(cours_id, "Sans cours"), textes,
+                           somme_cours / nombre_cours if nombre_cours else None))
+            nombre += nombre_cours
+        somme = sommes.get(etudiant.id, 0.0)
+        bulletins.append({"id": etudiant.id, "nom": etudiant.nom, "cours": lignes,
+                          "moyenne": somme / nombre if nombre else None, "notes": nombre,
+                          "absences": (bits_absences.get(etudiant.id, 0) & masque).bit_count(), "rang": None})
+    # Même classement que l'analyse des notes : les ex aequo partagent le même rang
+    classes = sorted((b for b in bulletins if b["moyenne"] is not None), key=lambda b: -b["moyenne"])
+    for rang, bulletin in zip(rangs_ex_aequo([b["moyenne"] for b in classes]), classes):
+        bulletin["rang"] = rang
+    return bulletins
+
+def texte_moyenne(moyenne: Optional[float]) -> str:
+    return "-" if moyenne is None else f"{moyenne:.2f}"
+
+def ecrire_bulletin_csv(bulletin: Dict[str, Any], fichier: str, effectif: int) -> None:
+    with open(fichier, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Cours", "Notes", "Moyenne"])
+        writer.writerows([nom, " ".join(textes), texte_moyenne(moyenne)] for nom, textes, moyenne in bulletin["cours"])
+        writer.writerow([])
+        writer.writerow(["Étudiant", bulletin["nom"]])
+        writer.writerow(["Moyenne générale", texte_moyenne(bulletin["moyenne"])])
+        writer.writerow(["Rang", f"{bulletin['rang']}/{effectif}" if bulletin["rang"] else "-"])
+        writer.writerow(["Absences", bulletin["absences"]])
+
+# Document Word de chaque processus, vidé et réutilisé d'un bulletin à l'autre :
+# ouvrir un nouveau document coûte plus cher que de l'écrire
+document_bulletin: Any = None
+
+def ecrire_bulletin_docx(bulletin: Dict[str, Any], fichier: str, effectif: int) -> None:
+    global document_bulletin
+    if document_bulletin is None:
+        from docx import Document
+        document_bulletin = Document()
+    document = document_bulletin
+    document.element.body.clear_content()
+    document.add_heading(f"Bulletin de {bulletin['nom']}", 0)
+    table = document.add_table(rows=1, cols=3)
+    for cellule, entete in zip(table.rows[0].cells, ("Cours", "Notes", "Moyenne")):
+        cellule.text = entete
+    for nom, textes, moyenne in bulletin["cours"]:
+        for cellule, valeur in zip(table.add_row().cells, (nom, " ".join(textes), texte_moyenne(moyenne))):
+            cellule.text = valeur
+    document.add_paragraph(f"Moyenne générale : {texte_moyenne(bulletin['moyenne'])}")
+    document.add_paragraph(f"Rang : {bulletin['rang']}/{effectif}" if bulletin["rang"] else "Rang : -")
+    document.add_paragraph(f"Absences : {bulletin['absences']}")
+    document.save(fichier)
+
+# Formats de bulletin : fonction qui écrit un bulletin dans un fichier
+BULLETINS = {
+    "docx": ecrire_bulletin_docx,
+    "csv": ecrire_bulletin_csv,
+}
+
+def rendre_bulletins(format_bulletin: str, dossier: str, lot: List[Dict[str, Any]], effectif: int) -> int:
+    """Écrit un lot de bulletins, un fichier par étudiant ; renvoie leur nombre.
+
+    Appelée dans les processus de travail : elle ne lit que le lot reçu, jamais les
+    données du programme.
+    """
+    ecrire = BULLETINS[format_bulletin]
+    for bulletin in lot:
+        nom_fichier = f"{bulletin['id']}-{'_'.join(MOTS.findall(bulletin['nom']))}.{format_bulletin}"
+        ecrire(bulletin, os.path.join(dossier, nom_fichier), effectif)
+    return len(lot)
+
+@mesure("bulletins")
+def generer_bulletins(format_bulletin: str = "docx", processus: int = 1, taille_lot: Optional[int] = None,
+                      dossier: Optional[str] = None, debut: Optional[str] = None, fin: Optional[str] = None) -> bool:
+    """Écrit le bulletin de chaque étudiant dans `dossier` (par défaut BULLETINS_DIR dans le
+    dossier de l'école), par lots répartis sur `processus` processus.
+
+    Sans `taille_lot`, les lots sont assez petits pour que chaque processus en reçoive
+    plusieurs (les plus rapides prennent la suite des autres), sans dépasser
+    TAILLE_LOT_BULLETINS.
+    """
+    debut_generation = time.perf_counter()
+    dossier = dossier or chemin(BULLETINS_DIR)
+    try:
+        bulletins = calculer_bulletins(debut, fin)
+    except ValueError:
+        print(ROUGE + "Format de date invalide. Assurez-vous d'utiliser le format YYYY-MM-DD." + NORMAL)
+        return False
+    total = len(bulletins)
+    if not total:
+        print(Fore.YELLOW + "Aucun étudiant n'est enregistré.")
+        return False
+    if taille_lot is None:
+        taille_lot = max(1, min(TAILLE_LOT_BULLETINS, -(-total // (processus * 4))))
+    duree_calcul = time.perf_counter() - debut_generation
+    os.makedirs(dossier, exist_ok=True)
+    lots = list(par_lots(bulletins, taille_lot))
+    del bulletins
+    faits = 0
+
+    def progresser(nombre: int) -> None:
+        nonlocal faits
+        faits += nombre
+        print(f"\r{faits}/{total} bulletins ({faits * 100 // total}%)", end="", flush=True)
+
+    if processus <= 1 or len(lots) == 1:
+        for lot in lots:
+            progresser(rendre_bulletins(format_bulletin, dossier, lot, total))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=min(processus, len(lots))) as executeur:
+            taches = [executeur.submit(rendre_bulletins, format_bulletin, dossier, lot, total) for lot in lots]
+            # Les lots ne sont plus utiles une fois envoyés aux processus
+            del lots
+            for tache in as_completed(taches):
+                progresser(tache.result())
+    duree = time.perf_counter() - debut_generation
+    print()
+    print(VERT + f"{total} bulletins {format_bulletin} écrits dans '{dossier}' en {duree:.2f} s "
+          f"(agrégats {duree_calcul:.2f} s) : {total / duree:.0f} bulletins/s, "
+          f"{processus} processus, lots de {taille_lot}." + NORMAL)
+    return True
+
+def exporter() -> None:
+    print(BLEU + "Exporter les données:" + NORMAL)
+    print(VERT + f"1. Texte ({chemin(EXPORT_FILE)})" + NORMAL)
+    print(VERT + "2. CSV (un fichier par collection)" + NORMAL)
+    print(VERT + f"3. Word ({chemin(EXPORT_DOCX)})" + NORMAL)
+    print(VERT + "4. Tous les formats" + NORMAL)
+    print(VERT + f"5. Bulletins de notes Word (dossier '{chemin(BULLETINS_DIR)}')" + NORMAL)
+    print(VERT + f"6. Bulletins de notes CSV (dossier '{chemin(BULLETINS_DIR)}')" + NORMAL)
+    print(JAUNE + "7. Retour" + NORMAL)
+    choix = input("Choisissez une option : ")
+    if choix in ("1", "2", "3"):
+        EXPORTS[("txt", "csv", "docx")[int(choix) - 1]]()
+    elif choix == "4":
+        # Dans le menu, les modifications non sauvegardées doivent figurer dans l'export :
+        # les formats sont produits ici plutôt que dans des processus qui reliraient le stockage
+        for export in EXPORTS.values():
+            export()
+    elif choix in ("5", "6"):
+        # Les processus reçoivent les bulletins calculés ici : les modifications non sauvegardées y figurent
+        generer_bulletins("docx" if choix == "5" else "csv", os.cpu_count() or 1)
+    elif choix == "7":
+        return
+    else:
+        print(ROUGE + "Option invalide. Veuillez choisir une option valide." + NORMAL)
+
+
+def rechercher_approche(nom: str, requete: str, limite: int = LIMITE_RESULTATS) -> List[Any]:
+    """Enregistrements dont le nom correspond à la requête (préfixe, sous-chaîne ou faute de frappe),
+    les plus pertinents d'abord ; pour les notes et absences, ceux des étudiants trouvés."""
+    return [enregistrement for _, enregistrement in rechercher_approche_classee(nom, requete, limite)]
+
+def rechercher_approche_classee(nom: str, requete: str,
+                                limite: int = LIMITE_RESULTATS) -> List[Tuple[Tuple[int, float], Any]]:
+    """Comme rechercher_approche, chaque enregistrement précédé de la pertinence de son nom
+    (IndexApproche.rechercher_classe) ; une note ou une absence prend celle de son étudiant."""
+    if nom not in INDEX_APPROCHES:
+        return [(pertinence, enregistrement)
+                for pertinence, etudiant in rechercher_approche_classee("etudiants", requete, limite)
+                for enregistrement in lies(nom, "etudiant_id", etudiant.id)]
+    if interrogeable(nom):
+        with mesurer("rechercher", nom):
+            resultats = rechercher_dans_stockage(nom, requete, limite)
+            compter_parcourus(len(resultats))
+            return resultats
+    exiger(nom)
+    with mesurer("rechercher", nom):
+        index = COLLECTIONS[nom][1]
+        approche = INDEX_APPROCHES[nom]
+        if not approche.construit:
+            approche.construire(index)
+        resultats: List[Tuple[Tuple[int, float], Any]] = []
+        for pertinence, cle in approche.rechercher_classe(requete, limite):
+            resultats.extend((pertinence, enregistrement) for enregistrement in index[cle])
+        compter_parcourus(len(resultats))
+        return resultats
+
+def rechercher_dans_stockage(nom: str, requete: str, limite: int) -> List[Tuple[Tuple[int, float], Any]]:
+    """IndexApproche.rechercher_classe par requêtes sur le stockage, sans charger la collection.
+
+    Les préfixes sont lus dans l'index des noms normalisés ; les sous-chaînes, puis à défaut
+    les noms proches, en un parcours des noms qui ne garde que les meilleurs. Chaque clé
+    retenue (nom sans casse) est suivie de tous ses homonymes, comme dans l'index en mémoire.
+    """
+    requete = normaliser(requete)
+    if not requete:
+        return []
+    debut = " " + requete
+    # Clé -> pertinence, dans l'ordre des résultats
+    pertinences: Dict[str, Tuple[int, float]] = {}
+    dernier = None
+    for normalise, valeur in stockage.noms_commencant(nom, requete):
+        if len(pertinences) >= limite and normalise != dernier:
+            break
+        dernier = normalise
+        if len(pertinences) < limite:
+            pertinences.setdefault(cle_nom(valeur), (IndexApproche.correspondance(" " + normalise, debut), 0.0))
+    if len(pertinences) < limite:
+        mots = requete.split()
+        morceaux = [" " + mot if len(mot) < 3 else mot for mot in mots]
+        debuts: Dict[str, str] = {}
+        milieux: Dict[str, str] = {}
+        for normalise, valeur in stockage.noms_contenant(nom, morceaux):
+            cle, normalise = cle_nom(valeur), " " + normalise
+            if cle in pertinences or cle in debuts or cle in milieux:
+                continue
+            if debut in normalise:
+                debuts[cle] = normalise
+                if len(debuts) == limite - len(pertinences):
+                    break
+            elif len(milieux) < limite - len(pertinences):
+                milieux[cle] = normalise
+        cle_tri = lambda element: (len(element[1]), element[1])
+        for cle, normalise in (sorted(debuts.items(), key=cle_tri) + sorted(milieux.items(), key=cle_tri)):
+            if len(pertinences) == limite:
+                break
+            pertinences[cle] = (IndexApproche.correspondance(normalise, debut), 0.0)
+    if not pertinences:
+        trigrammes_requete = trigrammes(requete)
+        minimum = SEUIL_SIMILARITE * len(trigrammes_requete)
+        communs = ((len(trigrammes(normalise) & trigrammes_requete), normalise, valeur)
+                   for normalise, valeur in stockage.noms_contenant(nom, ()))
+        proches = heapq.nsmallest(limite, (candidat for candidat in communs if candidat[0] >= minimum),
+                                  key=lambda candidat: (-candidat[0], len(candidat[1]), candidat[1]))
+        for commun, _, valeur in proches:
+            pertinences.setdefault(cle_nom(valeur), (CORRESPONDANCES.index("proche"),
+                                                     1 - commun / len(trigrammes_requete)))
+    return [(pertinence, TYPES[nom].depuis_dict(data))
+            for cle, pertinence in pertinences.items()
+            for data in stockage.homonymes(nom, cle) if cle_nom(data["nom"]) == cle]
+
+def rechercher_etudiant_par_nom(etudiants: List[Etudiant], nom: Optional[str] = None) -> None:
+    if nom is None:
+        nom = input("Entrez le nom de l'étudiant à rechercher : ")
+    resultats = rechercher_approche("etudiants", nom)
     if resultats:
         print(Fore.CYAN + "\nÉtudiants trouvés :")
         for idx, etudiant in enumerate(resultats, 1):
-            date_ajout = etudiant.get("date_ajout", "Date non disponible")
-            print(f"{idx}. {etudiant['nom']} - {date_ajout}")
+            print(f"{idx}. {etudiant.nom} - {formater_date(etudiant.date_ajout)}")
         print()
     else:
         print(Fore.YELLOW + "Aucun étudiant trouvé pour ce nom.")
 
-def rechercher_enseignant_par_nom(enseignants: List[Dict[str, Any]]) -> None:
-    nom = input("Entrez le nom de l'enseignant à rechercher : ")
-    resultats = [enseignant for enseignant in enseignants if enseignant["nom"].lower() == nom.lower()]
+def rechercher_enseignant_par_nom(enseignants: List[Enseignant], nom: Optional[str] = None) -> None:
+    if nom is None:
+        nom = input("Entrez le nom de l'enseignant à rechercher : ")
+    resultats = rechercher_approche("enseignants", nom)
     if resultats:
         print(Fore.CYAN + "\nEnseignants trouvés :")
         for idx, enseignant in enumerate(resultats, 1):
-            print(f"{idx}. {enseignant['nom']}")
+            print(f"{idx}. {enseignant.nom}")
         print()
     else:
         print(Fore.YELLOW + "Aucun enseignant trouvé pour ce nom.")
 
-def rechercher_cours_par_nom(cours: List[Dict[str, Any]]) -> None:
-    nom = input("Entrez le nom du cours à rechercher : ")
-    resultats = [c for c in cours if c["nom"].lower() == nom.lower()]
+def rechercher_cours_par_nom(cours: List[Cours], nom: Optional[str] = None) -> None:
+    if nom is None:
+        nom = input("Entrez le nom du cours à rechercher : ")
+    resultats = rechercher_approche("cours", nom)
     if resultats:
         print(Fore.CYAN + "\nCours trouvés :")
         for idx, c in enumerate(resultats, 1):
-            print(f"{idx}. {c['nom']}")
+            print(f"{idx}. {c.nom}")
         print()
     else:
         print(Fore.YELLOW + "Aucun cours trouvé pour ce nom.")
 
-def rechercher_note_par_etudiant(notes: List[Dict[str, Any]]) -> None:
-    etudiant = input("Entrez le nom de l'étudiant : ")
-    resultats = [note for note in notes if note["etudiant"].lower() == etudiant.lower()]
+def rechercher_note_par_etudiant(notes: List[Note], etudiant: Optional[str] = None) -> None:
+    if etudiant is None:
+        etudiant = input("Entrez le nom de l'étudiant : ")
+    resultats = rechercher_approche("notes", etudiant)
     if resultats:
         print(Fore.CYAN + "\nNotes trouvées :")
         for idx, note in enumerate(resultats, 1):
-            print(f"{idx}. {note['etudiant']} - {note['note']}")
+            print(f"{idx}. {nom_de('etudiants', note.etudiant_id)} - {note.texte()}")
         print()
     else:
         print(Fore.YELLOW + "Aucune note trouvée pour cet étudiant.")
@@ -235,17 +2899,32 @@ def rechercher() -> None:
     print(BLEU + "Rechercher:" + NORMAL)
     print(VERT + "1. Rechercher un étudiant par date d'ajout" + NORMAL)
     print(VERT + "2. Rechercher un étudiant par nom" + NORMAL)
-    print(JAUNE + "3. Retour" + NORMAL)
+    print(VERT + "3. Rechercher les étudiants ajoutés entre deux dates" + NORMAL)
+    print(JAUNE + "4. Retour" + NORMAL)
     choix = input("Choisissez une option : ")
     if choix == "1":
         rechercher_etudiant_par_date(etudiants)
     elif choix == "2":
         rechercher_etudiant_par_nom(etudiants)
     elif choix == "3":
+        rechercher_etudiant_par_periode(etudiants)
+    elif choix == "4":
         return
     else:
         print(ROUGE + "Option invalide. Veuillez choisir une option valide." + NORMAL)
 
+# Recherches par nom : type -> (collection, fonction de recherche)
+RECHERCHES = {
+    "etudiant": ("etudiants", rechercher_etudiant_par_nom),
+    "enseignant": ("enseignants", rechercher_enseignant_par_nom),
+    "cours": ("cours", rechercher_cours_par_nom),
+    "note": ("notes", rechercher_note_par_etudiant),
+}
+
+def rechercher_par_nom(type_recherche: str, nom: str) -> None:
+    collection, fonction = RECHERCHES[type_recherche]
+    fonction(COLLECTIONS[collection][0], nom)
+
 
 def afficher_menu() -> None:
     print(ROUGE + "Menu:" + NORMAL)
@@ -262,9 +2941,13 @@ def afficher_menu() -> None:
     print(BLEU + "11. Exporter les données" + NORMAL)
     print(JAUNE + "12. Sauvegarder" + NORMAL)
     print(JAUNE + "13. Charger" + NORMAL)
-    print(JAUNE + "14. Quitter" + NORMAL)
+    print(BLEU + "14. Analyse des notes" + NORMAL)
+    print(BLEU + "15. Performance" + NORMAL)
+    print(JAUNE + "16. Annuler et instantanés" + NORMAL)
+    print(JAUNE + "17. Quitter" + NORMAL)
 
 def gestion_etudiants() -> None:
+    exiger("etudiants")
     print(ROUGE + "Gestion des étudiants:" + NORMAL)
     print(VERT + "1. Ajouter un étudiant" + NORMAL)
     print(VERT + "2. Modifier un étudiant" + NORMAL)
@@ -283,11 +2966,13 @@ def gestion_etudiants() -> None:
         print("Option invalidée. Veuillez choisir une option valide.")
 
 def gestion_enseignants() -> None:
+    exiger("enseignants")
     print(ROUGE + "Gestion des enseignants:" + NORMAL)
     print(VERT + "1. Ajouter un enseignant" + NORMAL)
     print(VERT + "2. Modifier un enseignant" + NORMAL)
     print(VERT + "3. Supprimer un enseignant" + NORMAL)
-    print(JAUNE + "4. Retour" + NORMAL)
+    print(VERT + "4. Cours d'un enseignant" + NORMAL)
+    print(JAUNE + "5. Retour" + NORMAL)
     choix = input("Choisissez une option : ")
     if choix == "1":
         ajouter_enseignant()
@@ -296,16 +2981,21 @@ def gestion_enseignants() -> None:
     elif choix == "3":
         supprimer_enseignant()
     elif choix == "4":
+        afficher_cours_enseignant()
+    elif choix == "5":
         return
     else:
         print("Option invalidée. Veuillez choisir une option valide.")
 
 def gestion_cours() -> None:
+    exiger("cours")
     print(ROUGE + "Gestion des cours:" + NORMAL)
     print(VERT + "1. Ajouter un cours" + NORMAL)
     print(VERT + "2. Modifier un cours" + NORMAL)
     print(VERT + "3. Supprimer un cours" + NORMAL)
-    print(JAUNE + "4. Retour" + NORMAL)
+    print(VERT + "4. Affecter un enseignant" + NORMAL)
+    print(VERT + "5. Notes d'un cours" + NORMAL)
+    print(JAUNE + "6. Retour" + NORMAL)
     choix = input("Choisissez une option : ")
     if choix == "1":
         ajouter_cours()
@@ -314,11 +3004,16 @@ def gestion_cours() -> None:
     elif choix == "3":
         supprimer_cours()
     elif choix == "4":
+        affecter_enseignant()
+    elif choix == "5":
+        afficher_notes_cours()
+    elif choix == "6":
         return
     else:
         print("Option invalidée. Veuillez choisir une option valide.")
 
 def gestion_notes() -> None:
+    exiger("notes")
     print(ROUGE + "Gestion des notes:" + NORMAL)
     print(VERT + "1. Ajouter une note" + NORMAL)
     print(VERT + "2. Modifier une note" + NORMAL)
@@ -337,11 +3032,15 @@ def gestion_notes() -> None:
         print("Option invalidée. Veuillez choisir une option valide.")
 
 def gestion_absences() -> None:
+    exiger("absences")
     print(ROUGE + "Gestion des absences:" + NORMAL)
     print(VERT + "1. Ajouter une absence" + NORMAL)
     print(VERT + "2. Modifier une absence" + NORMAL)
     print(VERT + "3. Supprimer une absence" + NORMAL)
-    print(JAUNE + "4. Retour" + NORMAL)
+    print(VERT + "4. Vérifier une absence" + NORMAL)
+    print(VERT + "5. Compter les absences d'un étudiant sur une période" + NORMAL)
+    print(VERT + "6. Rapport des absences" + NORMAL)
+    print(JAUNE + "7. Retour" + NORMAL)
     choix = input("Choisissez une option : ")
     if choix == "1":
         ajouter_absence()
@@ -350,151 +3049,1290 @@ def gestion_absences() -> None:
     elif choix == "3":
         supprimer_absence()
     elif choix == "4":
+        verifier_absence()
+    elif choix == "5":
+        afficher_compte_absences()
+    elif choix == "6":
+        afficher_rapport_absences()
+    elif choix == "7":
         return
     else:
         print("Option invalidée. Veuillez choisir une option valide.")
 
+def gestion_performances() -> None:
+    global profil_actif
+    print(ROUGE + "Performance:" + NORMAL)
+    print(VERT + "1. Afficher les mesures" + NORMAL)
+    print(VERT + f"2. Enregistrer les mesures ({PROFIL_FILE})" + NORMAL)
+    print(VERT + ("3. Désactiver" if profil_actif else "3. Activer") + " les mesures" + NORMAL)
+    print(VERT + "4. Effacer les mesures" + NORMAL)
+    print(JAUNE + "5. Retour" + NORMAL)
+    choix = input("Choisissez une option : ")
+    if choix == "1":
+        afficher_performances()
+    elif choix == "2":
+        ecrire_profil(PROFIL_FILE)
+    elif choix == "3":
+        profil_actif = not profil_actif
+        print(VERT + ("Mesures activées." if profil_actif else "Mesures désactivées.") + NORMAL)
+    elif choix == "4":
+        histogrammes.clear()
+        print(VERT + "Mesures effacées." + NORMAL)
+    elif choix == "5":
+        return
+    else:
+        print(ROUGE + "Option invalide. Veuillez choisir une option valide." + NORMAL)
+
+def decrire_operation(operation: Dict[str, Any]) -> str:
+    return f"{operation['op']} dans {TITRES[operation['collection']].lower()}"
+
+def annuler_modification() -> bool:
+    operation = annuler_derniere()
+    if operation is None:
+        print(Fore.YELLOW + "Aucune modification à annuler.")
+        return False
+    print(VERT + f"Modification annulée ({decrire_operation(operation)})." + NORMAL)
+    return True
+
+def retablir_modification() -> bool:
+    operation = retablir_derniere()
+    if operation is None:
+        print(Fore.YELLOW + "Aucune modification à rétablir.")
+        return False
+    print(VERT + f"Modification rétablie ({decrire_operation(operation)})." + NORMAL)
+    return True
+
+def prendre_instantane(nom: Optional[str] = None) -> bool:
+    """Nomme l'état courant des données ; seule sa position dans l'historique est retenue."""
+    if nom is None:
+        nom = input("Entrez le nom de l'instantané : ")
+    instantanes_nommes[nom] = len(historique)
+    print(VERT + f"Instantané '{nom}' pris." + NORMAL)
+    return True
+
+@mesure("restaurer")
+def restaurer_instantane(nom: Optional[str] = None) -> bool:
+    """Ramène les données à un instantané en annulant (ou rétablissant) les modifications
+    faites depuis, sans relire le stockage."""
+    if nom is None:
+        nom = input("Entrez le nom de l'instantané à restaurer : ")
+    position = instantanes_nommes.get(nom)
+    if position is None:
+        print(ROUGE + "Instantané non trouvé." + NORMAL)
+        return False
+    annulees = 0
+    while len(historique) > position:
+        annuler_derniere()
+        annulees += 1
+    retablies = 0
+    while len(historique) < position:
+        retablir_derniere()
+        retablies += 1
+    print(VERT + f"Instantané '{nom}' restauré ({annulees} modifications annulées, "
+          f"{retablies} rétablies)." + NORMAL)
+    return True
+
+def lister_instantanes() -> None:
+    if not instantanes_nommes:
+        print(Fore.YELLOW + "Aucun instantané n'a été pris.")
+        return
+    print(Fore.CYAN + "\nInstantanés :")
+    for nom, position in instantanes_nommes.items():
+        ecart = len(historique) - position
+        if ecart >= 0:
+            print(f"- {nom} : {ecart} modifications depuis")
+        else:
+            print(f"- {nom} : {-ecart} modifications annulées à rétablir")
+    print()
+
+def gestion_historique() -> None:
+    print(ROUGE + "Annuler et instantanés:" + NORMAL)
+    print(VERT + "1. Annuler la dernière modification" + NORMAL)
+    print(VERT + "2. Rétablir la dernière modification annulée" + NORMAL)
+    print(VERT + "3. Prendre un instantané" + NORMAL)
+    print(VERT + "4. Restaurer un instantané" + NORMAL)
+    print(VERT + "5. Lister les instantanés" + NORMAL)
+    print(JAUNE + "6. Retour" + NORMAL)
+    choix = input("Choisissez une option : ")
+    if choix == "1":
+        annuler_modification()
+    elif choix == "2":
+        retablir_modification()
+    elif choix == "3":
+        prendre_instantane()
+    elif choix == "4":
+        restaurer_instantane()
+    elif choix == "5":
+        lister_instantanes()
+    elif choix == "6":
+        return
+    else:
+        print(ROUGE + "Option invalide. Veuillez choisir une option valide." + NORMAL)
+
+def lister_collection(nom: str) -> None:
+    with mesurer("lister", nom):
+        print(BLEU + f"Liste des {TITRES[nom].lower()}:" + NORMAL)
+        for enregistrement in parcourir(nom):
+            print(lisible(enregistrement))
+
 def lister_etudiants() -> None:
-    print(BLEU + "Liste des étudiants:" + NORMAL)
-    for etudiant in etudiants:
-        print(etudiant)
+    lister_collection("etudiants")
 
 def lister_enseignants() -> None:
-    print(BLEU + "Liste des enseignants:" + NORMAL)
-    for enseignant in enseignants:
-        print(enseignant)
+    lister_collection("enseignants")
 
 def lister_absences() -> None:
-    print(BLEU + "Liste des absences:" + NORMAL)
-    for absence in absences:
-        print(absence)
+    lister_collection("absences")
 
-def ajouter_etudiant() -> None:
-    nom = input("Entrez le nom de l'étudiant : ")
-    if any(etudiant["nom"].lower() == nom.lower() for etudiant in etudiants):
+# Les fonctions suivantes demandent les valeurs manquantes à l'utilisateur ;
+# appelées avec tous leurs arguments (ligne de commande, --batch), elles ne
+# posent aucune question. Elles renvoient True si l'opération a été effectuée.
+
+def ajouter_etudiant(nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom de l'étudiant : ")
+    if existe("etudiants", nom):
         print(Fore.YELLOW + "Cet étudiant existe déjà.")
-    else:
-        date_ajout = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        etudiants.append({"nom": nom, "date_ajout": date_ajout})
-        print(Fore.GREEN + f"{nom} a été ajouté avec succès.")
+        return False
+    date_ajout = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    executer({"op": "ajouter", "collection": "etudiants",
+              "enregistrement": {"nom": nom, "date_ajout": date_ajout}})
+    print(Fore.GREEN + f"{nom} a été ajouté avec succès.")
+    return True
 
-def modifier_etudiant() -> None:
-    nom = input("Entrez le nom de l'étudiant à modifier : ")
-    for etudiant in etudiants:
-        if etudiant["nom"] == nom:
-            nouveau_nom = input("Entrez le nouveau nom de l'étudiant : ")
-            etudiant["nom"] = nouveau_nom
-            print(VERT + "Étudiant modifié avec succès!" + NORMAL)
-            return
-    print(ROUGE + "Étudiant non trouvé." + NORMAL)
+def modifier_etudiant(nom: Optional[str] = None, nouveau_nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom de l'étudiant à modifier : ")
+    etudiant = chercher("etudiants", nom)
+    if etudiant is None:
+        print(ROUGE + "Étudiant non trouvé." + NORMAL)
+        return False
+    if nouveau_nom is None:
+        nouveau_nom = input("Entrez le nouveau nom de l'étudiant : ")
+    # Notes et absences désignent l'étudiant par son identifiant : elles le suivent
+    executer({"op": "modifier", "collection": "etudiants", "id": etudiant.id, "champ": "nom", "valeur": nouveau_nom})
+    print(VERT + "Étudiant modifié avec succès!" + NORMAL)
+    return True
 
-def supprimer_etudiant() -> None:
-    nom = input("Entrez le nom de l'étudiant à supprimer : ")
-    for etudiant in etudiants:
-        if etudiant["nom"] == nom:
-            etudiants.remove(etudiant)
-            print(VERT + "Étudiant supprimé avec succès!" + NORMAL)
-            return
-    print(ROUGE + "Étudiant non trouvé." + NORMAL)
+def supprimer_etudiant(nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom de l'étudiant à supprimer : ")
+    etudiant = chercher("etudiants", nom)
+    if etudiant is None:
+        print(ROUGE + "Étudiant non trouvé." + NORMAL)
+        return False
+    executer({"op": "supprimer", "collection": "etudiants", "id": etudiant.id})
+    print(VERT + "Étudiant supprimé avec succès, ainsi que ses notes et absences!" + NORMAL)
+    return True
 
-def ajouter_enseignant() -> None:
-    nom = input("Entrez le nom de l'enseignant : ")
-    enseignants.append({"nom": nom})
+def ajouter_enseignant(nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom de l'enseignant : ")
+    executer({"op": "ajouter", "collection": "enseignants", "enregistrement": {"nom": nom}})
     print(VERT + "Enseignant ajouté avec succès!" + NORMAL)
+    return True
 
-def modifier_enseignant() -> None:
-    nom = input("Entrez le nom de l'enseignant à modifier : ")
-    for enseignant in enseignants:
-        if enseignant["nom"] == nom:
-            nouveau_nom = input("Entrez le nouveau nom de l'enseignant : ")
-            enseignant["nom"] = nouveau_nom
-            print(VERT + "Enseignant modifié avec succès!" + NORMAL)
-            return
-    print(ROUGE + "Enseignant non trouvé." + NORMAL)
-
-def supprimer_enseignant() -> None:
-    nom = input("Entrez le nom de l'enseignant à supprimer : ")
-    for enseignant in enseignants:
-        if enseignant["nom"] == nom:
-            enseignants.remove(enseignant)
-            print(VERT + "Enseignant supprimé avec succès!" + NORMAL)
-            return
-    print(ROUGE + "Enseignant non trouvé." + NORMAL)
+def modifier_enseignant(nom: Optional[str] = None, nouveau_nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom de l'enseignant à modifier : ")
+    enseignant = chercher("enseignants", nom)
+    if enseignant is None:
+        print(ROUGE + "Enseignant non trouvé." + NORMAL)
+        return False
+    if nouveau_nom is None:
+        nouveau_nom = input("Entrez le nouveau nom de l'enseignant : ")
+    executer({"op": "modifier", "collection": "enseignants", "id": enseignant.id, "champ": "nom",
+              "valeur": nouveau_nom})
+    print(VERT + "Enseignant modifié avec succès!" + NORMAL)
+    return True
+
+def supprimer_enseignant(nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom de l'enseignant à supprimer : ")
+    enseignant = chercher("enseignants", nom)
+    if enseignant is None:
+        print(ROUGE + "Enseignant non trouvé." + NORMAL)
+        return False
+    # Ses cours restent, sans enseignant
+    executer({"op": "supprimer", "collection": "enseignants", "id": enseignant.id})
+    print(VERT + "Enseignant supprimé avec succès!" + NORMAL)
+    return True
+
+def afficher_cours_enseignant(nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom de l'enseignant : ")
+    enseignant = chercher("enseignants", nom)
+    if enseignant is None:
+        print(ROUGE + "Enseignant non trouvé." + NORMAL)
+        return False
+    resultats = lies("cours", "enseignant_id", enseignant.id)
+    compter_parcourus(len(resultats))
+    if resultats:
+        print(Fore.CYAN + f"\nCours de {enseignant.nom} :")
+        for idx, c in enumerate(resultats, 1):
+            print(f"{idx}. {c.nom}")
+        print()
+    else:
+        print(Fore.YELLOW + "Aucun cours n'est confié à cet enseignant.")
+    return True
 
-def ajouter_cours() -> None:
-    nom = input("Entrez le nom du cours : ")
-    cours.append({"nom": nom})
+def ajouter_cours(nom: Optional[str] = None, enseignant_nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom du cours : ")
+        enseignant_nom = input("Entrez le nom de l'enseignant (laisser vide si aucun) : ")
+    enregistrement: Dict[str, Any] = {"nom": nom}
+    if enseignant_nom:
+        enseignant = chercher("enseignants", enseignant_nom)
+        if enseignant is None:
+            print(ROUGE + "Enseignant non trouvé." + NORMAL)
+            return False
+        enregistrement["enseignant_id"] = enseignant.id
+    executer({"op": "ajouter", "collection": "cours", "enregistrement": enregistrement})
     print(VERT + "Cours ajouté avec succès!" + NORMAL)
+    return True
 
-def modifier_cours() -> None:
-    nom = input("Entrez le nom du cours à modifier : ")
-    for c in cours:
-        if c["nom"] == nom:
-            nouveau_nom = input("Entrez le nouveau nom du cours : ")
-            c["nom"] = nouveau_nom
-            print(VERT + "Cours modifié avec succès!" + NORMAL)
-            return
-    print(ROUGE + "Cours non trouvé." + NORMAL)
-
-def supprimer_cours() -> None:
-    nom = input("Entrez le nom du cours à supprimer : ")
-    for c in cours:
-        if c["nom"] == nom:
-            cours.remove(c)
-            print(VERT + "Cours supprimé avec succès!" + NORMAL)
-            return
-    print(ROUGE + "Cours non trouvé." + NORMAL)
+def modifier_cours(nom: Optional[str] = None, nouveau_nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom du cours à modifier : ")
+    c = chercher("cours", nom)
+    if c is None:
+        print(ROUGE + "Cours non trouvé." + NORMAL)
+        return False
+    if nouveau_nom is None:
+        nouveau_nom = input("Entrez le nouveau nom du cours : ")
+    executer({"op": "modifier", "collection": "cours", "id": c.id, "champ": "nom", "valeur": nouveau_nom})
+    print(VERT + "Cours modifié avec succès!" + NORMAL)
+    return True
+
+def affecter_enseignant(nom: Optional[str] = None, enseignant_nom: Optional[str] = None) -> bool:
+    """Confie un cours à un enseignant (ou à aucun, avec un nom vide)."""
+    if nom is None:
+        nom = input("Entrez le nom du cours : ")
+    c = chercher("cours", nom)
+    if c is None:
+        print(ROUGE + "Cours non trouvé." + NORMAL)
+        return False
+    if enseignant_nom is None:
+        enseignant_nom = input("Entrez le nom de l'enseignant (laisser vide si aucun) : ")
+    enseignant_id = None
+    if enseignant_nom:
+        enseignant = chercher("enseignants", enseignant_nom)
+        if enseignant is None:
+            print(ROUGE + "Enseignant non trouvé." + NORMAL)
+            return False
+        enseignant_id = enseignant.id
+    executer({"op": "modifier", "collection": "cours", "id": c.id, "champ": "enseignant_id",
+              "valeur": enseignant_id})
+    print(VERT + "Enseignant du cours modifié avec succès!" + NORMAL)
+    return True
+
+def supprimer_cours(nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom du cours à supprimer : ")
+    c = chercher("cours", nom)
+    if c is None:
+        print(ROUGE + "Cours non trouvé." + NORMAL)
+        return False
+    # Ses notes restent, sans cours
+    executer({"op": "supprimer", "collection": "cours", "id": c.id})
+    print(VERT + "Cours supprimé avec succès!" + NORMAL)
+    return True
 
-def ajouter_note() -> None:
-    etudiant_nom = input("Entrez le nom de l'étudiant : ")
-    note = input("Entrez la note : ")
-    notes.append({"etudiant": etudiant_nom, "note": note})
+def afficher_notes_cours(nom: Optional[str] = None) -> bool:
+    if nom is None:
+        nom = input("Entrez le nom du cours : ")
+    c = chercher("cours", nom)
+    if c is None:
+        print(ROUGE + "Cours non trouvé." + NORMAL)
+        return False
+    # Liste d'adjacence du cours : ses notes sans parcourir celles des autres cours
+    resultats = lies("notes", "cours_id", c.id)
+    compter_parcourus(len(resultats))
+    if not resultats:
+        print(Fore.YELLOW + "Aucune note n'est enregistrée pour ce cours.")
+        return True
+    enseignant = nom_de("enseignants", c.enseignant_id) or "aucun enseignant"
+    print(Fore.CYAN + f"\nNotes du cours {c.nom} ({enseignant}) :")
+    for idx, note in enumerate(resultats, 1):
+        print(f"{idx}. {nom_de('etudiants', note.etudiant_id)} - {note.texte()}")
+    valeurs = [note.note for note in resultats if not math.isnan(note.note)]
+    if valeurs:
+        print(f"Moyenne : {sum(valeurs) / len(valeurs):.2f} sur {len(valeurs)} notes")
+    print()
+    return True
+
+def ajouter_note(etudiant_nom: Optional[str] = None, note: Optional[str] = None,
+                 cours_nom: Optional[str] = None) -> bool:
+    interactif = etudiant_nom is None
+    if interactif:
+        etudiant_nom = input("Entrez le nom de l'étudiant : ")
+    etudiant = chercher("etudiants", etudiant_nom)
+    if etudiant is None:
+        print(ROUGE + "Étudiant non trouvé." + NORMAL)
+        return False
+    if note is None:
+        note = input("Entrez la note : ")
+    try:
+        lire_note(note)
+    except ValueError as erreur:
+        print(ROUGE + f"Note invalide : {erreur}." + NORMAL)
+        return False
+    enregistrement = {"etudiant_id": etudiant.id, "note": note}
+    if interactif:
+        cours_nom = input("Entrez le nom du cours (laisser vide si aucun) : ")
+    if cours_nom:
+        c = chercher("cours", cours_nom)
+        if c is None:
+            print(ROUGE + "Cours non trouvé." + NORMAL)
+            return False
+        enregistrement["cours_id"] = c.id
+    executer({"op": "ajouter", "collection": "notes", "enregistrement": enregistrement})
     print(VERT + "Note ajoutée avec succès!" + NORMAL)
+    return True
 
-def modifier_note() -> None:
-    etudiant_nom = input("Entrez le nom de l'étudiant : ")
-    for note in notes:
-        if note["etudiant"] == etudiant_nom:
-            nouvelle_note = input("Entrez la nouvelle note : ")
-            note["note"] = nouvelle_note
-            print(VERT + "Note modifiée avec succès!" + NORMAL)
-            return
-    print(ROUGE + "Note non trouvée." + NORMAL)
-def supprimer_note() -> None:
-            etudiant_nom = input("Entrez le nom de l'étudiant : ")
-            for note in notes:
-                if note["etudiant"] == etudiant_nom:
-                    notes.remove(note)
-                    print(VERT + "Note supprimée avec succès!" + NORMAL)
-                    return
-            print(ROUGE + "Note non trouvée." + NORMAL)
-
-def ajouter_absence() -> None:
-            etudiant_nom = input("Entrez le nom de l'étudiant : ")
-            date_absence = input("Entrez la date de l'absence (format YYYY-MM-DD) : ")
-            absences.append({"etudiant": etudiant_nom, "date": date_absence})
-            print(VERT + "Absence ajoutée avec succès!" + NORMAL)
-
-def modifier_absence() -> None:
-            etudiant_nom = input("Entrez le nom de l'étudiant : ")
-            for absence in absences:
-                if absence["etudiant"] == etudiant_nom:
-                    nouvelle_date = input("Entrez la nouvelle date de l'absence (format YYYY-MM-DD) : ")
-                    absence["date"] = nouvelle_date
-                    print(VERT + "Absence modifiée avec succès!" + NORMAL)
-                    return
-            print(ROUGE + "Absence non trouvée." + NORMAL)
-def supprimer_absence() -> None:
-            etudiant_nom = input("Entrez le nom de l'étudiant : ")
-            for absence in absences:
-                if absence["etudiant"] == etudiant_nom:
-                    absences.remove(absence)
-                    print(VERT + "Absence supprimée avec succès!" + NORMAL)
-                    return
-            print(ROUGE + "Absence non trouvée." + NORMAL)
+def modifier_note(etudiant_nom: Optional[str] = None, nouvelle_note: Optional[str] = None) -> bool:
+    if etudiant_nom is None:
+        etudiant_nom = input("Entrez le nom de l'étudiant : ")
+    etudiant = chercher("etudiants", etudiant_nom)
+    note = None if etudiant is None else chercher("notes", etudiant.id)
+    if note is None:
+        print(ROUGE + "Note non trouvée." + NORMAL)
+        return False
+    if nouvelle_note is None:
+        nouvelle_note = input("Entrez la nouvelle note : ")
+    try:
+        lire_note(nouvelle_note)
+    except ValueError as erreur:
+        print(ROUGE + f"Note invalide : {erreur}." + NORMAL)
+        return False
+    executer({"op": "modifier", "collection": "notes", "id": note.id, "champ": "note", "valeur": nouvelle_note})
+    print(VERT + "Note modifiée avec succès!" + NORMAL)
+    return True
+
+def supprimer_note(etudiant_nom: Optional[str] = None) -> bool:
+    if etudiant_nom is None:
+        etudiant_nom = input("Entrez le nom de l'étudiant : ")
+    etudiant = chercher("etudiants", etudiant_nom)
+    note = None if etudiant is None else chercher("notes", etudiant.id)
+    if note is None:
+        print(ROUGE + "Note non trouvée." + NORMAL)
+        return False
+    executer({"op": "supprimer", "collection": "notes", "id": note.id})
+    print(VERT + "Note supprimée avec succès!" + NORMAL)
+    return True
+
+def ajouter_absence(etudiant_nom: Optional[str] = None, date_absence: Optional[str] = None) -> bool:
+    if etudiant_nom is None:
+        etudiant_nom = input("Entrez le nom de l'étudiant : ")
+    etudiant = chercher("etudiants", etudiant_nom)
+    if etudiant is None:
+        print(ROUGE + "Étudiant non trouvé." + NORMAL)
+        return False
+    if date_absence is None:
+        date_absence = input("Entrez la date de l'absence (format YYYY-MM-DD) : ")
+    try:
+        jour_de_classe(date_absence)
+    except ValueError:
+        print(ROUGE + "Date invalide : utilisez le format YYYY-MM-DD et un jour de classe." + NORMAL)
+        return False
+    if chercher("absences", etudiant.id, {"date": date_absence}) is not None:
+        print(Fore.YELLOW + "Cette absence est déjà enregistrée.")
+        return False
+    executer({"op": "ajouter", "collection": "absences",
+              "enregistrement": {"etudiant_id": etudiant.id, "date": date_absence}})
+    print(VERT + "Absence ajoutée avec succès!" + NORMAL)
+    return True
+
+def choisir_absence(etudiant_nom: Optional[str], date: Optional[str]) -> Optional[Absence]:
+    """Absence visée : celle de `date`, ou sinon la première de l'étudiant ; None si aucune."""
+    if etudiant_nom is None:
+        etudiant_nom = input("Entrez le nom de l'étudiant : ")
+        date = input("Entrez la date de l'absence (laisser vide pour la première) : ")
+    etudiant = chercher("etudiants", etudiant_nom)
+    if etudiant is None:
+        return None
+    return chercher("absences", etudiant.id, {"date": date} if date else None)
+
+def modifier_absence(etudiant_nom: Optional[str] = None, nouvelle_date: Optional[str] = None,
+                     date: Optional[str] = None) -> bool:
+    absence = choisir_absence(etudiant_nom, date)
+    if absence is None:
+        print(ROUGE + "Absence non trouvée." + NORMAL)
+        return False
+    if nouvelle_date is None:
+        nouvelle_date = input("Entrez la nouvelle date de l'absence (format YYYY-MM-DD) : ")
+    try:
+        jour_de_classe(nouvelle_date)
+    except ValueError:
+        print(ROUGE + "Date invalide : utilisez le format YYYY-MM-DD et un jour de classe." + NORMAL)
+        return False
+    executer({"op": "modifier", "collection": "absences", "id": absence.id, "champ": "date", "valeur": nouvelle_date})
+    print(VERT + "Absence modifiée avec succès!" + NORMAL)
+    return True
+
+def supprimer_absence(etudiant_nom: Optional[str] = None, date: Optional[str] = None) -> bool:
+    absence = choisir_absence(etudiant_nom, date)
+    if absence is None:
+        print(ROUGE + "Absence non trouvée." + NORMAL)
+        return False
+    executer({"op": "supprimer", "collection": "absences", "id": absence.id})
+    print(VERT + "Absence supprimée avec succès!" + NORMAL)
+    return True
+
+def verifier_absence(etudiant_nom: Optional[str] = None, date: Optional[str] = None) -> bool:
+    if etudiant_nom is None:
+        etudiant_nom = input("Entrez le nom de l'étudiant : ")
+    if date is None:
+        date = input("Entrez la date (format YYYY-MM-DD) : ")
+    exiger("absences")
+    etudiant = trouver(index_etudiants, etudiant_nom)
+    if etudiant is None:
+        print(ROUGE + "Étudiant non trouvé." + NORMAL)
+        return False
+    try:
+        absent = absent_le(etudiant.id, date)
+    except ValueError:
+        print(ROUGE + "Date invalide : utilisez le format YYYY-MM-DD et un jour de classe." + NORMAL)
+        return False
+    if absent:
+        print(JAUNE + f"{etudiant_nom} était absent(e) le {date}." + NORMAL)
+    else:
+        print(VERT + f"{etudiant_nom} n'était pas absent(e) le {date}." + NORMAL)
+    return True
+
+def afficher_compte_absences(etudiant_nom: Optional[str] = None, debut: Optional[str] = None,
+                             fin: Optional[str] = None) -> bool:
+    if etudiant_nom is None:
+        etudiant_nom = input("Entrez le nom de l'étudiant : ")
+    if debut is None:
+        debut = input("Entrez la date de début (format YYYY-MM-DD) : ")
+    if fin is None:
+        fin = input("Entrez la date de fin (format YYYY-MM-DD) : ")
+    exiger("absences")
+    etudiant = trouver(index_etudiants, etudiant_nom)
+    if etudiant is None:
+        print(ROUGE + "Étudiant non trouvé." + NORMAL)
+        return False
+    try:
+        nombre = compter_absences(etudiant.id, debut, fin)
+    except ValueError:
+        print(ROUGE + "Format de date invalide. Assurez-vous d'utiliser le format YYYY-MM-DD." + NORMAL)
+        return False
+    print(BLEU + f"{etudiant_nom} : {nombre} absence(s) du {debut} au {fin}." + NORMAL)
+    return True
+
+# Formats d'export : txt, csv, docx
+EXPORTS = {
+    "txt": exporter_donnees,
+    "csv": exporter_vers_csv,
+    "docx": exporter_vers_doc,
+}
+
+def formats_demandes(format_export: str) -> List[str]:
+    return list(EXPORTS) if format_export == "tous" else [format_export]
+
+def exporter_formats(formats: List[str], nom_stockage: str, processus: int) -> None:
+    # Les processus relisent le stockage : parallèle seulement si rien n'attend d'y être écrit
+    if len(formats) > 1 and processus > 1 and not operations_en_attente:
+        exporter_en_parallele(nom_stockage, formats, processus)
+    else:
+        for format_export in formats:
+            EXPORTS[format_export]()
+
+def dans_ecole(ecole: str, nom_stockage: str, fonction: Callable[..., Any], *arguments: Any) -> Any:
+    """Exécute `fonction` sur les données d'une école, dans un processus de travail qui ouvre
+    lui-même son stockage en lecture seule (et ne lit que ce dont la fonction a besoin) ; ses
+    messages sont tus. Le stockage est fermé avant que le processus passe à l'école suivante."""
+    with open(os.devnull, "w") as nul, contextlib.redirect_stdout(nul):
+        choisir_ecole(ecole)
+        choisir_stockage(nom_stockage, lecture_seule=True)
+        try:
+            differer_chargement()
+            return fonction(*arguments)
+        finally:
+            stockage.fermer()
+
+def repartir(nom_stockage: str, processus: int, fonction: Callable[..., Any],
+             *arguments: Any) -> List[Tuple[str, Any]]:
+    """Exécute `fonction` sur chaque école, en parallèle sur `processus` processus au plus ;
+    renvoie les couples (école, résultat) dans l'ordre des écoles."""
+    from concurrent.futures import ProcessPoolExecutor
+    ecoles = lister_ecoles()
+    if not ecoles:
+        return []
+    with ProcessPoolExecutor(max_workers=max(1, min(processus, len(ecoles)))) as executeur:
+        taches = [executeur.submit(dans_ecole, ecole, nom_stockage, fonction, *arguments) for ecole in ecoles]
+        return [(ecole, tache.result()) for ecole, tache in zip(ecoles, taches)]
+
+def compter_collections() -> Tuple[Dict[str, int], Dict[str, Set[str]]]:
+    """Taille de chaque collection, et noms (en minuscules) des collections partagées."""
+    return ({nom: compter(nom) for nom in COLLECTIONS},
+            {nom: {cle_nom(enregistrement.nom) for enregistrement in parcourir(nom)}
+             for nom in COLLECTIONS_PARTAGEES})
+
+def rechercher_lisibles(nom: str, requete: str, limite: int) -> List[Tuple[Tuple[int, float], Dict[str, Any]]]:
+    return [(pertinence, lisible(enregistrement))
+            for pertinence, enregistrement in rechercher_approche_classee(nom, requete, limite)]
+
+def exporter_ecole(formats: List[str]) -> None:
+    for format_export in formats:
+        EXPORTS[format_export]()
+
+@mesure("statistiques des écoles")
+def afficher_statistiques_ecoles(nom_stockage: str, processus: int) -> bool:
+    resultats = repartir(nom_stockage, processus, compter_collections)
+    if not resultats:
+        print(Fore.YELLOW + f"Aucune école dans '{ECOLES_DIR}'.")
+        return False
+    totaux = dict.fromkeys(COLLECTIONS, 0)
+    partages: Dict[str, Set[str]] = {nom: set() for nom in COLLECTIONS_PARTAGEES}
+    print(BLEU + f"Statistiques de {len(resultats)} écoles:" + NORMAL)
+    for ecole, (nombres, noms) in resultats:
+        print(f"{ecole} : " + ", ".join(f"{nombre} {TITRES[nom].lower()}" for nom, nombre in nombres.items()))
+        for nom, nombre in nombres.items():
+            totaux[nom] += nombre
+        for nom, cles in noms.items():
+            partages[nom] |= cles
+    # Un enseignant ou un cours présent dans plusieurs écoles n'est compté qu'une fois
+    print(f"{VERT}Nombre d'étudiants : {totaux['etudiants']}")
+    print(f"Nombre d'enseignants : {len(partages['enseignants'])} "
+          f"(distincts par nom ; {totaux['enseignants']} en comptant chaque école)")
+    print(f"Nombre de cours : {len(partages['cours'])} "
+          f"(distincts par nom ; {totaux['cours']} en comptant chaque école)")
+    print(f"Nombre de notes : {totaux['notes']}")
+    print(f"Nombre d'absences : {totaux['absences']}" + NORMAL)
+    return True
+
+@mesure("rechercher dans les écoles")
+def rechercher_ecoles(type_recherche: str, requete: str, nom_stockage: str, processus: int) -> bool:
+    """Recherche approchée dans chaque école ; les résultats sont fusionnés par pertinence
+    (IndexApproche.rechercher_classe), puis par rang dans leur école, puis par école."""
+    collection = RECHERCHES[type_recherche][0]
+    resultats = repartir(nom_stockage, processus, rechercher_lisibles, collection, requete, LIMITE_RESULTATS)
+    fusion = heapq.nsmallest(LIMITE_RESULTATS, ((pertinence, rang, position, ecole, trouve)
+                                                for position, (ecole, trouves) in enumerate(resultats)
+                                                for rang, (pertinence, trouve) in enumerate(trouves)),
+                             key=lambda resultat: resultat[:3])
+    if not fusion:
+        print(Fore.YELLOW + f"Aucun résultat dans les {len(resultats)} écoles.")
+        return True
+    print(Fore.CYAN + f"\nRésultats dans {len(resultats)} écoles :")
+    for idx, ((correspondance, _), _, _, ecole, trouve) in enumerate(fusion, 1):
+        print(f"{idx}. [{ecole}] " + " - ".join(str(valeur) for champ, valeur in trouve.items() if champ != "id")
+              + f" ({CORRESPONDANCES[correspondance]})")
+    print()
+    return True
+
+@mesure("exporter les écoles")
+def exporter_ecoles(formats: List[str], nom_stockage: str, processus: int) -> bool:
+    """Exporte chaque école dans son dossier, en parallèle, puis réunit les exports texte et
+    CSV dans ECOLES_DIR/FUSION_DIR (une colonne « ecole » en tête des CSV), hors des fichiers
+    du dossier courant. Les documents Word restent un par école."""
+    debut = time.perf_counter()
+    ecoles = [ecole for ecole, _ in repartir(nom_stockage, processus, exporter_ecole, formats)]
+    if not ecoles:
+        print(Fore.YELLOW + f"Aucune école dans '{ECOLES_DIR}'.")
+        return False
+    fusion = os.path.join(ECOLES_DIR, FUSION_DIR)
+    os.makedirs(fusion, exist_ok=True)
+    ecrits = []
+    if "txt" in formats:
+        with open(os.path.join(fusion, EXPORT_FILE), "w", buffering=TAMPON_EXPORT) as sortie:
+            for position, ecole in enumerate(ecoles):
+                sortie.write(("\n" if position else "") + f"=== {ecole} ===\n")
+                with open(os.path.join(ECOLES_DIR, ecole, EXPORT_FILE)) as entree:
+                    shutil.copyfileobj(entree, sortie)
+        ecrits.append(os.path.join(fusion, EXPORT_FILE))
+    if "csv" in formats:
+        for nom in COLLECTIONS:
+            with open(os.path.join(fusion, f"{nom}.csv"), "w", newline="", buffering=TAMPON_EXPORT) as sortie:
+                writer = csv.writer(sortie)
+                writer.writerow(["ecole", *entetes_export(nom)])
+                for ecole in ecoles:
+                    with open(os.path.join(ECOLES_DIR, ecole, f"{nom}.csv"), newline="") as entree:
+                        lecteur = csv.reader(entree)
+                        next(lecteur, None)
+                        writer.writerows([ecole, *ligne] for ligne in lecteur)
+            ecrits.append(os.path.join(fusion, f"{nom}.csv"))
+    if "docx" in formats:
+        ecrits.extend(os.path.join(ECOLES_DIR, ecole, EXPORT_DOCX) for ecole in ecoles)
+    print(VERT + f"{len(ecoles)} écoles exportées en {time.perf_counter() - debut:.2f} s : "
+          f"{', '.join(ecrits)}." + NORMAL)
+    return True
+
+@mesure("partitionner")
+def partitionner_par_annee(nom_stockage: str) -> bool:
+    """Répartit les étudiants en une école par année d'inscription (ECOLES_DIR/<année>),
+    chacun avec ses notes et absences ; enseignants et cours sont copiés dans chaque école.
+    Les données d'origine ne sont pas modifiées."""
+    global stockage
+    exiger(*COLLECTIONS)
+    groupes: Dict[str, List[Etudiant]] = {}
+    for etudiant in etudiants:
+        annee = "sans-date" if etudiant.date_ajout is None else formater_date(etudiant.date_ajout)[:4]
+        groupes.setdefault(annee, []).append(etudiant)
+    existantes = [annee for annee in groupes if os.path.isdir(os.path.join(ECOLES_DIR, annee))]
+    if existantes:
+        print(ROUGE + f"Ces écoles existent déjà : {', '.join(sorted(existantes))}. Partitionnement annulé." + NORMAL)
+        return False
+    communs = {nom: [enregistrement.vers_dict() for enregistrement in COLLECTIONS[nom][0]]
+               for nom in ("enseignants", "cours")}
+    ecole, courant = ecole_choisie, stockage
+    try:
+        for annee, membres in sorted(groupes.items()):
+            data = {"version": VERSION_DONNEES, "sequence": 0, **communs,
+                    "etudiants": [etudiant.vers_dict() for etudiant in membres],
+                    "notes": [note.vers_dict() for etudiant in membres for note in index_notes.get(etudiant.id, ())],
+                    "absences": [absence.vers_dict() for etudiant in membres
+                                 for absence in index_absences.get(etudiant.id, ())]}
+            choisir_ecole(annee)
+            choisir_stockage(nom_stockage)
+            stockage.compacter(data)
+            stockage.fermer()
+            print(f"{annee} : {len(membres)} étudiants, {len(data['notes'])} notes, "
+                  f"{len(data['absences'])} absences")
+    finally:
+        choisir_ecole(ecole)
+        stockage = courant
+    print(VERT + f"{len(groupes)} écoles créées dans '{ECOLES_DIR}'." + NORMAL)
+    return True
+
+class ErreurAPI(Exception):
+    """Erreur renvoyée au client de l'API avec son statut HTTP."""
+
+    def __init__(self, statut: int, message: str) -> None:
+        super().__init__(message)
+        self.statut = statut
+
+# Message d'erreur quand la clé d'une modification ou d'une suppression n'existe pas
+NON_TROUVES = {
+    "etudiants": "Étudiant non trouvé.",
+    "enseignants": "Enseignant non trouvé.",
+    "cours": "Cours non trouvé.",
+    "notes": "Note non trouvée.",
+    "absences": "Absence non trouvée.",
+}
+
+class VerrouLectureEcriture:
+    """Verrou asyncio : lecteurs simultanés, écrivain exclusif.
+
+    Un écrivain en attente bloque les nouveaux lecteurs, pour ne pas être
+    affamé par un flux continu de lectures.
+    """
+
+    def __init__(self) -> None:
+        import asyncio
+        self.condition = asyncio.Condition()
+        self.lecteurs = 0
+        self.ecrivain = False
+        self.ecrivains_en_attente = 0
+
+    @contextlib.asynccontextmanager
+    async def lecture(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: not self.ecrivain and not self.ecrivains_en_attente)
+            self.lecteurs += 1
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.lecteurs -= 1
+                self.condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def ecriture(self):
+        async with self.condition:
+            self.ecrivains_en_attente += 1
+            try:
+                await self.condition.wait_for(lambda: not self.ecrivain and not self.lecteurs)
+            finally:
+                self.ecrivains_en_attente -= 1
+            self.ecrivain = True
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.ecrivain = False
+                self.condition.notify_all()
+
+class ServeurAPI:
+    """Service HTTP/JSON local au-dessus des collections en mémoire.
+
+    Chaque collection a son verrou lecture/écriture ; les verrous sont pris
+    dans l'ordre de COLLECTIONS pour éviter les interblocages. Les écritures
+    sont appliquées en mémoire puis sauvegardées par lots : une requête
+    d'écriture ne répond qu'une fois la sauvegarde de son lot terminée.
+    """
+
+    def __init__(self) -> None:
+        import asyncio
+        self.verrous = {nom: VerrouLectureEcriture() for nom in COLLECTIONS}
+        self.en_attente_de_sauvegarde: List[asyncio.Future] = []
+        self.sauvegarde_demandee = asyncio.Event()
+
+    @contextlib.asynccontextmanager
+    async def verrouiller(self, lectures: Iterable[str] = (), ecritures: Iterable[str] = ()):
+        ecritures = set(ecritures)
+        noms = set(lectures) | ecritures
+        async with contextlib.AsyncExitStack() as pile:
+            for nom in COLLECTIONS:
+                if nom in ecritures:
+                    await pile.enter_async_context(self.verrous[nom].ecriture())
+                elif nom in noms:
+                    await pile.enter_async_context(self.verrous[nom].lecture())
+            yield
+
+    async def sauvegarder_par_lots(self) -> None:
+        """Tâche de fond : regroupe les écritures arrivées pendant DELAI_SAUVEGARDE en une sauvegarde."""
+        import asyncio
+        while True:
+            await self.sauvegarde_demandee.wait()
+            await asyncio.sleep(DELAI_SAUVEGARDE)
+            self.sauvegarde_demandee.clear()
+            attente, self.en_attente_de_sauvegarde = self.en_attente_de_sauvegarde, []
+            try:
+                # Une compaction lit toutes les collections : aucune écriture pendant la sauvegarde
+                async with self.verrouiller(lectures=COLLECTIONS):
+                    sauvegarder_donnees(afficher=False)
+            except Exception as erreur:
+                for futur in attente:
+                    futur.set_exception(erreur)
+            else:
+                for futur in attente:
+                    futur.set_result(None)
+
+    def appliquer(self, operation: Dict[str, Any]) -> "asyncio.Future":
+        """Applique une opération en mémoire (verrou d'écriture déjà pris).
+
+        Renvoie un futur résolu une fois l'opération sauvegardée avec son lot.
+        """
+        import asyncio
+        executer(operation)
+        futur = asyncio.get_running_loop().create_future()
+        self.en_attente_de_sauvegarde.append(futur)
+        self.sauvegarde_demandee.set()
+        return futur
+
+    async def repondre(self, methode: str, cible: str, corps: bytes, autorisation: str) -> Tuple[int, Any]:
+        import asyncio
+        from urllib.parse import parse_qs, unquote, urlsplit
+        url = urlsplit(cible)
+        morceaux = [unquote(morceau) for morceau in url.path.split("/") if morceau]
+        parametres = {cle: valeurs[-1] for cle, valeurs in parse_qs(url.query).items()}
+        try:
+            donnees = json.loads(corps) if corps else {}
+        except ValueError:
+            raise ErreurAPI(400, "Corps JSON invalide.")
+        if not isinstance(donnees, dict):
+            raise ErreurAPI(400, "Le corps doit être un objet JSON.")
+        if morceaux == ["connexion"] and methode == "POST":
+            nom, mot_de_passe = donnees.get("utilisateur"), donnees.get("mot_de_passe")
+            if not isinstance(nom, str) or not isinstance(mot_de_passe, str):
+                raise ErreurAPI(400, "Champs obligatoires : utilisateur, mot_de_passe.")
+            # scrypt libère le GIL : les autres requêtes continuent pendant la vérification
+            jeton = await asyncio.to_thread(authentifier, nom, mot_de_passe)
+            if jeton is None:
+                raise ErreurAPI(401, "Nom d'utilisateur ou mot de passe incorrect.")
+            return 200, {"jeton": jeton, "duree": DUREE_SESSION}
+        # Dès qu'un compte existe, chaque requête doit présenter un jeton de session valide
+        if utilisateurs and verifier_session(autorisation.removeprefix("Bearer ")) is None:
+            raise ErreurAPI(401, "Authentification requise : POST /connexion pour obtenir un jeton.")
+        if not morceaux and methode == "GET":
+            return 200, {"collections": list(COLLECTIONS)}
+        ressource = morceaux[0] if morceaux else ""
+        if ressource == "statistiques" and methode == "GET" and len(morceaux) == 1:
+            async with self.verrouiller(lectures=COLLECTIONS):
+                return 200, {nom: len(COLLECTIONS[nom][0]) for nom in COLLECTIONS}
+        if ressource == "recherche" and methode == "GET" and len(morceaux) == 2 and morceaux[1] in COLLECTIONS:
+            async with self.verrouiller(lectures=(morceaux[1], *REFERENCES.get(morceaux[1], ()))):
+                resultats = rechercher_approche(morceaux[1], parametres.get("q", ""),
+                                                int(parametres.get("limite", LIMITE_RESULTATS)))
+                return 200, [lisible(enregistrement) for enregistrement in resultats]
+        if ressource == "export" and methode == "POST" and len(morceaux) == 1:
+            format_export = donnees.get("format", parametres.get("format", "txt"))
+            if format_export not in EXPORTS:
+                raise ErreurAPI(400, f"Format inconnu. Choisissez parmi : {', '.join(EXPORTS)}.")
+            debut = time.perf_counter()
+            # Les exports lisent les listes dans un autre fil ; le verrou de lecture en écarte les écritures
+            async with self.verrouiller(lectures=COLLECTIONS):
+                await asyncio.to_thread(EXPORTS[format_export])
+            return 200, {"format": format_export, "duree": round(time.perf_counter() - debut, 3)}
+        if ressource in COLLECTIONS and len(morceaux) <= 2:
+            cle = morceaux[1] if len(morceaux) == 2 else None
+            if methode == "GET":
+                return 200, await self.lire(ressource, cle, parametres)
+            if methode == "POST" and cle is None:
+                return 201, await self.ajouter(ressource, donnees)
+            # ?date=... vise une absence précise parmi celles de l'étudiant (sinon la première)
+            filtre = {"date": parametres["date"]} if ressource == "absences" and "date" in parametres else {}
+            if methode in ("PATCH", "PUT") and cle is not None:
+                return 200, await self.modifier(ressource, cle, donnees, filtre)
+            if methode == "DELETE" and cle is not None:
+                return 200, await self.supprimer(ressource, cle, filtre)
+            raise ErreurAPI(405, "Méthode non autorisée.")
+        raise ErreurAPI(404, "Ressource inconnue.")
+
+    def cle(self, nom: str, cle: str) -> Any:
+        """Clé d'index désignée par l'URL : le nom d'une entité, ou pour une note ou
+        une absence l'identifiant de l'étudiant qui porte ce nom."""
+        if nom in ENTITES:
+            return cle
+        identifiant = reference("etudiants", cle)
+        if identifiant is None:
+            raise ErreurAPI(404, NON_TROUVES[nom])
+        return identifiant
+
+    def identifiants(self, donnees: Dict[str, Any]) -> Dict[str, Any]:
+        """Champs présentés -> champs persistés : chaque référence par nom devient l'identifiant
+        de l'enregistrement qui porte ce nom (un nom vide retire un cours ou un enseignant)."""
+        resultat = {}
+        for champ, valeur in donnees.items():
+            nom = CHAMPS_REFERENCES.get(champ + "_id")
+            if nom is None:
+                resultat[champ] = valeur
+                continue
+            identifiant = reference(nom, valeur) if valeur else None
+            if identifiant is None and (valeur or champ == "etudiant"):
+                raise ErreurAPI(404, NON_TROUVES[nom])
+            resultat[champ + "_id"] = identifiant
+        return resultat
+
+    async def lire(self, nom: str, cle: Optional[str], parametres: Dict[str, str]) -> Any:
+        collection, index, champ = COLLECTIONS[nom]
+        async with self.verrouiller(lectures=(nom, *REFERENCES.get(nom, ()))):
+            if cle is not None:
+                cle = self.cle(nom, cle)
+                resultats = [e for e in index.get(cle_nom(cle), ()) if getattr(e, champ) == cle]
+                if not resultats:
+                    raise ErreurAPI(404, NON_TROUVES[nom])
+                return [lisible(enregistrement) for enregistrement in resultats]
+            debut = int(parametres.get("debut", 0))
+            limite = int(parametres.get("limite", TAILLE_PAGE))
+            return {"total": len(collection),
+                    "enregistrements": [lisible(e) for e in collection[debut:debut + limite]]}
+
+    async def ajouter(self, nom: str, donnees: Dict[str, Any]) -> Dict[str, Any]:
+        champs = [champ for champ in CHAMPS_LISIBLES[nom] if champ != "date_ajout"]
+        obligatoires = [champ for champ in champs if champ not in ("cours", "enseignant")]
+        presentes = {champ: donnees[champ] for champ in champs if donnees.get(champ) is not None}
+        if any(not isinstance(presentes.get(champ), str) or not presentes[champ]
+               for champ in obligatoires):
+            raise ErreurAPI(400, f"Champs obligatoires : {', '.join(obligatoires)}.")
+        async with self.verrouiller(lectures=REFERENCES.get(nom, ()), ecritures=(nom,)):
+            enregistrement = self.identifiants(presentes)
+            if nom == "etudiants":
+                if cle_nom(enregistrement["nom"]) in index_etudiants:
+                    raise ErreurAPI(409, "Cet étudiant existe déjà.")
+                enregistrement["date_ajout"] = datetime.now().strftime(FORMAT_DATE)
+            if nom == "absences" and trouver(index_absences, enregistrement["etudiant_id"], "etudiant_id",
+                                             {"date": enregistrement["date"]}) is not None:
+                raise ErreurAPI(409, "Cette absence est déjà enregistrée.")
+            self.valider(nom, enregistrement)
+            sauvegarde = self.appliquer(
+                {"op": "ajouter", "collection": nom, "enregistrement": enregistrement})
+            # L'identifiant attribué à l'ajout fait partie de la réponse
+            reponse = lisible(TYPES[nom].depuis_dict(enregistrement))
+        await sauvegarde
+        return reponse
+
+    async def modifier(self, nom: str, cle: str, donnees: Dict[str, Any], filtre: Dict[str, str]) -> Dict[str, Any]:
+        champs = [champ for champ in CHAMPS_LISIBLES[nom] if champ != "date_ajout"]
+        if not donnees or any(champ not in champs or not isinstance(valeur, str) for champ, valeur in donnees.items()):
+            raise ErreurAPI(400, f"Champs modifiables : {', '.join(champs)}.")
+        _, index, champ_index = COLLECTIONS[nom]
+        async with self.verrouiller(lectures=REFERENCES.get(nom, ()), ecritures=(nom,)):
+            cle = self.cle(nom, cle)
+            enregistrement = trouver(index, cle, champ_index, filtre)
+            if enregistrement is None:
+                raise ErreurAPI(404, NON_TROUVES[nom])
+            modifications = self.identifiants(donnees)
+            self.valider(nom, modifications)
+            for champ in modifications:
+                sauvegarde = self.appliquer({"op": "modifier", "collection": nom, "id": enregistrement.id,
+                                             "champ": champ, "valeur": modifications[champ]})
+            reponse = lisible(enregistrement)
+        await sauvegarde
+        return reponse
+
+    async def supprimer(self, nom: str, cle: str, filtre: Dict[str, str]) -> Dict[str, Any]:
+        _, index, champ = COLLECTIONS[nom]
+        # Les notes et absences d'un étudiant, les notes d'un cours, les cours d'un enseignant
+        # sont modifiés avec lui
+        dependants = [dependant for dependant, *_ in DEPENDANTS.get(nom, ())]
+        async with self.verrouiller(lectures=REFERENCES.get(nom, ()), ecritures=(nom, *dependants)):
+            cle = self.cle(nom, cle)
+            enregistrement = trouver(index, cle, champ, filtre)
+            if enregistrement is None:
+                raise ErreurAPI(404, NON_TROUVES[nom])
+            reponse = lisible(enregistrement)
+            sauvegarde = self.appliquer({"op": "supprimer", "collection": nom, "id": enregistrement.id})
+        await sauvegarde
+        return reponse
+
+    def valider(self, nom: str, donnees: Dict[str, Any]) -> None:
+        """Mêmes contrôles que les menus : note lisible, date d'absence valide."""
+        if nom == "notes" and "note" in donnees:
+            try:
+                lire_note(donnees["note"])
+            except ValueError as erreur:
+                raise ErreurAPI(400, f"Note invalide : {erreur}.")
+        if nom == "absences" and "date" in donnees:
+            try:
+                jour_de_classe(donnees["date"])
+            except ValueError:
+                raise ErreurAPI(400, "Date invalide : utilisez le format YYYY-MM-DD et un jour de classe.")
+
+    async def traiter_connexion(self, lecteur: "asyncio.StreamReader", ecrivain: "asyncio.StreamWriter") -> None:
+        """Sert les requêtes HTTP/1.1 d'une connexion, gardée ouverte entre les requêtes."""
+        import asyncio
+        from http import HTTPStatus
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne:
+                    break
+                methode, cible, _ = ligne.decode("latin-1").split(" ", 2)
+                entetes = {}
+                while True:
+                    ligne = await lecteur.readline()
+                    if ligne in (b"\r\n", b"\n", b""):
+                        break
+                    nom, _, valeur = ligne.decode("latin-1").partition(":")
+                    entetes[nom.strip().lower()] = valeur.strip()
+                corps = await lecteur.readexactly(int(entetes.get("content-length", 0)))
+                try:
+                    statut, reponse = await self.repondre(methode, cible, corps, entetes.get("authorization", ""))
+                except ErreurAPI as erreur:
+                    statut, reponse = erreur.statut, {"erreur": str(erreur)}
+                except ValueError:
+                    statut, reponse = 400, {"erreur": "Paramètre invalide."}
+                donnees = json.dumps(reponse, ensure_ascii=False).encode()
+                ecrivain.write(f"HTTP/1.1 {statut} {HTTPStatus(statut).phrase}\r\n"
+                               f"Content-Type: application/json; charset=utf-8\r\n"
+                               f"Content-Length: {len(donnees)}\r\n\r\n".encode() + donnees)
+                await ecrivain.drain()
+                if entetes.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def servir(self, hote: str, port: int) -> None:
+        import asyncio
+        sauvegarde = asyncio.create_task(self.sauvegarder_par_lots())
+        serveur = await asyncio.start_server(self.traiter_connexion, hote, port)
+        print(VERT + f"Serveur à l'écoute sur http://{hote}:{port}/ (Ctrl+C pour arrêter)" + NORMAL)
+        try:
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            sauvegarde.cancel()
+
+def lancer_serveur(hote: str = HOTE_API, port: int = PORT_API) -> None:
+    """Charge toutes les collections en mémoire puis sert l'API jusqu'à Ctrl+C."""
+    charger_donnees()
+    exiger(*COLLECTIONS)
+    charger_utilisateurs()
+    import asyncio
+    try:
+        asyncio.run(ServeurAPI().servir(hote, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if operations_en_attente:
+            sauvegarder_donnees()
+
+async def tester_charge_async(hote: str, port: int, requetes: int, connexions: int,
+                              ecritures: float, identifiants: Optional[Tuple[str, str]] = None) -> List[float]:
+    """Envoie `requetes` requêtes sur `connexions` connexions ; renvoie les latences en secondes.
+
+    Avec des identifiants, une seule connexion par mot de passe est faite et son
+    jeton de session sert à toutes les requêtes.
+    """
+    import asyncio
+    from urllib.parse import quote
+    latences: List[float] = []
+    restantes = iter(range(requetes))
+    autorisation = ""
+
+    async def requete(lecteur, ecrivain, methode: str, url: str,
+                      corps: Optional[Dict[str, Any]] = None) -> Tuple[int, bytes]:
+        donnees = json.dumps(corps).encode() if corps is not None else b""
+        debut = time.perf_counter()
+        ecrivain.write(f"{methode} {quote(url, safe='/?=&')} HTTP/1.1\r\nHost: {hote}\r\n{autorisation}"
+                       f"Content-Length: {len(donnees)}\r\n\r\n".encode() + donnees)
+        await ecrivain.drain()
+        statut = int((await lecteur.readline()).split()[1])
+        longueur = 0
+        while (ligne := await lecteur.readline()) not in (b"\r\n", b""):
+            nom, _, valeur = ligne.decode("latin-1").partition(":")
+            if nom.lower() == "content-length":
+                longueur = int(valeur)
+        reponse = await lecteur.readexactly(longueur)
+        latences.append(time.perf_counter() - debut)
+        return statut, reponse
+
+    async def client(numero: int) -> None:
+        lecteur, ecrivain = await asyncio.open_connection(hote, port)
+        aleatoire = random.Random(numero)
+        for rang in restantes:
+            tirage = aleatoire.random()
+            if tirage < ecritures:
+                # Ajout puis suppression : les données de l'école restent inchangées
+                nom = f"Test charge {numero}-{rang}"
+                await requete(lecteur, ecrivain, "POST", "/etudiants", {"nom": nom})
+                await requete(lecteur, ecrivain, "DELETE", f"/etudiants/{nom}")
+            elif tirage < (1 + ecritures) / 2:
+                await requete(lecteur, ecrivain, "GET", f"/recherche/etudiants?q={aleatoire.choice('aeilmnorstu')}")
+            else:
+                await requete(lecteur, ecrivain, "GET", "/statistiques")
+        ecrivain.close()
+
+    if identifiants is not None:
+        lecteur, ecrivain = await asyncio.open_connection(hote, port)
+        statut, reponse = await requete(lecteur, ecrivain, "POST", "/connexion",
+                                        {"utilisateur": identifiants[0], "mot_de_passe": identifiants[1]})
+        ecrivain.close()
+        if statut != 200:
+            raise ConnectionError(json.loads(reponse)["erreur"])
+        autorisation = f"Authorization: Bearer {json.loads(reponse)['jeton']}\r\n"
+        latences.clear()
+    await asyncio.gather(*(client(numero) for numero in range(connexions)))
+    return latences
+
+def tester_charge(hote: str = HOTE_API, port: int = PORT_API, requetes: int = 10000,
+                  connexions: int = 50, ecritures: float = 0.1, utilisateur: Optional[str] = None) -> None:
+    """Client de test de charge : affiche le débit et les latences p50/p99 du serveur."""
+    identifiants = None
+    if utilisateur is not None:
+        identifiants = (utilisateur, getpass.getpass("Entrez votre mot de passe : "))
+    import asyncio
+    debut = time.perf_counter()
+    try:
+        latences = asyncio.run(tester_charge_async(hote, port, requetes, connexions, ecritures, identifiants))
+    except OSError as erreur:
+        print(ROUGE + f"Connexion impossible à http://{hote}:{port}/ : {erreur}" + NORMAL)
+        return
+    duree = time.perf_counter() - debut
+    latences.sort()
+    centile = lambda p: latences[min(len(latences) - 1, int(len(latences) * p / 100))] * 1000
+    print(VERT + f"{len(latences)} requêtes HTTP en {duree:.2f} s sur {connexions} connexions : "
+          f"{len(latences) / duree:.0f} requêtes/s, p50 {centile(50):.1f} ms, p99 {centile(99):.1f} ms." + NORMAL)
+
+def construire_parser() -> argparse.ArgumentParser:
+    """Options de la ligne de commande et sous-commandes scriptables.
+
+    Chaque sous-commande a aussi un alias anglais (add-student, search, stats...).
+    """
+    parser = argparse.ArgumentParser(description="Gestionnaire d'étudiants")
+    parser.add_argument("--export", action="store_true", help="Exporter les données")
+    parser.add_argument("--format", choices=["txt", "csv", "docx", "tous"], default="txt",
+                        help="Format de --export (tous : les trois formats en parallèle)")
+    parser.add_argument("--processus", type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus pour --format tous et les bulletins")
+    parser.add_argument("--analyse", action="store_true", help="Afficher l'analyse des notes")
+    parser.add_argument("--import", dest="fichier_import", metavar="FICHIER",
+                        help="Importer en masse un fichier CSV ou JSONL (ex. notes.csv)")
+    parser.add_argument("--collection", choices=list(COLLECTIONS),
+                        help="Collection du fichier importé (par défaut, déduite du nom du fichier)")
+    parser.add_argument("--stockage", choices=["json", "jsonl", "sqlite"], default="json",
+                        help="Stockage des données (json par défaut, jsonl ou sqlite pour les grandes écoles)")
+    parser.add_argument("--ecole", metavar="NOM",
+                        help=f"Travailler sur l'école NOM (dossier {ECOLES_DIR}/NOM, créé au besoin) ; "
+                             f"{TOUTES_ECOLES} : statistiques, rechercher et exporter sur toutes les écoles "
+                             f"en parallèle")
+    parser.add_argument("--batch", metavar="FICHIER",
+                        help="Exécuter un fichier de commandes, une par ligne, avec un seul chargement "
+                             "et une seule sauvegarde")
+    parser.add_argument("--profile", dest="profil", nargs="?", const=PROFIL_FILE, metavar="FICHIER",
+                        help=f"Mesurer les actions (durée, enregistrements parcourus, octets) et écrire les "
+                             f"mesures dans FICHIER en fin de session (par défaut {PROFIL_FILE} ; "
+                             f"équivaut à {PROFIL_ENV}=FICHIER)")
+    parser.add_argument("--cprofile", metavar="FICHIER",
+                        help="Profiler toute la session avec cProfile (lire avec python -m pstats FICHIER)")
+    sous_parsers = parser.add_subparsers(title="commandes", dest="nom_commande", metavar="COMMANDE")
+
+    def commande(nom: str, alias: str, aide: str, fonction: Any, *arguments: str,
+                 collections: Tuple[str, ...] = ()) -> argparse.ArgumentParser:
+        sous_parser = sous_parsers.add_parser(nom, aliases=[alias], help=aide)
+        for argument in arguments:
+            sous_parser.add_argument(argument)
+        sous_parser.set_defaults(fonction=fonction, collections=collections, charger=True, repartie=None)
+        return sous_parser
+
+    ajouts = {}
+    for entite, alias, collection, libelle, ajouter, modifier, supprimer in (
+            ("etudiant", "student", "etudiants", "un étudiant",
+             ajouter_etudiant, modifier_etudiant, supprimer_etudiant),
+            ("enseignant", "teacher", "enseignants", "un enseignant",
+             ajouter_enseignant, modifier_enseignant, supprimer_enseignant),
+            ("cours", "course", "cours", "un cours",
+             ajouter_cours, modifier_cours, supprimer_cours)):
+        ajouts[entite] = commande(f"ajouter-{entite}", f"add-{alias}", f"Ajouter {libelle}",
+                                  lambda a, f=ajouter: f(a.nom), "nom")
+        commande(f"modifier-{entite}", f"rename-{alias}", f"Renommer {libelle}",
+                 lambda a, f=modifier: f(a.nom, a.nouveau_nom), "nom", "nouveau_nom")
+        commande(f"supprimer-{entite}", f"delete-{alias}", f"Supprimer {libelle}",
+                 lambda a, f=supprimer: f(a.nom), "nom")
+    ajouts["cours"].add_argument("--enseignant", help="Enseignant du cours (doit exister)")
+    ajouts["cours"].set_defaults(fonction=lambda a: ajouter_cours(a.nom, a.enseignant))
+    commande("affecter-enseignant", "assign-teacher", "Confier un cours à un enseignant (\"\" pour aucun)",
+             lambda a: affecter_enseignant(a.cours, a.enseignant), "cours", "enseignant")
+    commande("cours-enseignant", "teacher-courses", "Lister les cours d'un enseignant",
+             lambda a: afficher_cours_enseignant(a.enseignant), "enseignant")
+    commande("notes-cours", "course-grades", "Lister les notes d'un cours et leur moyenne",
+             lambda a: afficher_notes_cours(a.cours), "cours")
+
+    commande("ajouter-note", "add-grade", "Ajouter une note",
+             lambda a: ajouter_note(a.etudiant, a.note, a.cours), "etudiant",
+             "note").add_argument("--cours", help="Cours de la note (doit exister)")
+    commande("modifier-note", "update-grade", "Modifier la note d'un étudiant",
+             lambda a: modifier_note(a.etudiant, a.note), "etudiant", "note")
+    commande("supprimer-note", "delete-grade", "Supprimer la note d'un étudiant",
+             lambda a: supprimer_note(a.etudiant), "etudiant")
+    commande("ajouter-absence", "add-absence", "Ajouter une absence",
+             lambda a: ajouter_absence(a.etudiant, a.date), "etudiant", "date")
+    commande("modifier-absence", "update-absence", "Modifier l'absence d'un étudiant",
+             lambda a: modifier_absence(a.etudiant, a.nouvelle_date, a.date_absence), "etudiant",
+             "nouvelle_date").add_argument("--date", dest="date_absence",
+                                           help="Date de l'absence à modifier (par défaut la première)")
+    commande("supprimer-absence", "delete-absence", "Supprimer l'absence d'un étudiant",
+             lambda a: supprimer_absence(a.etudiant, a.date_absence),
+             "etudiant").add_argument("--date", dest="date_absence",
+                                      help="Date de l'absence à supprimer (par défaut la première)")
+    commande("absent", "was-absent", "Vérifier si un étudiant était absent un jour donné",
+             lambda a: verifier_absence(a.etudiant, a.date), "etudiant", "date", collections=("absences",))
+    commande("compter-absences", "count-absences", "Compter les absences d'un étudiant entre deux dates",
+             lambda a: afficher_compte_absences(a.etudiant, a.debut, a.fin), "etudiant", "debut", "fin",
+             collections=("absences",))
+    rapport = commande("rapport-absences", "absence-report",
+                       "Absentéisme : étudiants les plus absents, taux par jour, séries",
+                       lambda a: afficher_rapport_absences(a.du, a.au), collections=("absences",))
+    rapport.add_argument("--du", help="Début de la période (YYYY-MM-DD)")
+    rapport.add_argument("--au", help="Fin de la période incluse (YYYY-MM-DD)")
+
+    recherche = commande("rechercher", "search", "Rechercher par nom",
+                         lambda a: rechercher_par_nom(a.type_recherche, a.nom))
+    recherche.add_argument("type_recherche", choices=list(RECHERCHES), metavar="TYPE")
+    recherche.add_argument("nom")
+    recherche.set_defaults(repartie=lambda a: rechercher_ecoles(a.type_recherche, a.nom, a.stockage, a.processus))
+    recherche_date = commande("rechercher-date", "search-date",
+                              "Rechercher les étudiants ajoutés un jour donné ou entre deux dates",
+                              lambda a: rechercher_etudiant_par_periode(etudiants, a.date, a.fin) if a.fin
+                              else rechercher_etudiant_par_date(etudiants, a.date), "date")
+    recherche_date.add_argument("fin", nargs="?", help="Date de fin incluse (YYYY-MM-DD)")
+    commande("lister", "list", "Lister une collection",
+             lambda a: lister_collection(a.collection_listee)).add_argument(
+        "collection_listee", choices=list(COLLECTIONS), metavar="COLLECTION")
+    commande("statistiques", "stats", "Afficher les statistiques", lambda a: afficher_statistiques()).set_defaults(
+        repartie=lambda a: afficher_statistiques_ecoles(a.stockage, a.processus))
+    commande("analyse", "analyze", "Afficher l'analyse des notes", lambda a: afficher_analyse_notes())
+    exportation = commande("exporter", "export", "Exporter les données",
+                           lambda a: exporter_formats(formats_demandes(a.format_export), a.stockage, a.processus))
+    exportation.add_argument("format_export", nargs="?", choices=["txt", "csv", "docx", "tous"], default="txt",
+                             metavar="FORMAT")
+    exportation.set_defaults(
+        repartie=lambda a: exporter_ecoles(formats_demandes(a.format_export), a.stockage, a.processus))
+    commande("partitionner", "shard", f"Répartir les étudiants en une école par année d'inscription "
+             f"(dans {ECOLES_DIR})", lambda a: partitionner_par_annee(a.stockage), collections=tuple(COLLECTIONS))
+    bulletins = commande("bulletins", "report-cards", "Écrire le bulletin de notes de chaque étudiant",
+                         lambda a: generer_bulletins(a.format_bulletin, a.processus, a.lot, a.dossier,
+                                                     a.debut, a.fin),
+                         collections=("etudiants", "cours", "notes", "absences"))
+    bulletins.add_argument("format_bulletin", nargs="?", choices=list(BULLETINS), default="docx", metavar="FORMAT")
+    bulletins.add_argument("--lot", type=int, help=f"Bulletins par lot (par défaut : au plus {TAILLE_LOT_BULLETINS})")
+    bulletins.add_argument("--dossier", help=f"Dossier des bulletins (par défaut : {BULLETINS_DIR}, dans celui de l'école)")
+    bulletins.add_argument("--debut", help="Compter les absences à partir de cette date (YYYY-MM-DD)")
+    bulletins.add_argument("--fin", help="Compter les absences jusqu'à cette date incluse (YYYY-MM-DD)")
+    importation = commande("importer", "import", "Importer en masse un fichier CSV ou JSONL",
+                           lambda a: importer_fichier(a.fichier, a.collection_importee, sauvegarder=False),
+                           "fichier")
+    importation.add_argument("--collection", dest="collection_importee", choices=list(COLLECTIONS))
+    # Utiles dans un --batch ou le menu : une commande isolée n'a pas d'historique
+    commande("annuler", "undo", "Annuler la dernière modification", lambda a: annuler_modification())
+    commande("retablir", "redo", "Rétablir la dernière modification annulée", lambda a: retablir_modification())
+    commande("instantane", "snapshot", "Nommer l'état courant des données",
+             lambda a: prendre_instantane(a.nom), "nom")
+    commande("restaurer", "restore", "Revenir à un instantané sans relire le stockage",
+             lambda a: restaurer_instantane(a.nom), "nom")
+    commande("instantanes", "snapshots", "Lister les instantanés", lambda a: lister_instantanes())
+    # Le serveur charge lui-même les données ; le test de charge et les comptes n'en ont pas besoin
+    serveur = commande("serveur", "serve", "Servir l'API HTTP/JSON multi-utilisateurs",
+                       lambda a: lancer_serveur(a.hote, a.port))
+    test_charge = commande("test-charge", "load-test", "Mesurer le débit et les latences du serveur",
+                           lambda a: tester_charge(a.hote, a.port, a.requetes, a.connexions, a.ecritures,
+                                                   a.utilisateur))
+    for sous_parser in (serveur, test_charge):
+        sous_parser.add_argument("--hote", default=HOTE_API)
+        sous_parser.add_argument("--port", type=int, default=PORT_API)
+        sous_parser.set_defaults(charger=False)
+    test_charge.add_argument("--requetes", type=int, default=10000)
+    test_charge.add_argument("--connexions", type=int, default=50)
+    test_charge.add_argument("--ecritures", type=float, default=0.1,
+                             help="Part des requêtes qui ajoutent puis suppriment un étudiant")
+    test_charge.add_argument("--utilisateur", help="Compte utilisé quand le serveur exige une authentification")
+    compte = commande("ajouter-utilisateur", "add-user", "Créer un compte (mot de passe demandé sans écho)",
+                      lambda a: ajouter_utilisateur(a.utilisateur))
+    compte.add_argument("utilisateur")
+    banc = commande("bench-connexion", "login-benchmark", "Mesurer le débit des connexions et des jetons de session",
+                    lambda a: mesurer_connexions(a.nombre))
+    banc.add_argument("--nombre", type=int, default=20)
+    for sous_parser in (compte, banc):
+        sous_parser.set_defaults(charger=False)
+    return parser
+
+def executer_commande(args: argparse.Namespace) -> bool:
+    """Exécute une sous-commande analysée ; renvoie False si elle a échoué."""
+    exiger(*args.collections)
+    return args.fonction(args) is not False
+
+def executer_lot(parser: argparse.ArgumentParser, options: argparse.Namespace) -> bool:
+    """Exécute le fichier --batch : une sous-commande par ligne, # pour les commentaires.
+
+    Les données sont chargées une fois et toutes les modifications sont écrites
+    en une seule sauvegarde à la fin du fichier. L'historique est gardé pendant
+    tout le lot : annuler, retablir, instantane et restaurer y ont un sens.
+    """
+    global historique_actif
+    debut = time.perf_counter()
+    executees = 0
+    echecs = 0
+    try:
+        fichier = open(options.batch, encoding="utf-8")
+    except FileNotFoundError:
+        print(ROUGE + f"Fichier '{options.batch}' introuvable." + NORMAL)
+        return False
+    historique_actif = True
+    charger_donnees()
+    with fichier:
+        for numero, ligne in enumerate(fichier, 1):
+            ligne = ligne.strip()
+            if not ligne or ligne.startswith("#"):
+                continue
+            executees += 1
+            try:
+                # Les options globales (--stockage, --processus) valent pour chaque ligne
+                args = parser.parse_args(shlex.split(ligne), argparse.Namespace(**vars(options)))
+            except (SystemExit, ValueError):
+                args = None
+            if args is None or args.nom_commande is None:
+                print(ROUGE + f"Ligne {numero} : commande invalide." + NORMAL)
+                echecs += 1
+            elif not executer_commande(args):
+                echecs += 1
+    if operations_en_attente:
+        sauvegarder_donnees()
+    duree = time.perf_counter() - debut
+    print((JAUNE if echecs else VERT) + f"{executees} commandes exécutées depuis '{options.batch}', "
+          f"{echecs} en échec ({duree:.2f} s, {executees / max(duree, 1e-9):.0f} commandes/s)." + NORMAL)
+    return not echecs
 
 def main() -> None:
-            charger_donnees()
+            global historique_actif
+            # Le menu garde l'historique de la session : ses modifications peuvent être annulées
+            historique_actif = True
+            differer_chargement()
             gestion_connexion()
             while True:
                 afficher_menu()
@@ -520,22 +4358,78 @@ def main() -> None:
                 elif choix == "10":
                     afficher_statistiques()
                 elif choix == "11":
-                    exporter_donnees()
+                    exporter()
                 elif choix == "12":
                     sauvegarder_donnees()
                 elif choix == "13":
                     charger_donnees()
                 elif choix == "14":
+                    afficher_analyse_notes()
+                elif choix == "15":
+                    gestion_performances()
+                elif choix == "16":
+                    gestion_historique()
+                elif choix == "17":
                     print(JAUNE + "Au revoir!" + NORMAL)
                     break
                 else:
                     print(ROUGE + "Option invalide. Veuillez choisir une option valide." + NORMAL)
 
 if __name__ == "__main__":
-            parser = argparse.ArgumentParser(description="Gestionnaire d'étudiants")
-            parser.add_argument("--export", action="store_true", help="Exporter les données")
+            parser = construire_parser()
             args = parser.parse_args()
-            if args.export:
-                exporter_donnees()
-            else:
-                main()
\ No newline at end of file
+            if args.ecole != TOUTES_ECOLES:
+                try:
+                    choisir_ecole(args.ecole)
+                except ValueError as erreur:
+                    print(ROUGE + str(erreur) + NORMAL)
+                    sys.exit(1)
+                # Avec --ecole tous, seuls les processus de travail ouvrent un stockage, chacun
+                # celui de son école : l'ouvrir ici créerait data.db dans le dossier courant
+                choisir_stockage(args.stockage)
+            fichier_profil = args.profil or os.environ.get(PROFIL_ENV)
+            profil_actif = bool(fichier_profil)
+            profileur = None
+            if args.cprofile:
+                import cProfile
+                profileur = cProfile.Profile()
+                profileur.enable()
+            try:
+                if args.ecole == TOUTES_ECOLES:
+                    if getattr(args, "repartie", None) is None:
+                        print(ROUGE + f"--ecole {TOUTES_ECOLES} ne s'applique qu'aux commandes statistiques, "
+                                      f"rechercher et exporter." + NORMAL)
+                        sys.exit(1)
+                    sys.exit(0 if args.repartie(args) is not False else 1)
+                elif args.batch:
+                    sys.exit(0 if executer_lot(parser, args) else 1)
+                elif args.nom_commande:
+                    if args.charger:
+                        differer_chargement()
+                    reussie = executer_commande(args)
+                    if operations_en_attente:
+                        sauvegarder_donnees()
+                    sys.exit(0 if reussie else 1)
+                elif args.export:
+                    formats = list(EXPORTS) if args.format == "tous" else [args.format]
+                    if len(formats) > 1 and args.processus > 1:
+                        exporter_en_parallele(args.stockage, formats, args.processus)
+                    else:
+                        charger_donnees()
+                        for format_export in formats:
+                            EXPORTS[format_export]()
+                elif args.analyse:
+                    charger_donnees()
+                    afficher_analyse_notes()
+                elif args.fichier_import:
+                    charger_donnees()
+                    importer_fichier(args.fichier_import, args.collection)
+                else:
+                    main()
+            finally:
+                if profileur is not None:
+                    profileur.disable()
+                    profileur.dump_stats(args.cprofile)
+                    print(BLEU + f"Profil cProfile écrit dans '{args.cprofile}'." + NORMAL)
+                if fichier_profil and histogrammes:
+                    ecrire_profil(fichier_profil)
@@ -0,0 +1,30 @@
+"""Fixtures communes : chaque test travaille dans un dossier temporaire vide."""
+import pytest
+
+import main
+
+STOCKAGES = ("json", "jsonl", "sqlite")
+
+
+def ouvrir(nom_stockage: str) -> None:
+    """Sélectionne le stockage du dossier courant et relit les données, comme au lancement."""
+    main.stockage.fermer()
+    main.choisir_stockage(nom_stockage)
+    main.charger_donnees()
+
+
+@pytest.fixture
+def dossier(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main.choisir_ecole(None)
+    monkeypatch.setattr(main, "historique_actif", False)
+    yield tmp_path
+    main.stockage.fermer()
+    main.choisir_stockage("json")
+
+
+@pytest.fixture(params=STOCKAGES)
+def nom_stockage(request, dossier):
+    """Chaque stockage, ouvert vide dans le dossier du test."""
+    ouvrir(request.param)
+    return request.param
@@ -0,0 +1,58 @@
+"""Absences en bits par jour de classe : tests de présence, comptes par période, week-ends refusés."""
+import pytest
+
+import main
+from conftest import ouvrir
+
+# 2024-03-04, 11 et 18 sont des lundis ; 2024-03-16 et 17 un samedi et un dimanche
+ABSENCES = {"Alice": ["2024-03-11", "2024-03-15", "2024-03-18"], "Bob": ["2024-03-12"]}
+
+
+def remplir() -> None:
+    for nom, dates in ABSENCES.items():
+        assert main.ajouter_etudiant(nom)
+        for date in dates:
+            assert main.ajouter_absence(nom, date)
+
+
+def compte(nom: str, debut: str, fin: str) -> int:
+    return main.compter_absences(main.trouver(main.index_etudiants, nom).id, debut, fin)
+
+
+@pytest.mark.parametrize("date", ["2024-03-16", "2024-03-17", "16/03/2024", "2024-02-30", ""])
+def test_jours_sans_classe_refuses(date):
+    with pytest.raises(ValueError):
+        main.jour_de_classe(date)
+
+
+def test_bits_et_periodes(nom_stockage, capsys):
+    remplir()
+    assert not main.ajouter_absence("Alice", "2024-03-16")
+    assert not main.ajouter_absence("Alice", "2024-03-11")
+    assert "Date invalide" in capsys.readouterr().out
+    main.exiger("absences")
+    alice = main.trouver(main.index_etudiants, "Alice").id
+    assert [main.absent_le(alice, date) for date in ("2024-03-11", "2024-03-12", "2024-03-15", "2024-03-18")] == \
+        [True, False, True, True]
+    assert compte("Alice", "2024-03-11", "2024-03-18") == 3
+    # Une borne un jour sans classe vaut le jour de classe suivant (début) ou précédent (fin)
+    assert compte("Alice", "2024-03-16", "2024-03-17") == 0
+    assert compte("Alice", "2024-03-09", "2024-03-16") == 2
+    assert compte("Alice", "2024-03-16", "2024-03-31") == 1
+    assert compte("Bob", "2024-01-01", "2024-12-31") == 1
+
+    # Une absence antérieure à toutes les autres décale l'origine des bits
+    assert main.ajouter_absence("Bob", "2024-03-04")
+    assert compte("Bob", "2024-03-01", "2024-03-08") == 1
+    assert compte("Alice", "2024-03-11", "2024-03-18") == 3
+    assert main.modifier_absence("Alice", "2024-03-13", "2024-03-15")
+    assert main.supprimer_absence("Alice", "2024-03-18")
+    assert [main.absent_le(alice, date) for date in ("2024-03-13", "2024-03-15", "2024-03-18")] == \
+        [True, False, False]
+
+    main.sauvegarder_donnees()
+    ouvrir(nom_stockage)
+    assert main.verifier_absence("Alice", "2024-03-13")
+    assert "Alice était absent(e) le 2024-03-13" in capsys.readouterr().out
+    assert compte("Alice", "2024-03-01", "2024-03-31") == 2
+    assert compte("Bob", "2024-03-01", "2024-03-31") == 2
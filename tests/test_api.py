@@ -0,0 +1,128 @@
+"""API HTTP/JSON : authentification par jeton, ajout, lecture, modification et suppression,
+sauvegarde par lots et verrous lecture/écriture."""
+import asyncio
+import collections
+import json
+
+import pytest
+
+import main
+from conftest import ouvrir
+
+
+@pytest.fixture
+def api(nom_stockage, monkeypatch):
+    """Le stockage de chaque test, lu en entier comme au lancement du serveur, sans compte."""
+    monkeypatch.setattr(main, "SCRYPT_N", 2 ** 4)
+    monkeypatch.setattr(main, "utilisateurs", {})
+    monkeypatch.setattr(main, "sessions", collections.OrderedDict())
+    main.exiger(*main.COLLECTIONS)
+    return nom_stockage
+
+
+async def appeler(serveur, methode: str, cible: str, corps=None, jeton: str = ""):
+    """(statut, réponse) d'une requête, comme traiter_connexion les renvoie au client."""
+    try:
+        return await serveur.repondre(methode, cible, json.dumps(corps).encode() if corps is not None else b"",
+                                      f"Bearer {jeton}" if jeton else "")
+    except main.ErreurAPI as erreur:
+        return erreur.statut, {"erreur": str(erreur)}
+
+
+def dialoguer(scenario):
+    """Exécute `scenario(serveur)` avec la sauvegarde par lots du serveur en marche."""
+    async def executer():
+        serveur = main.ServeurAPI()
+        sauvegarde = asyncio.create_task(serveur.sauvegarder_par_lots())
+        try:
+            return await scenario(serveur)
+        finally:
+            sauvegarde.cancel()
+    return asyncio.run(executer())
+
+
+def test_authentification(api):
+    main.creer_utilisateur("alice", "secret")
+
+    async def scenario(serveur):
+        assert (await appeler(serveur, "GET", "/statistiques"))[0] == 401
+        assert (await appeler(serveur, "POST", "/connexion", {"utilisateur": "alice", "mot_de_passe": "faux"}))[0] == 401
+        assert (await appeler(serveur, "POST", "/connexion", {"utilisateur": "alice"}))[0] == 400
+        statut, reponse = await appeler(serveur, "POST", "/connexion",
+                                        {"utilisateur": "alice", "mot_de_passe": "secret"})
+        assert statut == 200 and reponse["duree"] == main.DUREE_SESSION
+        assert await appeler(serveur, "GET", "/statistiques", jeton=reponse["jeton"]) == (
+            200, dict.fromkeys(main.COLLECTIONS, 0))
+        assert (await appeler(serveur, "GET", "/statistiques", jeton="inconnu"))[0] == 401
+    dialoguer(scenario)
+
+
+def test_ajouter_lire_modifier_supprimer(api):
+    async def scenario(serveur):
+        assert await appeler(serveur, "POST", "/enseignants", {"nom": "Martin"}) == (201, {"id": 1, "nom": "Martin"})
+        assert (await appeler(serveur, "POST", "/cours", {"nom": "Biologie", "enseignant": "Martin"}))[0] == 201
+        assert (await appeler(serveur, "POST", "/cours", {"nom": "Chimie", "enseignant": "Inconnu"}))[0] == 404
+        statut, alice = await appeler(serveur, "POST", "/etudiants", {"nom": "Alice"})
+        assert statut == 201 and alice["id"] == 1
+        assert (await appeler(serveur, "POST", "/etudiants", {"nom": "ALICE"}))[0] == 409
+        assert (await appeler(serveur, "POST", "/etudiants", {}))[0] == 400
+        assert await appeler(serveur, "POST", "/notes", {"etudiant": "Alice", "note": "14", "cours": "Biologie"}) == (
+            201, {"id": 1, "etudiant": "Alice", "note": "14", "cours": "Biologie"})
+        assert (await appeler(serveur, "POST", "/notes", {"etudiant": "Alice", "note": "21"}))[0] == 400
+        assert (await appeler(serveur, "POST", "/absences", {"etudiant": "Alice", "date": "2024-03-11"}))[0] == 201
+        assert (await appeler(serveur, "POST", "/absences", {"etudiant": "Alice", "date": "2024-03-11"}))[0] == 409
+        assert (await appeler(serveur, "POST", "/absences", {"etudiant": "Alice", "date": "2024-03-16"}))[0] == 400
+
+        assert await appeler(serveur, "PATCH", "/etudiants/Alice", {"nom": "Alicia"}) == (
+            200, {**alice, "nom": "Alicia"})
+        assert (await appeler(serveur, "GET", "/etudiants/Alice"))[0] == 404
+        assert await appeler(serveur, "GET", "/notes/Alicia") == (
+            200, [{"id": 1, "etudiant": "Alicia", "note": "14", "cours": "Biologie"}])
+        assert (await appeler(serveur, "PATCH", "/notes/Alicia", {"note": "16", "cours": ""}))[0] == 200
+        statut, page = await appeler(serveur, "GET", "/etudiants?limite=1")
+        assert statut == 200 and page["total"] == 1 and page["enregistrements"][0]["nom"] == "Alicia"
+        assert (await appeler(serveur, "DELETE", "/etudiants/Personne"))[0] == 404
+        assert (await appeler(serveur, "DELETE", "/etudiants"))[0] == 405
+        assert (await appeler(serveur, "GET", "/inconnue"))[0] == 404
+        # Les notes et absences de l'étudiant sont supprimées avec lui
+        assert (await appeler(serveur, "DELETE", "/etudiants/Alicia"))[0] == 200
+        return await appeler(serveur, "GET", "/statistiques")
+
+    assert dialoguer(scenario) == (200, {"etudiants": 0, "enseignants": 1, "cours": 1, "notes": 0, "absences": 0})
+    # Chaque écriture a répondu après la sauvegarde de son lot
+    assert not main.operations_en_attente
+    ouvrir(api)
+    assert [cours.nom for cours in main.parcourir("cours")] == ["Biologie"]
+    assert main.compter("etudiants") == 0 and main.compter("notes") == 0
+
+
+def test_verrou_lecteurs_simultanes_ecrivain_exclusif():
+    async def scenario():
+        verrou = main.VerrouLectureEcriture()
+        evenements = []
+
+        async def lire(nom: str, duree: float):
+            async with verrou.lecture():
+                evenements.append(f"+{nom}")
+                await asyncio.sleep(duree)
+                evenements.append(f"-{nom}")
+
+        async def ecrire():
+            async with verrou.ecriture():
+                evenements.append("+écrivain")
+                await asyncio.sleep(0.01)
+                evenements.append("-écrivain")
+
+        premier = asyncio.create_task(lire("l1", 0.02))
+        second = asyncio.create_task(lire("l2", 0.02))
+        await asyncio.sleep(0)
+        ecrivain = asyncio.create_task(ecrire())
+        await asyncio.sleep(0.005)
+        # Arrivé après l'écrivain en attente : passe après lui
+        tardif = asyncio.create_task(lire("l3", 0))
+        await asyncio.gather(premier, second, ecrivain, tardif)
+        return evenements
+
+    evenements = asyncio.run(scenario())
+    assert evenements[:2] == ["+l1", "+l2"]
+    assert evenements[2:] == ["-l1", "-l2", "+écrivain", "-écrivain", "+l3", "-l3"]
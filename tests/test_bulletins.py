@@ -0,0 +1,38 @@
+"""Bulletins : moyennes, rangs et absences de la période."""
+import pytest
+
+import main
+
+
+def ajouter(collection: str, **enregistrement) -> None:
+    main.executer({"op": "ajouter", "collection": collection, "enregistrement": enregistrement})
+
+
+@pytest.fixture
+def classe(dossier):
+    main.choisir_stockage("json")
+    main.charger_donnees()
+    for nom in ("A", "B", "C", "D"):
+        ajouter("etudiants", nom=nom)
+    for etudiant_id, note in ((1, "12"), (2, "15"), (3, "12"), (4, "10"), (4, "14.2")):
+        ajouter("notes", etudiant_id=etudiant_id, note=note)
+    ajouter("absences", etudiant_id=2, date="2024-03-11")
+    ajouter("absences", etudiant_id=2, date="2024-03-18")
+
+
+def test_rangs_ex_aequo():
+    assert main.rangs_ex_aequo([]) == []
+    assert main.rangs_ex_aequo([15.0, 12.0, 12.0, 10.0, 10.0, 9.0]) == [1, 2, 2, 4, 4, 6]
+
+
+def test_rangs_comme_l_analyse(classe):
+    rangs = {bulletin["nom"]: bulletin["rang"] for bulletin in main.calculer_bulletins()}
+    assert rangs == {"B": 1, "D": 2, "A": 3, "C": 3}
+    pytest.importorskip("numpy")
+    assert {nom: rang for rang, nom, *_ in main.analyser_notes(main.notes)["classement"]} == rangs
+
+
+def test_absences_de_la_periode(classe):
+    bulletins = {bulletin["nom"]: bulletin for bulletin in main.calculer_bulletins("2024-03-12", "2024-03-31")}
+    assert bulletins["B"]["absences"] == 1
+    assert bulletins["A"]["absences"] == 0
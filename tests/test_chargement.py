@@ -0,0 +1,71 @@
+"""Chargement à la demande (jsonl, sqlite) : seules les collections utilisées sont lues,
+avec les opérations du journal postérieures à l'instantané."""
+import pytest
+
+import main
+from conftest import ouvrir
+
+STOCKAGES_PARESSEUX = ("jsonl", "sqlite")
+
+
+def ajouter(collection: str, enregistrement: dict) -> None:
+    main.executer({"op": "ajouter", "collection": collection, "enregistrement": enregistrement})
+
+
+def remplir() -> None:
+    ajouter("enseignants", {"nom": "Martin"})
+    ajouter("cours", {"nom": "Biologie", "enseignant_id": 1})
+    for nom in ("Alice", "Bob", "Chloé"):
+        ajouter("etudiants", {"nom": nom})
+    for etudiant_id, note in ((1, "12"), (2, "8"), (3, "15")):
+        ajouter("notes", {"etudiant_id": etudiant_id, "note": note, "cours_id": 1})
+    ajouter("absences", {"etudiant_id": 2, "date": "2024-03-11"})
+    main.sauvegarder_donnees()
+
+
+def en_memoire() -> set:
+    return {nom for nom in main.COLLECTIONS if nom not in main.collections_differees}
+
+
+@pytest.mark.parametrize("nom_stockage", STOCKAGES_PARESSEUX)
+def test_seules_les_collections_utilisees_sont_lues(dossier, nom_stockage, monkeypatch):
+    # Tout dans l'instantané : rien à relire du journal
+    monkeypatch.setattr(main, "SEUIL_COMPACTION", 1)
+    ouvrir(nom_stockage)
+    remplir()
+    ouvrir(nom_stockage)
+    assert en_memoire() == set()
+    assert {nom: main.compter(nom) for nom in main.COLLECTIONS} == {
+        "etudiants": 3, "enseignants": 1, "cours": 1, "notes": 3, "absences": 1}
+    assert [absence.date for absence in main.parcourir("absences")] == ["2024-03-11"]
+    # Les absences sont lues en flux ; seuls les étudiants, qu'elles référencent, sont chargés
+    assert en_memoire() == {"etudiants"}
+    main.exiger("notes")
+    assert en_memoire() == {"etudiants", "enseignants", "cours", "notes"}
+    assert [note.texte() for note in main.notes] == ["12", "8", "15"]
+
+
+def test_journal_relu_apres_l_instantane(dossier, monkeypatch):
+    monkeypatch.setattr(main, "SEUIL_COMPACTION", 5)
+    ouvrir("jsonl")
+    remplir()
+    assert (dossier / main.JOURNAL_FILE).read_text() == ""
+    monkeypatch.setattr(main, "SEUIL_COMPACTION", 1000)
+    # Après l'instantané : un ajout, un renommage, une note modifiée et une suppression en cascade
+    ajouter("etudiants", {"nom": "David"})
+    main.executer({"op": "modifier", "collection": "etudiants", "id": 1, "champ": "nom", "valeur": "Alicia"})
+    main.executer({"op": "modifier", "collection": "notes", "id": 3, "champ": "note", "valeur": "16"})
+    main.executer({"op": "supprimer", "collection": "etudiants", "id": 2})
+    main.sauvegarder_donnees()
+    assert (dossier / main.JOURNAL_FILE).read_text().count("\n") == 4
+
+    ouvrir("jsonl")
+    assert en_memoire() == set()
+    # Le journal s'applique à la lecture de chaque collection, y compris la cascade sur les absences
+    assert main.compter("absences") == 0
+    assert en_memoire() == {"etudiants", "absences"}
+    assert [etudiant.nom for etudiant in main.etudiants] == ["Alicia", "Chloé", "David"]
+    assert [(note.etudiant_id, note.texte()) for note in main.parcourir("notes")] == [(1, "12"), (3, "16")]
+    # Les identifiants reprennent après ceux du journal
+    ajouter("etudiants", {"nom": "Émile"})
+    assert main.etudiants.obtenir(5).nom == "Émile"
@@ -0,0 +1,53 @@
+"""Index trié des dates d'ajout : recherches par période, tenu à jour par les imports et suppressions."""
+import random
+
+import main
+from conftest import ouvrir
+
+
+def noms_entre(debut: str, fin: str) -> list:
+    return [etudiant.nom for etudiant in main.etudiants_entre(main.lire_jour(debut), main.lire_jour(fin) + main.UN_JOUR)]
+
+
+def attendus_entre(debut: str, fin: str) -> list:
+    """Même recherche par un parcours complet des étudiants."""
+    bornes = (main.lire_jour(debut), main.lire_jour(fin) + main.UN_JOUR)
+    trouves = [etudiant for etudiant in main.etudiants
+               if etudiant.date_ajout is not None and bornes[0] <= etudiant.date_ajout < bornes[1]]
+    return [etudiant.nom for etudiant in sorted(trouves, key=lambda etudiant: etudiant.date_ajout)]
+
+
+def test_import_desordonne_puis_suppressions(dossier, nom_stockage):
+    aleatoire = random.Random(7)
+    jours = [f"2024-{mois:02d}-{jour:02d} 0{heure}:00:00"
+             for mois in (1, 2, 3) for jour in (1, 10, 20) for heure in (8, 9)]
+    lots = [[{"nom": f"E{lot}-{i}", "date_ajout": aleatoire.choice(jours)} for i in range(40)] for lot in range(3)]
+    # L'index des dates en mémoire (en SQLite, les imports seraient sinon écrits sans lire la collection)
+    main.exiger("etudiants")
+    for lot in lots:
+        main.executer({"op": "importer", "collection": "etudiants", "enregistrements": lot})
+    main.executer({"op": "ajouter", "collection": "etudiants", "enregistrement": {"nom": "Sans date"}})
+    assert main.dates_ajout == sorted(main.dates_ajout)
+    assert len(main.dates_ajout) == 120
+
+    for identifiant in range(1, 121, 3):
+        main.executer({"op": "supprimer", "collection": "etudiants", "id": identifiant})
+    for debut, fin in (("2024-01-01", "2024-12-31"), ("2024-02-10", "2024-02-10"), ("2024-01-02", "2024-02-09"),
+                       ("2023-01-01", "2023-12-31")):
+        assert noms_entre(debut, fin) == attendus_entre(debut, fin)
+
+    main.sauvegarder_donnees()
+    ouvrir(nom_stockage)
+    main.exiger("etudiants")
+    assert noms_entre("2024-01-01", "2024-12-31") == attendus_entre("2024-01-01", "2024-12-31")
+    assert len(noms_entre("2024-01-01", "2024-12-31")) == 80
+
+
+def test_meme_date_dans_l_ordre_d_ajout(dossier, nom_stockage):
+    for nom in ("A", "B"):
+        main.executer({"op": "ajouter", "collection": "etudiants",
+                       "enregistrement": {"nom": nom, "date_ajout": "2024-03-01 08:00:00"}})
+    main.executer({"op": "importer", "collection": "etudiants",
+                   "enregistrements": [{"nom": "C", "date_ajout": "2024-03-01 08:00:00"},
+                                       {"nom": "D", "date_ajout": "2024-02-01 08:00:00"}]})
+    assert noms_entre("2024-01-01", "2024-03-31") == ["D", "A", "B", "C"]
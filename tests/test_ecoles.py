@@ -0,0 +1,88 @@
+"""Plusieurs écoles (--ecole tous) : les processus de travail lisent chaque école sans l'écrire."""
+import json
+import sqlite3
+
+import pytest
+
+import main
+from conftest import ouvrir
+
+
+def creer_ecole(nom: str, nom_stockage: str, etudiants: list) -> None:
+    main.choisir_ecole(nom)
+    ouvrir(nom_stockage)
+    for etudiant in etudiants:
+        main.executer({"op": "ajouter", "collection": "etudiants", "enregistrement": {"nom": etudiant}})
+    main.sauvegarder_donnees()
+    main.stockage.fermer()
+
+
+def contenu_dossier(dossier) -> dict:
+    return {str(fichier.relative_to(dossier)): fichier.read_bytes()
+            for fichier in sorted(dossier.rglob("*")) if fichier.is_file()}
+
+
+@pytest.mark.parametrize("nom_stockage", ("jsonl", "sqlite"))
+def test_ecoles_lues_sans_creer_ni_migrer(dossier, nom_stockage, capsys):
+    creer_ecole("est", "json", ["Alice", "Bob"])
+    # Format 2 (notes sans identifiant) : converti en mémoire seulement
+    (dossier / main.ECOLES_DIR / "ouest").mkdir()
+    (dossier / main.ECOLES_DIR / "ouest" / main.DATA_JSON).write_text(json.dumps({
+        "version": 2, "sequence": 1, "etudiants": [{"id": 1, "nom": "Chloé"}], "enseignants": [], "cours": [],
+        "notes": [{"etudiant_id": 1, "note": "12"}], "absences": []}))
+    creer_ecole("nord", nom_stockage, ["David"])
+    main.choisir_ecole(None)
+    avant = contenu_dossier(dossier)
+    capsys.readouterr()
+
+    assert main.afficher_statistiques_ecoles(nom_stockage, 2)
+    sortie = capsys.readouterr().out
+    assert "est : 2 étudiants" in sortie and "ouest : 1 étudiants, 0 enseignants, 0 cours, 1 notes" in sortie
+    assert "Nombre d'étudiants : 4" in sortie
+    assert contenu_dossier(dossier) == avant
+
+
+def test_stockage_ferme_apres_chaque_ecole(dossier):
+    creer_ecole("est", "sqlite", ["Alice"])
+    main.choisir_ecole(None)
+    nombres, _ = main.dans_ecole("est", "sqlite", main.compter_collections)
+    assert nombres["etudiants"] == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        main.stockage.connexion.execute("SELECT 1")
+
+
+def test_exports_reunis_dans_le_dossier_de_fusion(dossier, capsys):
+    creer_ecole("est", "json", ["Alice", "Bob"])
+    creer_ecole("ouest", "json", ["Chloé"])
+    main.choisir_ecole(None)
+    (dossier / main.EXPORT_FILE).write_text("export du dossier courant\n")
+
+    assert main.exporter_ecoles(["txt", "csv"], "json", 2)
+    fusion = dossier / main.ECOLES_DIR / main.FUSION_DIR
+    texte = (fusion / main.EXPORT_FILE).read_text()
+    assert texte.index("=== est ===") < texte.index("Bob") < texte.index("=== ouest ===") < texte.index("Chloé")
+    lignes = (fusion / "etudiants.csv").read_text().splitlines()
+    assert [ligne.split(",")[:2] for ligne in lignes[1:]] == [["est", "Alice"], ["est", "Bob"], ["ouest", "Chloé"]]
+    assert (dossier / main.EXPORT_FILE).read_text() == "export du dossier courant\n"
+    assert not (dossier / "etudiants.csv").exists()
+
+    # Le dossier de fusion n'est pas une école
+    assert main.lister_ecoles() == ["est", "ouest"]
+    with pytest.raises(ValueError):
+        main.choisir_ecole(main.FUSION_DIR)
+
+
+def test_recherche_fusionnee_par_pertinence(dossier, capsys):
+    creer_ecole("est", "json", ["Anne Marchand", "Marie", "Omar Sy"])
+    creer_ecole("ouest", "sqlite", ["Mar", "Marc Dupont"])
+    main.choisir_ecole(None)
+    capsys.readouterr()
+
+    assert main.rechercher_ecoles("etudiant", "mar", "sqlite", 2)
+    lignes = [ligne for ligne in capsys.readouterr().out.splitlines() if ligne[:1].isdigit()]
+    # Exact, puis préfixes (dans l'ordre de chaque école, les écoles dans l'ordre alphabétique),
+    # début de mot, sous-chaîne
+    assert lignes == ["1. [ouest] Mar (exact)", "2. [est] Marie (préfixe)", "3. [ouest] Marc Dupont (préfixe)",
+                      "4. [est] Anne Marchand (début de mot)", "5. [est] Omar Sy (sous-chaîne)"]
+    assert main.rechercher_ecoles("etudiant", "zzz", "sqlite", 2)
+    assert "Aucun résultat dans les 2 écoles." in capsys.readouterr().out
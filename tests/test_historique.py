@@ -0,0 +1,90 @@
+"""Opérations inverses : annuler rend l'état d'avant l'opération, rétablir celui d'après."""
+import copy
+import json
+
+import pytest
+
+import main
+from test_stockage import remplir
+
+OPERATIONS = {
+    "ajouter": {"op": "ajouter", "collection": "etudiants", "enregistrement": {"nom": "Chloé"}},
+    "importer": {"op": "importer", "collection": "notes",
+                 "enregistrements": [{"etudiant_id": 2, "note": "11"}, {"etudiant_id": 2, "note": "13"}]},
+    "renommer": {"op": "modifier", "collection": "etudiants", "id": 1, "champ": "nom", "valeur": "Alicia"},
+    "changer de cours": {"op": "modifier", "collection": "notes", "cle": 1,
+                         "filtre": {"note": "15", "cours_id": None}, "champ": "cours_id", "valeur": 1},
+    "déplacer une absence": {"op": "modifier", "collection": "absences", "cle": 1,
+                             "filtre": {"date": "2024-03-11"}, "champ": "date", "valeur": "2024-03-12"},
+    "supprimer une note": {"op": "supprimer", "collection": "notes", "cle": 2,
+                           "filtre": {"note": "9", "cours_id": 1}},
+    "supprimer un étudiant": {"op": "supprimer", "collection": "etudiants", "id": 1},
+    "supprimer un enseignant": {"op": "supprimer", "collection": "enseignants", "id": 1},
+    "supprimer un cours": {"op": "supprimer", "collection": "cours", "id": 1},
+}
+
+
+def etat() -> dict:
+    """Contenu de chaque collection, sans tenir compte de l'ordre, et absences de chaque étudiant."""
+    donnees = main.instantane()
+    contenu = {nom: sorted(map(json.dumps, donnees[nom])) for nom in main.COLLECTIONS}
+    contenu["bits_absences"] = {cle: bits for cle, bits in main.bits_absences.items() if bits}
+    return contenu
+
+
+@pytest.fixture
+def historique(nom_stockage, monkeypatch):
+    remplir()
+    monkeypatch.setattr(main, "historique_actif", True)
+    main.exiger(*main.COLLECTIONS)
+    return nom_stockage
+
+
+@pytest.mark.parametrize("operation", list(OPERATIONS.values()), ids=list(OPERATIONS))
+def test_inverser_puis_appliquer(historique, operation):
+    operation = copy.deepcopy(operation)
+    avant = etat()
+    # Mêmes étapes que executer, hors historique et journal
+    main.attribuer_identifiants(operation)
+    inverses = main.inverser(operation)
+    main.appliquer_operation(operation)
+    if operation["op"] == "supprimer" and "id" in operation:
+        main.repercuter_suppression(operation)
+    assert etat() != avant
+    for inverse in inverses:
+        main.appliquer_operation(inverse)
+    assert etat() == avant
+
+
+@pytest.mark.parametrize("operation", list(OPERATIONS.values()), ids=list(OPERATIONS))
+def test_annuler_et_retablir(historique, operation):
+    avant = etat()
+    main.executer(copy.deepcopy(operation))
+    apres = etat()
+    assert main.annuler_derniere() is not None
+    assert etat() == avant
+    assert main.retablir_derniere() is not None
+    assert etat() == apres
+    # Annulations et rétablissements sont journalisés comme les autres opérations
+    main.annuler_derniere()
+    main.sauvegarder_donnees()
+    main.charger_donnees()
+    assert etat() == avant
+
+
+def test_annuler_parmi_des_notes_identiques(historique):
+    # Bob a déjà un 9 en Biologie : la note modifiée devient identique à la sienne
+    main.executer({"op": "ajouter", "collection": "notes",
+                   "enregistrement": {"etudiant_id": 2, "note": "15", "cours_id": 1}})
+    main.executer({"op": "modifier", "collection": "notes", "id": 4, "champ": "note", "valeur": "9"})
+    assert main.notes.obtenir(3).vers_dict() == {**main.notes.obtenir(4).vers_dict(), "id": 3}
+    main.annuler_derniere()
+    assert main.notes.obtenir(3).texte() == "9"
+    assert main.notes.obtenir(4).texte() == "15"
+    # Supprimer puis rétablir la note d'origine la rend avec son identifiant
+    main.executer({"op": "supprimer", "collection": "notes", "id": 3})
+    main.annuler_derniere()
+    assert [note.id for note in main.index_notes[2]] == [4, 3]
+    main.sauvegarder_donnees()
+    main.charger_donnees()
+    assert sorted((note.id, note.texte()) for note in main.parcourir("notes") if note.etudiant_id == 2) == [(3, "9"), (4, "15")]
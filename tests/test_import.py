@@ -0,0 +1,81 @@
+"""Import en masse : validation de chaque ligne, rapport des rejets, une seule sauvegarde."""
+import json
+
+import main
+from conftest import ouvrir
+
+
+def preparer(dossier, nom_stockage):
+    ouvrir(nom_stockage)
+    main.executer({"op": "ajouter", "collection": "etudiants", "enregistrement": {"nom": "Bob Durand"}})
+    main.executer({"op": "ajouter", "collection": "cours", "enregistrement": {"nom": "Chimie"}})
+    main.sauvegarder_donnees()
+
+
+def notes_importees() -> list:
+    return [note.texte() for note in main.parcourir("notes")]
+
+
+def test_notes_jsonl(dossier, nom_stockage, capsys):
+    preparer(dossier, nom_stockage)
+    lignes = [
+        {"etudiant": "Bob Durand", "note": 0},
+        {"etudiant": "Bob Durand", "note": "12,5", "cours": "Chimie"},
+        {"etudiant": "Bob Durand", "note": 17.5},
+        {"etudiant": "Bob Durand", "note": "inf"},
+        {"etudiant": "Bob Durand", "note": "nan"},
+        {"etudiant": "Bob Durand"},
+        {"etudiant": "Inconnu", "note": 10},
+        {"etudiant": "Bob Durand", "note": 10, "cours": "Danse"},
+    ]
+    fichier = dossier / "notes.jsonl"
+    fichier.write_text("\n".join(map(json.dumps, lignes)) + "\n{illisible\n")
+    capsys.readouterr()
+
+    assert main.importer_fichier(str(fichier))
+    sortie = capsys.readouterr().out
+    assert "3 notes importés" in sortie and "6 lignes rejetées" in sortie
+    for rejet in ("Ligne 4 : note invalide : 'inf'", "Ligne 5 : note invalide : 'nan'",
+                  "Ligne 6 : note invalide : '' n'est pas un nombre", "Ligne 7 : étudiant inconnu 'Inconnu'",
+                  "Ligne 8 : cours inconnu 'Danse'", "Ligne 9 : ligne illisible"):
+        assert rejet in sortie
+    ouvrir(nom_stockage)
+    assert notes_importees() == ["0", "12,5", "17.5"]
+
+
+def test_etudiants_csv(dossier, nom_stockage, capsys):
+    preparer(dossier, nom_stockage)
+    fichier = dossier / "etudiants.csv"
+    fichier.write_text("nom,date_ajout\n"
+                       "Ann Lee,2024-01-15 08:00:00\n"
+                       "bob durand,\n"
+                       "Cléo Martin,15/01/2024\n"
+                       "Ann Lee,\n"
+                       ",\n"
+                       "Dan Roy,\n")
+    capsys.readouterr()
+
+    assert main.importer_fichier(str(fichier))
+    sortie = capsys.readouterr().out
+    assert "2 etudiants importés" in sortie and "4 lignes rejetées" in sortie
+    assert "Ligne 3 : 'bob durand' existe déjà" in sortie
+    assert "Ligne 4 : date d'ajout invalide '15/01/2024'" in sortie
+    assert "Ligne 5 : 'Ann Lee' existe déjà" in sortie
+    assert "Ligne 6 : nom manquant" in sortie
+    ouvrir(nom_stockage)
+    assert [etudiant.nom for etudiant in main.parcourir("etudiants")] == ["Bob Durand", "Ann Lee", "Dan Roy"]
+
+
+def test_absences_jours_de_classe(dossier, nom_stockage, capsys):
+    preparer(dossier, nom_stockage)
+    fichier = dossier / "absences.csv"
+    # 2024-03-11 est un lundi, 2024-03-16 un samedi
+    fichier.write_text("etudiant,date\nBob Durand,2024-03-11\nBob Durand,2024-03-16\n"
+                       "Bob Durand,2024-03-11\nBob Durand,11/03/2024\n")
+    capsys.readouterr()
+
+    assert main.importer_fichier(str(fichier))
+    sortie = capsys.readouterr().out
+    assert "1 absences importés" in sortie and "3 lignes rejetées" in sortie
+    assert "Ligne 3 : date d'absence invalide '2024-03-16'" in sortie
+    assert "Ligne 4 : absence déjà enregistrée pour 'Bob Durand' le 2024-03-11" in sortie
@@ -0,0 +1,52 @@
+"""Index des noms, sans casse : tenu à jour par les ajouts, renommages et suppressions."""
+import main
+from conftest import ouvrir
+
+
+def ajouter(nom: str) -> None:
+    main.executer({"op": "ajouter", "collection": "etudiants", "enregistrement": {"nom": nom}})
+
+
+def renommer(identifiant: int, nom: str) -> None:
+    main.executer({"op": "modifier", "collection": "etudiants", "id": identifiant, "champ": "nom", "valeur": nom})
+
+
+def index_des_noms() -> dict:
+    return {cle: [etudiant.id for etudiant in entrees] for cle, entrees in main.index_etudiants.items()}
+
+
+def test_renommer_et_supprimer(nom_stockage):
+    main.exiger("etudiants")
+    for nom in ("Alice Martin", "ALICE MARTIN", "Bob"):
+        ajouter(nom)
+    assert index_des_noms() == {"alice martin": [1, 2], "bob": [3]}
+    assert main.trouver(main.index_etudiants, "ALICE MARTIN").id == 2
+    assert main.trouver(main.index_etudiants, "alice martin") is None
+
+    renommer(1, "Alicia")
+    renommer(3, "BOB")
+    assert index_des_noms() == {"alice martin": [2], "bob": [3], "alicia": [1]}
+    assert main.trouver(main.index_etudiants, "Bob") is None
+    assert main.trouver(main.index_etudiants, "BOB").id == 3
+
+    main.executer({"op": "supprimer", "collection": "etudiants", "id": 2})
+    assert index_des_noms() == {"bob": [3], "alicia": [1]}
+    # L'index de la recherche approchée suit aussi
+    assert [etudiant.id for etudiant in main.rechercher_approche("etudiants", "ali")] == [1]
+
+    attendu = index_des_noms()
+    main.sauvegarder_donnees()
+    ouvrir(nom_stockage)
+    main.exiger("etudiants")
+    assert index_des_noms() == attendu
+
+
+def test_doublons_refuses_sans_casse(nom_stockage, capsys):
+    assert main.ajouter_etudiant("Chloé Durand")
+    assert not main.ajouter_etudiant("chloé durand")
+    assert main.modifier_etudiant("Chloé Durand", "CHLOÉ DURAND")
+    assert main.ajouter_etudiant("Zoé")
+    assert main.supprimer_etudiant("CHLOÉ DURAND")
+    assert main.ajouter_etudiant("chloé durand")
+    main.exiger("etudiants")
+    assert index_des_noms() == {"zoé": [2], "chloé durand": [3]}
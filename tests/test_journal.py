@@ -0,0 +1,74 @@
+"""Journal des opérations : relecture, ligne tronquée et compaction (stockages json et jsonl)."""
+import pytest
+
+import main
+from conftest import ouvrir
+
+STOCKAGES_JOURNALISES = ("json", "jsonl")
+
+
+def ajouter_etudiant(nom: str) -> None:
+    main.executer({"op": "ajouter", "collection": "etudiants", "enregistrement": {"nom": nom}})
+
+
+def noms_etudiants() -> list:
+    main.exiger("etudiants")
+    return [etudiant.nom for etudiant in main.etudiants]
+
+
+@pytest.mark.parametrize("nom_stockage", STOCKAGES_JOURNALISES)
+def test_journal_relu_au_chargement(dossier, nom_stockage):
+    ouvrir(nom_stockage)
+    ajouter_etudiant("Alice")
+    ajouter_etudiant("Bob")
+    main.sauvegarder_donnees()
+    assert (dossier / main.JOURNAL_FILE).read_text().count("\n") == 2
+
+    ouvrir(nom_stockage)
+    assert noms_etudiants() == ["Alice", "Bob"]
+
+
+@pytest.mark.parametrize("nom_stockage", STOCKAGES_JOURNALISES)
+def test_derniere_ligne_tronquee(dossier, nom_stockage):
+    ouvrir(nom_stockage)
+    ajouter_etudiant("Alice")
+    main.sauvegarder_donnees()
+    with open(dossier / main.JOURNAL_FILE, "a") as f:
+        f.write('{"op": "ajouter", "collection": "etud')
+
+    ouvrir(nom_stockage)
+    assert noms_etudiants() == ["Alice"]
+    # Les opérations suivantes ne sont pas écrites à la suite de la ligne tronquée
+    ajouter_etudiant("Bob")
+    main.sauvegarder_donnees()
+    ouvrir(nom_stockage)
+    assert noms_etudiants() == ["Alice", "Bob"]
+
+
+@pytest.mark.parametrize("nom_stockage", STOCKAGES_JOURNALISES)
+def test_compaction(dossier, nom_stockage, monkeypatch):
+    monkeypatch.setattr(main, "SEUIL_COMPACTION", 3)
+    ouvrir(nom_stockage)
+    for nom in ("Alice", "Bob", "Chloé"):
+        ajouter_etudiant(nom)
+    main.executer({"op": "modifier", "collection": "etudiants", "id": 2, "champ": "nom", "valeur": "Basile"})
+    main.sauvegarder_donnees()
+    assert (dossier / main.JOURNAL_FILE).read_text() == ""
+
+    ouvrir(nom_stockage)
+    assert noms_etudiants() == ["Alice", "Basile", "Chloé"]
+    # Les identifiants reprennent après le plus grand de l'instantané
+    ajouter_etudiant("David")
+    assert main.etudiants.obtenir(4).nom == "David"
+
+
+@pytest.mark.parametrize("nom_stockage", STOCKAGES_JOURNALISES)
+def test_compaction_ecrite_sur_disque(dossier, nom_stockage, monkeypatch):
+    ouvrir(nom_stockage)
+    ajouter_etudiant("Alice")
+    synchronises = []
+    fsync = main.os.fsync
+    monkeypatch.setattr(main.os, "fsync", lambda descripteur: (synchronises.append(descripteur), fsync(descripteur)))
+    main.stockage.compacter(main.instantane())
+    # L'instantané, le journal vidé, et le dossier après chacun
+    assert len(synchronises) == 4
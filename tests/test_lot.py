@@ -0,0 +1,41 @@
+"""Mode --batch : une commande par ligne, un seul chargement et une seule sauvegarde."""
+import main
+from conftest import ouvrir
+
+COMMANDES = """\
+# Rentrée
+ajouter-etudiant "Alice Martin"
+ajouter-etudiant Bob
+ajouter-cours Biologie
+ajouter-note "Alice Martin" 14 --cours Biologie
+ajouter-note Bob 21
+ajouter-absence Bob 2024-03-16
+commande-inconnue
+ajouter-absence Bob 2024-03-11
+modifier-etudiant Bob Basile
+annuler
+supprimer-etudiant Bob
+"""
+
+
+def test_une_seule_sauvegarde(nom_stockage, dossier, monkeypatch, capsys):
+    fichier = dossier / "rentree.txt"
+    fichier.write_text(COMMANDES)
+    sauvegardes = []
+    sauvegarder = main.sauvegarder_donnees
+    monkeypatch.setattr(main, "sauvegarder_donnees",
+                        lambda *args, **kwargs: (sauvegardes.append(len(main.operations_en_attente)),
+                                                 sauvegarder(*args, **kwargs)))
+    parser = main.construire_parser()
+    options = parser.parse_args(["--stockage", nom_stockage, "--batch", str(fichier)])
+
+    # Trois lignes en échec : note hors barème, absence un samedi, commande inconnue
+    assert not main.executer_lot(parser, options)
+    sortie = capsys.readouterr().out
+    assert f"11 commandes exécutées depuis '{fichier}', 3 en échec" in sortie
+    assert "Ligne 8 : commande invalide." in sortie
+    assert len(sauvegardes) == 1
+    ouvrir(nom_stockage)
+    assert [etudiant.nom for etudiant in main.parcourir("etudiants")] == ["Alice Martin"]
+    assert [note.texte() for note in main.parcourir("notes")] == ["14"]
+    assert main.compter("absences") == 0
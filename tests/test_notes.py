@@ -0,0 +1,24 @@
+"""Lecture des notes : format, barème et valeurs non finies."""
+import math
+
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("texte, valeur", [("15", 15.0), ("12.5", 12.5), ("12,5", 12.5), ("0", 0.0), ("20", 20.0)])
+def test_notes_valides(texte, valeur):
+    assert main.lire_note(texte) == valeur
+
+
+@pytest.mark.parametrize("texte", ["inf", "-inf", "nan", "-40", "20.5", "1e308", "abc", ""])
+def test_notes_refusees(texte):
+    with pytest.raises(ValueError, match="note|nombre"):
+        main.lire_note(texte)
+
+
+def test_note_enregistree_hors_bareme_ignoree():
+    # Une note déjà enregistrée hors barème est conservée telle quelle, mais pas comptée
+    note = main.Note.depuis_dict({"id": 1, "etudiant_id": 1, "note": "inf"})
+    assert math.isnan(note.note)
+    assert note.vers_dict()["note"] == "inf"
@@ -0,0 +1,45 @@
+"""Recherche approchée par nom : classement exact, préfixe, début de mot, sous-chaîne, puis noms proches."""
+import main
+from conftest import ouvrir
+
+NOMS = ("Omar Sy", "Anne Marchand", "Marie", "Marc Dupont", "Mar", "Maria", "Élodie Roux", "Bob")
+
+
+def classement(requete: str, limite: int = main.LIMITE_RESULTATS) -> list:
+    return [(main.CORRESPONDANCES[correspondance], etudiant.nom)
+            for (correspondance, _), etudiant in main.rechercher_approche_classee("etudiants", requete, limite)]
+
+
+def remplir_et_relire(nom_stockage: str) -> None:
+    for nom in NOMS:
+        main.executer({"op": "ajouter", "collection": "etudiants", "enregistrement": {"nom": nom}})
+    main.sauvegarder_donnees()
+    ouvrir(nom_stockage)
+
+
+def test_classement(nom_stockage):
+    remplir_et_relire(nom_stockage)
+    assert classement("mar") == [("exact", "Mar"), ("préfixe", "Marc Dupont"), ("préfixe", "Maria"),
+                                 ("préfixe", "Marie"), ("début de mot", "Anne Marchand"),
+                                 ("sous-chaîne", "Omar Sy")]
+    assert classement("MAR", limite=2) == [("exact", "Mar"), ("préfixe", "Marc Dupont")]
+    # Sans accents ni casse, et mot par mot
+    assert classement("elodie") == [("préfixe", "Élodie Roux")]
+    assert classement("roux élo") == [("sous-chaîne", "Élodie Roux")]
+
+
+def test_noms_proches_si_rien_ne_correspond(nom_stockage):
+    remplir_et_relire(nom_stockage)
+    resultats = main.rechercher_approche_classee("etudiants", "Dupnot Marc")
+    assert [etudiant.nom for _, etudiant in resultats][:1] == ["Marc Dupont"]
+    assert all(main.CORRESPONDANCES[correspondance] == "proche" and 0 < manque < 1
+               for (correspondance, manque), _ in resultats)
+    assert classement("xyz") == []
+
+
+def test_noms_renommes_et_supprimes(nom_stockage):
+    remplir_et_relire(nom_stockage)
+    main.executer({"op": "modifier", "collection": "etudiants", "id": 3, "champ": "nom", "valeur": "Zoé"})
+    main.executer({"op": "supprimer", "collection": "etudiants", "id": 6})
+    assert classement("mari") == [("proche", "Mar"), ("proche", "Marc Dupont"), ("proche", "Anne Marchand")]
+    assert classement("zo") == [("préfixe", "Zoé")]
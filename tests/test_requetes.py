@@ -0,0 +1,115 @@
+"""SQLite : recherches, doublons et plages de dates par requêtes indexées, sans charger les collections."""
+import pytest
+
+import main
+from conftest import ouvrir
+
+NOMS = ("Alice Martin", "alice martin", "Alicia Keys", "Élodie-Anne Dupont", "Elodie Durand", "Bob Alison",
+        "Marc Alain", "Jean Malice", "Al Pacino", "Albert Camus", "Zoé Lamalice", "Anne Élodie")
+RECHERCHES = ("alice", "Alic", "élodie", "elodie anne", "al", "mal", "alcie", "camsu", "anne", "x", "dupont")
+
+
+def remplir() -> None:
+    for rang, nom in enumerate(NOMS):
+        main.executer({"op": "ajouter", "collection": "etudiants",
+                       "enregistrement": {"nom": nom, "date_ajout": f"2024-0{rang % 3 + 1}-1{rang % 10} 08:00:00"}})
+    main.executer({"op": "ajouter", "collection": "enseignants", "enregistrement": {"nom": "Martin"}})
+    main.executer({"op": "ajouter", "collection": "cours", "enregistrement": {"nom": "Biologie", "enseignant_id": 1}})
+    for etudiant_id, note in ((1, "12"), (1, "15"), (6, "9")):
+        main.executer({"op": "ajouter", "collection": "notes",
+                       "enregistrement": {"etudiant_id": etudiant_id, "note": note, "cours_id": 1}})
+    main.executer({"op": "ajouter", "collection": "absences", "enregistrement": {"etudiant_id": 1, "date": "2024-03-11"}})
+    main.sauvegarder_donnees()
+
+
+def en_memoire() -> set:
+    return {nom for nom in main.COLLECTIONS if nom not in main.collections_differees}
+
+
+def resultats(nom: str, requete: str) -> list:
+    return [(pertinence, enregistrement.vers_dict())
+            for pertinence, enregistrement in main.rechercher_approche_classee(nom, requete)]
+
+
+@pytest.fixture
+def base(dossier):
+    ouvrir("sqlite")
+    remplir()
+    ouvrir("sqlite")
+    return dossier
+
+
+def test_recherches_comme_en_memoire(base):
+    par_requetes = {requete: resultats("etudiants", requete) for requete in RECHERCHES}
+    notes = resultats("notes", "alice")
+    assert en_memoire() == set()
+    main.exiger(*main.COLLECTIONS)
+    assert par_requetes == {requete: resultats("etudiants", requete) for requete in RECHERCHES}
+    assert notes == resultats("notes", "alice")
+    assert [data["nom"] for _, data in par_requetes["alice"]][:2] == ["Alice Martin", "alice martin"]
+
+
+def test_plages_de_dates_comme_en_memoire(base):
+    periodes = [(main.lire_jour(debut), main.lire_jour(fin)) for debut, fin in
+                (("2024-01-01", "2024-12-31"), ("2024-02-12", "2024-02-13"), ("2024-03-01", "2024-03-16"))]
+    par_requetes = [[etudiant.vers_dict() for etudiant in main.etudiants_entre(*periode)] for periode in periodes]
+    assert en_memoire() == set()
+    main.exiger("etudiants")
+    assert par_requetes == [[etudiant.vers_dict() for etudiant in main.etudiants_entre(*periode)]
+                            for periode in periodes]
+
+
+def commande(fonction, *arguments) -> bool:
+    """Une commande de la ligne de commande, suivie de sa sauvegarde."""
+    reussi = fonction(*arguments)
+    main.sauvegarder_donnees()
+    return reussi
+
+
+def test_commandes_sans_charger(base, capsys):
+    assert not commande(main.ajouter_etudiant, "ALICE MARTIN")
+    assert commande(main.ajouter_etudiant, "Chloé Petit")
+    assert commande(main.modifier_etudiant, "Bob Alison", "Robert Alison")
+    assert not commande(main.modifier_etudiant, "bob alison", "Personne")
+    assert commande(main.ajouter_note, "Robert Alison", "14", "Biologie")
+    assert commande(main.modifier_note, "Alice Martin", "16")
+    assert not commande(main.ajouter_absence, "Alice Martin", "2024-03-11")
+    assert commande(main.supprimer_absence, "Alice Martin", "2024-03-11")
+    assert commande(main.afficher_notes_cours, "Biologie")
+    assert commande(main.afficher_cours_enseignant, "Martin")
+    main.rechercher_par_nom("note", "robert")
+    assert "Robert Alison - 14" in capsys.readouterr().out
+    assert commande(main.supprimer_etudiant, "Alice Martin")
+    assert en_memoire() == set()
+
+    ouvrir("sqlite")
+    assert [note.vers_dict() for note in main.parcourir("notes")] == [
+        {"id": 3, "etudiant_id": 6, "note": "9", "cours_id": 1},
+        {"id": 4, "etudiant_id": 6, "note": "14", "cours_id": 1}]
+    assert main.compter("absences") == 0
+    assert main.chercher("etudiants", "Chloé Petit").id == len(NOMS) + 1
+
+
+def test_modifications_en_attente_relues(base):
+    # Une collection lue avant la sauvegarde reçoit les opérations écrites sans elle
+    assert main.modifier_etudiant("Bob Alison", "Robert Alison")
+    assert main.ajouter_etudiant("Chloé Petit")
+    assert not main.interrogeable("etudiants")
+    assert main.chercher("etudiants", "Robert Alison").id == 6
+    assert main.existe("etudiants", "chloé petit")
+    assert "etudiants" in en_memoire()
+    main.sauvegarder_donnees()
+    ouvrir("sqlite")
+    assert [etudiant.nom for etudiant in main.etudiants_entre(0, main.lire_jour("2030-01-01"))].count("Robert Alison") == 1
+
+
+@pytest.mark.parametrize("requete, index", [
+    ("SELECT id FROM etudiants WHERE nom = ?", "idx_etudiants_nom"),
+    ("SELECT id FROM etudiants WHERE normaliser(nom) >= ? AND normaliser(nom) < ?", "idx_etudiants_normalise"),
+    ("SELECT id FROM etudiants WHERE date_ajout >= ? AND date_ajout < ?", "idx_etudiants_date_ajout"),
+    ("SELECT id FROM notes WHERE cours_id = ?", "idx_notes_cours"),
+    ("SELECT id FROM absences WHERE etudiant_id = ? AND date = ?", "idx_absences"),
+])
+def test_requetes_indexees(base, requete, index):
+    plan = main.stockage.connexion.execute("EXPLAIN QUERY PLAN " + requete, ("a",) * requete.count("?")).fetchall()
+    assert index in " ".join(ligne[-1] for ligne in plan)
@@ -0,0 +1,94 @@
+"""Suppressions en cascade et détachements, en mémoire et relus de chaque stockage."""
+import json
+
+import main
+from conftest import ouvrir
+
+
+def remplir() -> None:
+    """Un enseignant, un cours, deux étudiants avec leurs notes et une absence."""
+    operations = [
+        ("enseignants", {"nom": "Martin"}),
+        ("cours", {"nom": "Biologie", "enseignant_id": 1}),
+        ("etudiants", {"nom": "Alice"}),
+        ("etudiants", {"nom": "Bob"}),
+        ("notes", {"etudiant_id": 1, "note": "12", "cours_id": 1}),
+        ("notes", {"etudiant_id": 1, "note": "15"}),
+        ("notes", {"etudiant_id": 2, "note": "9", "cours_id": 1}),
+        ("absences", {"etudiant_id": 1, "date": "2024-03-11"}),
+    ]
+    for collection, enregistrement in operations:
+        main.executer({"op": "ajouter", "collection": collection, "enregistrement": enregistrement})
+    main.sauvegarder_donnees()
+
+
+def supprimer(collection: str, identifiant: int) -> None:
+    main.executer({"op": "supprimer", "collection": collection, "id": identifiant})
+
+
+def contenu() -> dict:
+    return {nom: data for nom, data in main.instantane().items() if nom in main.COLLECTIONS}
+
+
+def verifier_relu(nom_stockage: str, attendu: dict) -> None:
+    """L'état en mémoire, après sauvegarde puis relecture (collections lues à la demande)."""
+    assert contenu() == attendu
+    main.sauvegarder_donnees()
+    ouvrir(nom_stockage)
+    main.differer_chargement()
+    assert contenu() == attendu
+
+
+def test_supprimer_etudiant_supprime_ses_notes_et_absences(nom_stockage):
+    remplir()
+    supprimer("etudiants", 1)
+    attendu = contenu()
+    assert [etudiant["nom"] for etudiant in attendu["etudiants"]] == ["Bob"]
+    assert [note["etudiant_id"] for note in attendu["notes"]] == [2]
+    assert attendu["absences"] == []
+    assert main.compter_absences(1, "2024-01-01", "2024-12-31") == 0
+    verifier_relu(nom_stockage, attendu)
+
+
+def test_cascade_sur_collections_pas_encore_lues(nom_stockage):
+    remplir()
+    ouvrir(nom_stockage)
+    main.differer_chargement()
+    # Seuls les étudiants sont lus : notes et absences appliquent la suppression à leur lecture
+    main.exiger("etudiants")
+    supprimer("etudiants", 1)
+    main.sauvegarder_donnees()
+    ouvrir(nom_stockage)
+    assert [note["etudiant_id"] for note in contenu()["notes"]] == [2]
+    assert contenu()["absences"] == []
+
+
+def test_supprimer_enseignant_et_cours_detache(nom_stockage):
+    remplir()
+    supprimer("enseignants", 1)
+    assert contenu()["cours"] == [{"id": 1, "nom": "Biologie"}]
+    supprimer("cours", 1)
+    attendu = contenu()
+    assert attendu["cours"] == []
+    assert all(note.get("cours_id") is None for note in attendu["notes"])
+    assert len(attendu["notes"]) == 3
+    verifier_relu(nom_stockage, attendu)
+
+
+def test_identifiants_des_notes_et_absences_a_la_migration(dossier, nom_stockage):
+    # Format 2 : notes et absences sans identifiant, repris de data.json par chaque stockage
+    (dossier / main.DATA_JSON).write_text(json.dumps({
+        "version": 2, "sequence": 1,
+        "etudiants": [{"id": 1, "nom": "Alice"}], "enseignants": [], "cours": [],
+        "notes": [{"etudiant_id": 1, "note": "12"}, {"etudiant_id": 1, "note": "12"}],
+        "absences": [{"etudiant_id": 1, "date": "2024-03-11"}],
+    }))
+    # La base ouverte par la fixture, encore vide, serait gardée telle quelle
+    (dossier / main.DATA_DB).unlink(missing_ok=True)
+    ouvrir(nom_stockage)
+    assert [note["id"] for note in contenu()["notes"]] == [1, 2]
+    assert contenu()["absences"] == [{"id": 1, "etudiant_id": 1, "date": "2024-03-11"}]
+    main.executer({"op": "ajouter", "collection": "notes", "enregistrement": {"etudiant_id": 1, "note": "8"}})
+    supprimer("notes", 1)
+    verifier_relu(nom_stockage, {**contenu(), "notes": [{"id": 2, "etudiant_id": 1, "note": "12"},
+                                                        {"id": 3, "etudiant_id": 1, "note": "8"}]})
@@ -0,0 +1,74 @@
+"""Comptes : empreintes scrypt (migration des mots de passe en clair, nouveau hachage quand le coût
+change) et jetons de session (expiration, nombre borné)."""
+import collections
+import json
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def comptes(dossier, monkeypatch):
+    # Coût réduit : les tests vérifient les fiches, pas la résistance de scrypt
+    monkeypatch.setattr(main, "SCRYPT_N", 2 ** 4)
+    monkeypatch.setattr(main, "utilisateurs", None)
+    monkeypatch.setattr(main, "sessions", collections.OrderedDict())
+    return dossier
+
+
+def fiches(dossier) -> dict:
+    return json.loads((dossier / main.USERS_FILE).read_text())
+
+
+def test_migration_des_mots_de_passe_en_clair(comptes, capsys):
+    (comptes / main.DATA_FILE).write_text(json.dumps({"alice": "secret", "bob": "motdepasse"}))
+    assert set(main.charger_utilisateurs()) == {"alice", "bob"}
+    assert not (comptes / main.DATA_FILE).exists()
+    assert "secret" not in (comptes / main.USERS_FILE).read_text()
+    assert "2 utilisateurs migrés" in capsys.readouterr().out
+    assert main.authentifier("alice", "secret") is not None
+    assert main.authentifier("alice", "motdepasse") is None
+    assert main.authentifier("inconnu", "secret") is None
+
+
+def test_nouveau_hachage_quand_le_cout_change(comptes, monkeypatch):
+    assert main.creer_utilisateur("alice", "secret")
+    assert not main.creer_utilisateur("alice", "autre")
+    ancienne = fiches(comptes)["alice"]
+    assert ancienne["n"] == 2 ** 4
+
+    monkeypatch.setattr(main, "SCRYPT_N", 2 ** 5)
+    # Un mot de passe faux ne touche pas à la fiche
+    assert main.authentifier("alice", "faux") is None
+    assert fiches(comptes)["alice"] == ancienne
+    assert main.authentifier("alice", "secret") is not None
+    nouvelle = fiches(comptes)["alice"]
+    assert nouvelle["n"] == 2 ** 5 and nouvelle["sel"] != ancienne["sel"]
+    assert main.verifier_mot_de_passe("secret", nouvelle)
+    # Le coût actuel : plus rien à recalculer
+    assert main.authentifier("alice", "secret") is not None
+    assert fiches(comptes)["alice"] == nouvelle
+
+
+def test_expiration_des_sessions(comptes, monkeypatch):
+    horloge = [1000.0]
+    monkeypatch.setattr(main.time, "monotonic", lambda: horloge[0])
+    main.creer_utilisateur("alice", "secret")
+    jeton = main.authentifier("alice", "secret")
+    horloge[0] += main.DUREE_SESSION - 1
+    assert main.verifier_session(jeton) == "alice"
+    horloge[0] += 2
+    assert main.verifier_session(jeton) is None
+    assert jeton not in main.sessions
+    assert main.verifier_session("jeton inventé") is None
+
+
+def test_sessions_les_moins_utilisees_oubliees(comptes, monkeypatch):
+    monkeypatch.setattr(main, "SESSIONS_MAX", 2)
+    premier, second = main.ouvrir_session("alice"), main.ouvrir_session("bob")
+    # Utiliser le premier jeton le garde : c'est le second, le moins récemment utilisé, qui part
+    assert main.verifier_session(premier) == "alice"
+    troisieme = main.ouvrir_session("chloé")
+    assert main.verifier_session(second) is None
+    assert [main.verifier_session(jeton) for jeton in (premier, troisieme)] == ["alice", "chloé"]